@@ -4,13 +4,12 @@
 """
 
 import streamlit as st
-import pandas as pd
+from streamlit.errors import StreamlitAPIException
 import os
-import re
-import time
-import shutil
 import zipfile
-import io
+import tarfile
+import hashlib
+import time
 from datetime import datetime
 
 st.set_page_config(page_title="엔라이트랩 Vrew 자동화", page_icon="🎬", layout="wide")
@@ -42,47 +41,39 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from modules.auth import (
     is_logged_in, get_current_user, render_auth_ui, sign_out,
-    get_user_credits, use_credit
+    get_cached_credits, get_credit_cache_stats, use_credit, refund_credit
 )
+from modules.script_parser import (
+    parse_excel, detect_csv_encoding, read_scene_sheet,
+    split_script_by_markers, create_clips, build_clip_index, get_scene_clips
+)
+from modules.media_mapper import (
+    assign_numbered_files, update_numbered_slots, find_mapping_gaps, format_number_ranges
+)
+from modules.media_store import (
+    store_upload, is_video, make_thumbnail, ensure_thumbnails, ingest_archive, ingest_uploads
+)
+from modules.vrew_builder import split_scene_ranges
+from modules.image_normalizer import format_normalize_report
+from modules.image_dedup import find_duplicate_slots, format_dedupe_report
+from modules.image_backends import DEFAULT_BACKEND, list_backends
+from modules.candidate_generator import (
+    start_candidate_generation, drain_candidate_results, apply_candidate_results
+)
+from modules.job_queue import (
+    STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_CANCELLED,
+    submit_job, get_job, get_queue_position, request_cancel, start_worker_pool
+)
+from modules.workspace import create_workspace, touch_workspace, remove_workspace, start_janitor
 
 
-def cleanup_old_files(hours=12):
-    """12시간 지난 파일 자동 삭제"""
-    outputs_dir = os.path.join(os.path.dirname(__file__), "outputs")
-    if not os.path.exists(outputs_dir):
-        return
-
-    current_time = time.time()
-    cutoff_time = current_time - (hours * 60 * 60)  # 12시간 전
-
-    deleted_count = 0
-
-    # outputs 폴더 내 모든 파일/폴더 검사
-    for item in os.listdir(outputs_dir):
-        item_path = os.path.join(outputs_dir, item)
-
-        try:
-            # 파일 또는 폴더의 수정 시간 확인
-            mtime = os.path.getmtime(item_path)
-
-            if mtime < cutoff_time:
-                if os.path.isfile(item_path):
-                    os.remove(item_path)
-                    deleted_count += 1
-                elif os.path.isdir(item_path):
-                    shutil.rmtree(item_path)
-                    deleted_count += 1
-        except Exception as e:
-            pass  # 삭제 실패해도 계속 진행
-
-    if deleted_count > 0:
-        print(f"[Cleanup] {deleted_count}개 오래된 파일/폴더 삭제됨")
+@st.cache_resource
+def ensure_janitor():
+    """작업 폴더 정리 스레드 시작 (서버당 1회)"""
+    return start_janitor()
 
 
-# 프로그램 시작 시 12시간 지난 파일 정리
-if 'cleanup_done' not in st.session_state:
-    cleanup_old_files(hours=12)
-    st.session_state.cleanup_done = True
+ensure_janitor()
 
 # 세션 초기화
 if 'step' not in st.session_state:
@@ -95,6 +86,8 @@ if 'scenes' not in st.session_state:
     st.session_state.scenes = []
 if 'clips' not in st.session_state:
     st.session_state.clips = []
+if 'clip_index' not in st.session_state:
+    st.session_state.clip_index = []
 if 'images' not in st.session_state:
     st.session_state.images = []
 if 'selected_images' not in st.session_state:
@@ -104,259 +97,463 @@ if 'processed' not in st.session_state:
 if 'uploader_key' not in st.session_state:
     st.session_state.uploader_key = 0
 
+# 세션 작업 폴더 (업로드 이미지/로고/생성 파일 - 다른 세션과 분리)
+if 'workspace' not in st.session_state:
+    st.session_state.workspace = create_workspace()
+touch_workspace(st.session_state.workspace)
+
+
+# ==================== STEP 1 파이프라인 (캐시) ====================
+# 업로드 파일 내용 해시를 키로 사용 → 위젯 클릭(rerun)마다 재파싱하지 않음
+# st.cache_data는 프로세스 전역 캐시이므로 세션 간에도 결과를 재사용
+# (언더스코어로 시작하는 인자는 캐시 키에서 제외됨)
+
+def file_content_hash(data):
+    """업로드 파일 내용 해시 (캐시 키)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def decode_script(script_hash, _raw_bytes):
+    """대본 디코딩 (내용 해시 기준 캐시)"""
+    return _raw_bytes.decode('utf-8')
 
-def split_text_30chars(text, max_chars=100):
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def detect_sheet_encoding(sheet_hash, _raw_bytes):
+    """CSV 인코딩 판별 결과 캐시 (내용 해시 기준)"""
+    return detect_csv_encoding(_raw_bytes)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_sheet(sheet_hash, file_name, _raw_bytes):
+    """엑셀/CSV 로드 (내용 해시 기준 캐시) - 인식 실패 시 None"""
+    encoding = None
+    if file_name.lower().endswith('.csv'):
+        # CSV 한글 인코딩 처리: 바이트로 먼저 판별 → 한 번만 파싱
+        encoding = detect_sheet_encoding(sheet_hash, _raw_bytes)
+        if encoding is None:
+            return None
+    return read_scene_sheet(_raw_bytes, file_name, encoding)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def parse_markers(sheet_hash, _df):
+    """시작문장 마커 파싱 (내용 해시 기준 캐시)"""
+    return parse_excel(_df)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_step1_pipeline(script_hash, sheet_hash, _script_text, _df):
     """
-    문장 단위로 분할 (종결어미 기준)
-    
-    규칙:
-    - 마침표(.), 물음표(?), 느낌표(!) 뒤에서 분할
-    - 단일 문장은 분리하지 않음 (길어도 유지)
-    - max_chars를 넘어도 종결어미가 나올 때까지 유지
+    Step 1 전체 파이프라인: 마커 파싱 → 씬 분할 → 클립 생성 → 씬별 클립 인덱스
+
+    Returns:
+        (scenes, clips, clip_index)
     """
-    if not text or not text.strip():
-        return []
+    markers = parse_markers(sheet_hash, _df)
+    scenes = split_script_by_markers(_script_text, markers)
+    clips = list(create_clips(scenes))
+    clip_index = build_clip_index(clips, len(scenes))
+    return scenes, clips, clip_index
 
-    text = text.strip()
-    # 빈 행 제거 (연속된 줄바꿈을 공백으로)
-    text = re.sub(r'\n\s*\n', ' ', text)
-    # 모든 줄바꿈을 공백으로
-    text = re.sub(r'\n', ' ', text)
-    # 연속 공백을 하나로
-    text = re.sub(r'\s+', ' ', text)
-
-    # 문장 종결 기준으로만 분할 (. ? ! 뒤의 공백에서 분리)
-    # 단, "..." 같은 경우는 분리하지 않음
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
-    result = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence:
-            result.append(sentence)
-    
-    # 결과가 없으면 원본 반환
-    if not result:
-        result = [text]
-    
-    return result
 
+# ==================== STEP 2 미리보기 ====================
+
+# 씬 카드 페이지 크기 선택지
+SCENE_PAGE_SIZES = [10, 20, 50, 100]
 
-def parse_excel(df):
-    """엑셀 파일 파싱 - A열(씬-샷), B열(시작문장), C열(프롬프트)"""
-    data = []
-    # 엑셀에 헤더가 없는 경우를 대비해 iloc로 접근
-    # 예상 컬럼: 0:Scene-Shot(1-1), 1:Start_Text, 2:Prompt
-    
-    for idx, row in df.iterrows():
-        # A열 Parsing (1-1 -> Scene 1, Shot 1)
-        scene_shot_str = str(row.iloc[0]).strip() if len(row) > 0 else ""
-        start_text = str(row.iloc[1]).strip() if len(row) > 1 else ""
-        prompt = str(row.iloc[2]).strip() if len(row) > 2 else ""
-        
-        scene_num = -1
-        shot_num = -1
-        
-        # 1-1, 1-2 형식 파싱
-        if '-' in scene_shot_str:
-            try:
-                parts = scene_shot_str.split('-')
-                scene_num = int(parts[0])
-                shot_num = int(parts[1])
-            except:
-                pass
-        
-        if start_text and start_text != 'nan' and scene_num > 0:
-            data.append({
-                'scene_num': scene_num, 
-                'shot_num': shot_num, 
-                'start_text': start_text, 
-                'prompt': prompt,
-                'raw_id': scene_shot_str
-            })
-    
-    return data
+
+def render_media_preview(media_info):
+    """씬 이미지/영상 미리보기 (이미지는 디스크 썸네일, 영상은 파일 경로로 표시)"""
+    if is_video(media_info['path']):
+        st.video(media_info['path'])
+        return
+
+    thumb_path = make_thumbnail(media_info['path'], media_info['hash'])
+    st.image(thumb_path or media_info['path'], use_container_width=True)
 
 
-def normalize_text(text):
+def refresh_duplicate_slots():
     """
-    1. 괄호와 그 안의 내용 제거
-    2. 공백, 특수문자 제거 후 정규화된 텍스트와 원본 인덱스 매핑 반환
+    중복 의심 슬롯 다시 계산 (업로드 때 저장한 지각 해시 사용, 세션에 저장)
+    - 이미지 구성이 바뀔 때만 호출 (일괄/압축 업로드, 슬롯 업로드·교체, 후보 반영) - 선택 클릭에서는 호출하지 않음
     """
-    if not text:
-        return "", []
-    
-    # 원본 텍스트 매핑을 위해 전체 텍스트 순회
-    normalized = ""
-    mapping = []
-    
-    # 괄호 안의 내용은 매핑에서 건너뛰고 싶지만, 
-    # 원본(script_text)은 괄호가 없을 수도 있고 있을 수도 있음.
-    # 단순화를 위해: 원본은 alphanumeric만 남기는 정규화.
-    # 검색어(markers)는 괄호를 제거하고 정규화.
-    
-    for i, char in enumerate(text):
-        if char.isalnum():
-            normalized += char
-            mapping.append(i)
-            
-    return normalized, mapping
-
-def normalize_search_text(text):
-    """검색어 전용 정규화 (괄호 내용 삭제)"""
-    if not text:
-        return ""
-    # (경어) 등 제거
-    text_clean = re.sub(r'\(.*?\)', '', text)
-    
-    normalized = ""
-    for char in text_clean:
-        if char.isalnum():
-            normalized += char
-    return normalized
+    st.session_state.duplicate_slots = find_duplicate_slots(st.session_state.get('images_by_shot', {}))
+    return st.session_state.duplicate_slots
+
+
+def render_duplicate_note(raw_id, slot):
+    """이 슬롯과 눈으로 같은 이미지가 있는 씬/슬롯 표시"""
+    others = st.session_state.get('duplicate_slots', {}).get((raw_id, slot))
+    if others:
+        labels = ", ".join(f"씬 {other_id} {other_slot}" for other_id, other_slot in others[:3])
+        if len(others) > 3:
+            labels += f" 외 {len(others) - 3}개"
+        st.caption(f"♻️ 중복 의심: {labels}")
 
-def find_fuzzy(full_text_norm, full_text_map, search_text, start_offset_idx=0):
+
+def stop_candidate_generation():
+    """진행 중인 후보 생성 중지 요청 (세션 초기화 전, 아직 요청하지 않은 이미지는 건너뜀)"""
+    generation = st.session_state.get('candidate_generation')
+    if generation:
+        generation['cancel'].set()
+
+
+@st.fragment(run_every=1.0)
+def render_candidate_generation_status():
     """
-    정규화된 텍스트에서 검색어 위치 찾기
+    후보 생성 진행 상황 (1초마다 이 영역만 갱신)
+    - 완성된 이미지를 씬 슬롯에 반영, 보고 있는 페이지의 씬이 채워지면 전체 다시 그림
     """
-    search_norm = normalize_search_text(search_text)
-    
-    if len(search_norm) < 3:
-        return -1
-        
-    start_norm_idx = -1
-    
-    # start_offset_idx(원본 인덱스)에 해당하는 정규화 인덱스 찾기
-    # full_text_map은 정규화된 i번째 글자가 원본의 map[i]번째 글자임을 뜻함
-    # 따라서 map[k] >= start_offset_idx 인 최소 k를 찾아야 함
-    # (단순 선형 탐색은 느릴 수 있으나 텍스트 크기가 크지 않아 괜찮음)
-    
-    current_norm_offset = 0
-    if start_offset_idx > 0:
-        for i, original_idx in enumerate(full_text_map):
-            if original_idx >= start_offset_idx:
-                current_norm_offset = i
-                break
+    touch_workspace(st.session_state.workspace)
+    state = st.session_state.candidate_generation
+
+    applied = []
+    duplicates_changed = False
+    results = drain_candidate_results(state)
+    if results:
+        images_by_shot = st.session_state.get('images_by_shot') or {}
+        applied = apply_candidate_results(images_by_shot, results, state['overwrite'])
+        st.session_state.images_by_shot = images_by_shot
+        if applied:
+            previous = st.session_state.get('duplicate_slots')
+            duplicates_changed = refresh_duplicate_slots() != previous
+
+    if state['finished']:
+        st.session_state.candidate_summary = {
+            'backend': state['backend'], 'total': state['total'], 'failed': state['failed'],
+            'errors': state['errors'][:3], 'elapsed': state['elapsed'], 'error': state['error']
+        }
+        st.session_state.candidate_generation = None
+        st.rerun()
+
+    page_ids = st.session_state.get('scene_page_ids')
+    # 다른 페이지 씬이 채워져도 중복 표시가 바뀌면 보고 있는 카드에 반영
+    if applied and (not page_ids or duplicates_changed or any(entry['raw_id'] in page_ids for entry in applied)):
+        st.rerun()
+
+    elapsed = time.time() - state['started']
+    st.progress(
+        state['done'] / max(1, state['total']),
+        text=f"🎨 후보 이미지 생성 중... {state['done']}/{state['total']}장 ({state['backend']}, {elapsed:.0f}초)"
+    )
+    if state['failed']:
+        st.caption(f"⚠️ 실패 {state['failed']}장: {state['errors'][0] if state['errors'] else ''}")
+    if state['cancel'].is_set():
+        st.caption("⏹ 중지 요청됨 - 요청 중인 이미지까지만 받습니다")
+    elif st.button("⏹ 생성 중지", key="cancel_candidates"):
+        state['cancel'].set()
+        st.rerun(scope="fragment")
+
+
+def rerun_scene_card(images_changed=False):
+    """
+    씬 카드만 다시 실행 (카드 fragment 재실행 중이 아니면 전체 rerun)
+
+    Args:
+        images_changed: 슬롯 이미지를 업로드/교체했으면 True
+                        → 중복 의심 슬롯 다시 계산 후 전체 rerun (다른 카드의 표시도 갱신)
+    """
+    if images_changed:
+        refresh_duplicate_slots()
+        st.rerun()
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+@st.fragment
+def render_scene_card(idx, scene):
+    """
+    씬 카드 (A/B 미리보기, 선택, 교체/업로드)
+    - fragment로 분리: 선택/교체 클릭 시 이 카드만 다시 실행
+    """
+    # session state에서 images_by_shot 가져오기
+    images_by_shot = st.session_state.get('images_by_shot', {})
+    raw_id = scene['raw_id']
+
+    # 해당 씬의 이미지 정보 가져오기
+    shot_images = images_by_shot.get(raw_id, {})
+    has_a = 'A' in shot_images
+    has_b = 'B' in shot_images
+    has_any = has_a or has_b
+
+    # 기본 선택: A (또는 B만 있으면 B)
+    if raw_id not in st.session_state.selected_images:
+        if has_a:
+            st.session_state.selected_images[raw_id] = 'A'
+        elif has_b:
+            st.session_state.selected_images[raw_id] = 'B'
+
+    # Expander 제목
+    expander_title = f"**씬 {raw_id}**: {scene['text'][:40]}..."
+    if not has_any:
+        expander_title += " ⚠️ 이미지 없음"
+
+    with st.expander(expander_title, expanded=(idx < 2)):
+        # 이 씬에 필요한 파일 번호 계산
+        expected_a_num = idx * 2 + 1
+        expected_b_num = idx * 2 + 2
+        expected_a_name = f"{expected_a_num:03d}.jpg"
+        expected_b_name = f"{expected_b_num:03d}.jpg"
+
+        # 상단: 대본 표시
+        st.markdown(f"**📝 한글 대본:**")
+        if scene['text'] and scene['text'].strip():
+            st.text(scene['text'][:200] + ("..." if len(scene['text']) > 200 else ""))
         else:
-            return -1 # 범위를 벗어남
-            
-    # 검색 범위 제한 (검색 속도 최적화)
-    search_space = full_text_norm[current_norm_offset:]
-    
-    # 1. 전체 매칭
-    idx = search_space.find(search_norm)
-    
-    # 2. 앞 20자 매칭
-    if idx == -1:
-        snippet = search_norm[:20]
-        if len(snippet) >= 5:
-            idx = search_space.find(snippet)
-            
-    # 3. 앞 10자 매칭
-    if idx == -1:
-        snippet = search_norm[:10]
-        if len(snippet) >= 5:
-            idx = search_space.find(snippet)
-
-    # 4. 앞 5자 매칭 (강력한 오타 대응)
-    if idx == -1:
-        snippet = search_norm[:5]
-        if len(snippet) >= 3:
-            idx = search_space.find(snippet)
-            
-    # 5. 뒤 20자 매칭 (앞부분 오타 대비)
-    if idx == -1:
-        snippet = search_norm[-20:]
-        if len(snippet) >= 5:
-            idx = search_space.find(snippet)
-            if idx != -1:
-                idx = idx - len(search_norm) + len(snippet)
-
-    if idx != -1:
-        # 찾은 정규화 인덱스를 원본 인덱스로 변환
-        found_norm_abs = current_norm_offset + idx
-        # 범위 체크
-        if found_norm_abs < len(full_text_map):
-            return full_text_map[found_norm_abs]
-            
-    return -1
+            st.warning("(대본 없음)")
 
-def split_script_by_markers(script_text, markers):
-    """시작 문장 기준으로 대본 분할 (Fuzzy Matching 적용) - 순서 자동 정렬"""
+        # 필요한 이미지 파일명 안내
+        st.caption(f"📌 필요한 이미지: **{expected_a_name}** (A), **{expected_b_name}** (B)")
+        st.markdown("---")
 
-    # 전체 텍스트 정규화 (한 번만 수행)
-    norm_full, map_full = normalize_text(script_text)
+        # 이미지 표시 영역
+        if has_any:
+            # A, B 이미지를 가로로 배치
+            cols = st.columns(2)
+
+            # A 이미지/영상
+            with cols[0]:
+                if has_a:
+                    render_media_preview(shot_images['A'])
+                    st.caption(f"📁 {shot_images['A']['original_name']}")
+                    render_duplicate_note(raw_id, 'A')
+
+                    # 라디오 버튼 + 교체 버튼을 한 줄로
+                    btn_cols = st.columns([1, 1])
+                    with btn_cols[0]:
+                        if st.button("⭐ A 선택", key=f"select_a_{raw_id}", use_container_width=True,
+                                    type="primary" if st.session_state.selected_images.get(raw_id) == 'A' else "secondary"):
+                            st.session_state.selected_images[raw_id] = 'A'
+                            rerun_scene_card()
+                    with btn_cols[1]:
+                        if st.button("🔄 교체", key=f"replace_a_{raw_id}", use_container_width=True):
+                            st.session_state.replace_mode[raw_id] = 'A'
+                            rerun_scene_card()
+
+                    # 교체 모드
+                    if st.session_state.replace_mode.get(raw_id) == 'A':
+                        new_img = st.file_uploader(
+                            "새 이미지/영상 A 선택",
+                            type=['png', 'jpg', 'jpeg', 'mp4'],
+                            key=f"upload_a_{raw_id}"
+                        )
+                        if new_img:
+                            images_by_shot[raw_id]['A'].update(
+                                store_upload(new_img.getbuffer(), new_img.name, st.session_state.workspace['images'])
+                            )
+                            st.session_state.images_by_shot = images_by_shot
+                            st.session_state.replace_mode[raw_id] = None
+                            st.success("✅ A 교체 완료!")
+                            rerun_scene_card(images_changed=True)
+                else:
+                    st.warning(f"⚠️ **{expected_a_name}** 파일이 없습니다")
+                    new_img_a = st.file_uploader(
+                        f"{expected_a_name} 업로드",
+                        type=['png', 'jpg', 'jpeg', 'mp4'],
+                        key=f"new_upload_a_{raw_id}"
+                    )
+                    if new_img_a:
+                        images_by_shot[raw_id]['A'] = dict(
+                            store_upload(new_img_a.getbuffer(), new_img_a.name, st.session_state.workspace['images']),
+                            file_num=0
+                        )
+                        st.session_state.images_by_shot = images_by_shot
+                        st.success("✅ A 업로드 완료!")
+                        rerun_scene_card(images_changed=True)
+
+            # B 이미지/영상
+            with cols[1]:
+                if has_b:
+                    render_media_preview(shot_images['B'])
+                    st.caption(f"📁 {shot_images['B']['original_name']}")
+                    render_duplicate_note(raw_id, 'B')
+
+                    # 라디오 버튼 + 교체 버튼을 한 줄로
+                    btn_cols = st.columns([1, 1])
+                    with btn_cols[0]:
+                        if st.button("⭐ B 선택", key=f"select_b_{raw_id}", use_container_width=True,
+                                    type="primary" if st.session_state.selected_images.get(raw_id) == 'B' else "secondary"):
+                            st.session_state.selected_images[raw_id] = 'B'
+                            rerun_scene_card()
+                    with btn_cols[1]:
+                        if st.button("🔄 교체", key=f"replace_b_{raw_id}", use_container_width=True):
+                            st.session_state.replace_mode[raw_id] = 'B'
+                            rerun_scene_card()
+
+                    # 교체 모드
+                    if st.session_state.replace_mode.get(raw_id) == 'B':
+                        new_img = st.file_uploader(
+                            "새 이미지/영상 B 선택",
+                            type=['png', 'jpg', 'jpeg', 'mp4'],
+                            key=f"upload_b_{raw_id}"
+                        )
+                        if new_img:
+                            images_by_shot[raw_id]['B'].update(
+                                store_upload(new_img.getbuffer(), new_img.name, st.session_state.workspace['images'])
+                            )
+                            st.session_state.images_by_shot = images_by_shot
+                            st.session_state.replace_mode[raw_id] = None
+                            st.success("✅ B 교체 완료!")
+                            rerun_scene_card(images_changed=True)
+                else:
+                    st.warning(f"⚠️ **{expected_b_name}** 파일이 없습니다")
+                    new_img_b = st.file_uploader(
+                        f"{expected_b_name} 업로드",
+                        type=['png', 'jpg', 'jpeg', 'mp4'],
+                        key=f"new_upload_b_{raw_id}"
+                    )
+                    if new_img_b:
+                        images_by_shot[raw_id]['B'] = dict(
+                            store_upload(new_img_b.getbuffer(), new_img_b.name, st.session_state.workspace['images']),
+                            file_num=0
+                        )
+                        st.session_state.images_by_shot = images_by_shot
+                        st.success("✅ B 업로드 완료!")
+                        rerun_scene_card(images_changed=True)
+        else:
+            # 이미지가 하나도 없을 때
+            st.error(f"⚠️ **{expected_a_name}**, **{expected_b_name}** 파일이 없습니다. 아래에서 업로드하세요.")
+            cols = st.columns(2)
+
+            with cols[0]:
+                st.markdown(f"**이미지 A ({expected_a_name})**")
+                new_img_a = st.file_uploader(
+                    f"{expected_a_name} 업로드",
+                    type=['png', 'jpg', 'jpeg', 'mp4'],
+                    key=f"empty_upload_a_{raw_id}",
+                    label_visibility="collapsed"
+                )
+                if new_img_a:
+                    if raw_id not in images_by_shot:
+                        images_by_shot[raw_id] = {}
+
+                    images_by_shot[raw_id]['A'] = dict(
+                        store_upload(new_img_a.getbuffer(), new_img_a.name, st.session_state.workspace['images']),
+                        file_num=0
+                    )
+                    st.session_state.images_by_shot = images_by_shot
+                    st.session_state.selected_images[raw_id] = 'A'
+                    st.success("✅ A 업로드 완료!")
+                    rerun_scene_card(images_changed=True)
+
+            with cols[1]:
+                st.markdown(f"**이미지 B ({expected_b_name})**")
+                new_img_b = st.file_uploader(
+                    f"{expected_b_name} 업로드",
+                    type=['png', 'jpg', 'jpeg', 'mp4'],
+                    key=f"empty_upload_b_{raw_id}",
+                    label_visibility="collapsed"
+                )
+                if new_img_b:
+                    if raw_id not in images_by_shot:
+                        images_by_shot[raw_id] = {}
+
+                    images_by_shot[raw_id]['B'] = dict(
+                        store_upload(new_img_b.getbuffer(), new_img_b.name, st.session_state.workspace['images']),
+                        file_num=0
+                    )
+                    st.session_state.images_by_shot = images_by_shot
+                    if raw_id not in st.session_state.selected_images:
+                        st.session_state.selected_images[raw_id] = 'B'
+                    st.success("✅ B 업로드 완료!")
+                    rerun_scene_card(images_changed=True)
 
-    # 1단계: 모든 마커의 위치를 먼저 찾음 (순서 제한 없이, 전체 텍스트에서)
-    marker_positions = []
-    for i, marker in enumerate(markers):
-        start_text = marker['start_text']
 
-        # 전체 텍스트에서 검색 (current_pos 제한 없이)
-        start_pos = find_fuzzy(norm_full, map_full, start_text, 0)
+# ==================== STEP 3 작업 큐 ====================
 
-        # 못 찾았을 경우 원본 find 시도
-        if start_pos == -1:
-            start_pos = script_text.find(start_text[:10])
+def read_file_on_click(path):
+    """다운로드 버튼 클릭 시에만 파일을 읽는 콜백 (재실행마다 파일 내용을 메모리에 올리지 않음)"""
+    def read():
+        with open(path, 'rb') as f:
+            return f.read()
+    return read
 
-        if start_pos == -1:
-            print(f"Warning: Cannot find match for Scene {marker['raw_id']}: '{start_text[:20]}...'")
 
-        marker_positions.append({
-            'original_idx': i,
-            'marker': marker,
-            'pos': start_pos
-        })
+@st.cache_resource
+def ensure_job_workers():
+    """앱 내장 워커 프로세스 시작 (서버당 1회, VREW_EMBEDDED_WORKERS=0이면 worker.py 별도 실행)"""
+    if os.getenv("VREW_EMBEDDED_WORKERS", "1") == "0":
+        return []
+    return start_worker_pool()
+
+
+def format_job_detail(detail):
+    """진행 이벤트 → 한 줄 요약 (파트/클립/기록 용량/남은 시간)"""
+    parts = [
+        f"파트 {detail['part']}/{detail['parts']}",
+        f"클립 {detail['clips_done']}/{detail['clips_total']}",
+        f"{detail['bytes_written'] / 1024 / 1024:.1f}MB 기록"
+    ]
+    if detail['eta'] is not None:
+        parts.append(f"남은 시간 약 {int(detail['eta'] // 60)}분 {int(detail['eta'] % 60)}초")
+    if detail.get('dedupe'):
+        parts.append(f"중복 {detail['dedupe']['duplicates']}개 합침")
+    if detail.get('normalize'):
+        parts.append(f"정규화 {detail['normalize']['saved_bytes'] / 1024 / 1024:.1f}MB 절감")
+    return " · ".join(parts)
+
+
+def refund_job_credit(job_id):
+    """취소/실패한 작업에 차감한 크레딧 환불 (작업당 1회)"""
+    if st.session_state.get('vrew_job_charged') != job_id:
+        return
+    st.session_state.vrew_job_charged = None
+
+    user = get_current_user()
+    user_id = user.get("id") if user else None
+    if not refund_credit(st.session_state.get("access_token"), user_id):
+        print(f"[Credits] ⚠️ job {job_id} 크레딧 환불 실패 (user {user_id})")
+        return
 
-    # 2단계: 위치 순서대로 정렬 (찾은 것만)
-    found_markers = [m for m in marker_positions if m['pos'] != -1]
-    found_markers.sort(key=lambda x: x['pos'])
+    st.session_state["credits"] = st.session_state.get("credits", 0) + 1
+    st.session_state["logout_after_download"] = False
+    st.session_state.vrew_job_refunded = True
 
-    # 3단계: 각 마커에 대해 텍스트 구간 결정
-    text_map = {}  # original_idx -> scene_text
 
-    for i, item in enumerate(found_markers):
-        start_pos = item['pos']
+@st.fragment(run_every=1.0)
+def render_vrew_job_status(job_id):
+    """Vrew 생성 작업 상태 표시 (완료 시 다운로드 영역으로 전환, 취소 버튼)"""
+    touch_workspace(st.session_state.workspace)
+    job = get_job(job_id)
+    if job is None:
+        st.session_state.vrew_job_id = None
+        st.rerun()
 
-        # 다음 마커의 시작 위치 = 현재 마커의 종료 위치
-        if i + 1 < len(found_markers):
-            end_pos = found_markers[i + 1]['pos']
+    if job['status'] in (STATUS_QUEUED, STATUS_RUNNING):
+        if job['status'] == STATUS_QUEUED:
+            position = get_queue_position(job_id)
+            st.info(f"⏳ 생성 대기 중... (앞에 {position}개 작업)")
         else:
-            end_pos = len(script_text)
-
-        scene_text = script_text[start_pos:end_pos].strip()
-        text_map[item['original_idx']] = scene_text
-
-    # 4단계: 원래 Excel 순서대로 scenes 배열 구성
-    scenes = []
-    for i, marker in enumerate(markers):
-        scene_text = text_map.get(i, "")  # 못 찾은 경우 빈 문자열
-
-        scenes.append({
-            'scene_num': marker['scene_num'],
-            'shot_num': marker['shot_num'],
-            'raw_id': marker['raw_id'],
-            'text': scene_text,
-            'prompt': marker['prompt']
-        })
-
-    return scenes
-
-
-def create_clips(scenes):
-    """씬을 30자 클립으로 분할"""
-    clips = []
-    for scene in scenes:
-        text_chunks = split_text_30chars(scene['text'])
-        for chunk in text_chunks:
-            clips.append({
-                'scene_num': scene['scene_num'],
-                'shot_num': scene['shot_num'],
-                'raw_id': scene['raw_id'],
-                'text': chunk,
-                'prompt': scene['prompt']
-            })
-    return clips
+            st.progress(job['progress'], text=f"🎬 Vrew 파일 생성 중... {job['progress_message']}")
+            if job['progress_detail']:
+                st.caption(format_job_detail(job['progress_detail']))
+
+        if job['cancel_requested']:
+            st.caption("⏹ 취소 요청됨 - 현재 파일 생성이 끝나면 중단합니다")
+        elif st.button("⏹ 생성 취소", key=f"cancel_job_{job_id}"):
+            request_cancel(job_id)
+            st.rerun(scope="fragment")
+    elif job['status'] == STATUS_CANCELLED:
+        refund_job_credit(job_id)
+        st.session_state.vrew_job_cancelled = True
+        st.session_state.vrew_job_id = None
+        st.rerun()
+    elif job['status'] == STATUS_DONE:
+        st.session_state.generated_vrew_files = job['result']['files']
+        st.session_state.generated_vrew_archive = job['result']['archive']
+        st.session_state.generated_vrew_normalize = job['result'].get('normalize')
+        st.session_state.generated_vrew_dedupe = job['result'].get('dedupe')
+        st.session_state.vrew_job_id = None
+        st.rerun()
+    else:
+        refund_job_credit(job_id)
+        st.session_state.vrew_job_error = job['error'] or "알 수 없는 오류"
+        st.session_state.vrew_job_id = None
+        st.rerun()
 
 
 def main():
@@ -373,8 +570,8 @@ def main():
     user_id = user.get("id") if user else None
     access_token = st.session_state.get("access_token")
 
-    # 크레딧 조회
-    credits = get_user_credits(access_token, user_id) if user_id else 0
+    # 크레딧 조회 (세션 캐시 - 클릭마다 원격 조회하지 않음)
+    credits = get_cached_credits(access_token, user_id) if user_id else 0
     st.session_state["credits"] = credits
 
     # 크레딧 0이면 자동 로그아웃 (단, 다운로드 대기 중이면 제외)
@@ -389,6 +586,9 @@ def main():
         st.markdown(f"👤 **{user.get('email', '사용자')}**")
     with user_cols[1]:
         st.markdown(f"🎫 크레딧: **{credits}**회")
+        if user_id:
+            cache_stats = get_credit_cache_stats(user_id)
+            st.caption(f"조회 캐시: 원격 {cache_stats['remote_calls']}회 / 생략 {cache_stats['avoided_calls']}회")
     with user_cols[2]:
         if st.button("로그아웃", use_container_width=True):
             sign_out()
@@ -398,10 +598,10 @@ def main():
 
     # 재시작 버튼 (서브타이틀 영역)
     if st.button("🔄 엔라이트랩 Vrew 자동화 재시작", use_container_width=True):
-        # outputs 폴더 삭제 (Windows 특수 파일 에러 무시)
-        outputs_dir = os.path.join(os.path.dirname(__file__), "outputs")
-        if os.path.exists(outputs_dir):
-            shutil.rmtree(outputs_dir, ignore_errors=True)
+        stop_candidate_generation()
+
+        # 이 세션의 작업 폴더만 삭제 (다른 사용자 파일 유지)
+        remove_workspace(st.session_state.workspace)
 
         # 크레딧 소진 시 로그아웃
         should_logout = st.session_state.get("logout_after_download", False)
@@ -417,7 +617,7 @@ def main():
         else:
             # 인증 정보 유지
             for key in list(st.session_state.keys()):
-                if key not in ['access_token', 'user', 'credits']:
+                if key not in ['access_token', 'user', 'credits', 'credit_cache']:
                     del st.session_state[key]
 
         # uploader_key 재설정
@@ -453,8 +653,11 @@ def main():
             script_file = st.file_uploader("대본 텍스트 파일 (.txt)", type=['txt'], key=f"script_uploader_{st.session_state.uploader_key}")
             
             if script_file:
-                script_text = script_file.read().decode('utf-8')
+                script_bytes = script_file.getvalue()
+                script_hash = file_content_hash(script_bytes)
+                script_text = decode_script(script_hash, script_bytes)
                 st.session_state.script_text = script_text
+                st.session_state.script_hash = script_hash
                 # 대본 파일명 저장 (확장자 제거)
                 st.session_state.script_filename = script_file.name.replace('.txt', '')
                 st.success(f"✅ 대본 로드 완료! ({len(script_text)}자)")
@@ -466,25 +669,17 @@ def main():
             excel_file = st.file_uploader("엑셀/CSV 파일 (A열: 1-1 형식, B열: 시작문장, C열: 프롬프트)", type=['xlsx', 'xls', 'csv'], key=f"excel_uploader_{st.session_state.uploader_key}")
 
             if excel_file:
-                # CSV/Excel 분기 처리
-                if excel_file.name.endswith('.csv'):
-                    # CSV 한글 인코딩 처리
-                    df = None
-                    for encoding in ['utf-8', 'cp949', 'euc-kr', 'utf-8-sig']:
-                        try:
-                            excel_file.seek(0)  # 파일 포인터 리셋
-                            df = pd.read_csv(excel_file, encoding=encoding)
-                            break
-                        except:
-                            continue
-                    if df is None:
-                        st.error("CSV 파일 인코딩을 인식할 수 없습니다.")
-                else:
-                    df = pd.read_excel(excel_file)
+                # CSV/Excel 분기 처리 (내용 해시 기준 캐시)
+                sheet_bytes = excel_file.getvalue()
+                sheet_hash = file_content_hash(sheet_bytes)
+                df = load_sheet(sheet_hash, excel_file.name, sheet_bytes)
+                if df is None:
+                    st.error("CSV 파일 인코딩을 인식할 수 없습니다.")
 
                 if df is not None:
                     st.session_state.excel_df = df
-                    markers = parse_excel(df)
+                    st.session_state.sheet_hash = sheet_hash
+                    markers = parse_markers(sheet_hash, df)
                     st.success(f"✅ {len(markers)}개 씬 정보 로드!")
                     with st.expander("엑셀 미리보기"):
                         st.dataframe(df.head(10), use_container_width=True)
@@ -495,18 +690,23 @@ def main():
             
             if st.button("🔄 3.대본분할 & 프롬프트 추출", type="primary", use_container_width=True):
                 with st.spinner("처리 중..."):
-                    markers = parse_excel(st.session_state.excel_df)
-                    scenes = split_script_by_markers(st.session_state.script_text, markers)
-                    clips = create_clips(scenes)
+                    scenes, clips, clip_index = run_step1_pipeline(
+                        st.session_state.script_hash,
+                        st.session_state.sheet_hash,
+                        st.session_state.script_text,
+                        st.session_state.excel_df
+                    )
                     
                     st.session_state.scenes = scenes
                     st.session_state.clips = clips
+                    st.session_state.clip_index = clip_index
                     st.session_state.processed = True
                 st.rerun()
             
             if st.session_state.processed and st.session_state.scenes:
                 scenes = st.session_state.scenes
                 clips = st.session_state.clips
+                clip_index = st.session_state.clip_index
                 
                 # 씬/샷 카운트 계산
                 unique_scenes = set(s['scene_num'] for s in scenes)
@@ -516,7 +716,7 @@ def main():
                 st.success(f"✅ {total_scenes_count}개 장면 (총 {total_shots_count}개 씬) → {len(clips)}개 클립 생성!")
                 
                 st.markdown("### 📋 분할 결과")
-                for scene in scenes[:3]:
+                for scene_idx, scene in enumerate(scenes[:3]):
                     with st.expander(f"씬 {scene['raw_id']}: {scene['text'][:40]}..."):
                         st.markdown(f"**📝 한글 대본:**")
                         st.text(scene['text'][:300] + ("..." if len(scene['text']) > 300 else ""))
@@ -524,7 +724,7 @@ def main():
                         st.markdown(f"**🎨 이미지 프롬프트:**")
                         st.caption(scene['prompt'])
 
-                        scene_clips = [c for c in clips if c['raw_id'] == scene['raw_id']]
+                        scene_clips = get_scene_clips(clips, clip_index, scene_idx)
                         st.markdown(f"**📌 클립 수:** {len(scene_clips)}개")
                         for i, clip in enumerate(scene_clips[:5]):
                             st.caption(f"  클립{i+1}: {clip['text']}")
@@ -573,6 +773,7 @@ def main():
         c1, c2, c3 = st.columns(3)
         with c1:
             if st.button("🏠 처음으로", key="reset_top", use_container_width=True):
+                stop_candidate_generation()
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
                 st.rerun()
@@ -589,6 +790,51 @@ def main():
         st.markdown("---")
         st.info(f"**총 {len(scenes)}개 씬**에 대한 이미지를 업로드하세요")
 
+        # 프롬프트로 A/B 후보 바로 생성 (백그라운드, 완성되는 대로 씬 슬롯에 반영)
+        with st.expander("🎨 프롬프트로 A/B 후보 이미지 생성", expanded=not st.session_state.get('images_by_shot')):
+            generating = bool(st.session_state.get('candidate_generation'))
+            backend_names = list_backends()
+            gen_cols = st.columns([2, 2, 1])
+            with gen_cols[0]:
+                backend_name = st.selectbox(
+                    "이미지 백엔드", backend_names,
+                    index=backend_names.index(DEFAULT_BACKEND) if DEFAULT_BACKEND in backend_names else 0,
+                    key='candidate_backend', disabled=generating
+                )
+            with gen_cols[1]:
+                overwrite = st.checkbox(
+                    "이미지가 있는 슬롯도 새로 생성", key='candidate_overwrite', disabled=generating,
+                    help="끄면 빈 슬롯만 생성합니다. 켜면 새 시드로 모든 슬롯을 다시 생성해 교체합니다."
+                )
+            with gen_cols[2]:
+                if st.button("🎨 생성 시작", type="primary", use_container_width=True, disabled=generating):
+                    if overwrite:
+                        # 새 시드 → 캐시된 이전 후보 대신 새 이미지
+                        st.session_state.candidate_round = st.session_state.get('candidate_round', 0) + 1
+                    st.session_state.candidate_generation = start_candidate_generation(
+                        scenes, st.session_state.workspace['images'],
+                        images_by_shot=st.session_state.get('images_by_shot'),
+                        backend_name=backend_name,
+                        overwrite=overwrite,
+                        seed_offset=st.session_state.get('candidate_round', 0) * 10000
+                    )
+                    st.session_state.candidate_summary = None
+                    st.rerun()
+
+            if st.session_state.get('candidate_generation'):
+                render_candidate_generation_status()
+            elif st.session_state.get('candidate_summary'):
+                summary = st.session_state.candidate_summary
+                generated = summary['total'] - summary['failed']
+                if summary['error']:
+                    st.error(f"❌ 후보 생성 중단: {summary['error']}")
+                elif summary['total'] == 0:
+                    st.info("생성할 빈 슬롯이 없습니다")
+                else:
+                    st.success(f"✅ 후보 {generated}/{summary['total']}장 생성 ({summary['backend']}, {summary['elapsed']:.1f}초)")
+                if summary['failed']:
+                    st.warning(f"⚠️ 실패 {summary['failed']}장 (다시 시작하면 빈 슬롯만 생성): {', '.join(summary['errors'])}")
+
         # 템플릿 업로드
         st.markdown('<h3 style="color: #FF0000;">템플릿 업로드(선택)</h3>', unsafe_allow_html=True)
         logo_file = st.file_uploader(
@@ -599,9 +845,7 @@ def main():
         )
 
         if logo_file:
-            logo_dir = os.path.join(os.path.dirname(__file__), "outputs", "logo")
-            os.makedirs(logo_dir, exist_ok=True)
-            logo_path = os.path.join(logo_dir, "overlay_logo.png")
+            logo_path = os.path.join(st.session_state.workspace['logo'], "overlay_logo.png")
             with open(logo_path, 'wb') as f:
                 f.write(logo_file.read())
             st.session_state['overlay_logo_path'] = logo_path
@@ -617,109 +861,110 @@ def main():
             key=f"image_uploader_{st.session_state.uploader_key}"
         )
         
-        if uploaded_files:
-            # 파일명 번호 추출 함수
-            def extract_file_number(filename):
-                match = re.match(r'^(\d+)', filename)
-                return int(match.group(1)) if match else 9999
-            
-            # 파일명 번호로 정렬
-            sorted_files = sorted(uploaded_files, key=lambda x: extract_file_number(x.name))
-            
-            output_dir = os.path.join(os.path.dirname(__file__), "outputs", "images")
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 파일명 → 씬 매핑 (고정 매핑, 밀림 방지)
-            # 규칙: 파일명 번호로 고정 매핑 (순서 상관없음)
-            # 씬 1-1 (idx 0): 001.jpg (A), 002.jpg (B)
-            # 씬 1-2 (idx 1): 003.jpg (A), 004.jpg (B)
-            # 씬 1-3 (idx 2): 005.jpg (A), 006.jpg (B)
-            # 파일이 없으면 None (업로드 버튼 표시)
-            if 'images_by_shot' not in st.session_state or 'uploaded_file_hash' not in st.session_state or st.session_state.uploaded_file_hash != hash(str([f.name for f in sorted_files])):
-                images_by_shot = {}  # {raw_id: {'A': {...}, 'B': {...}}}
-
-                # 1. 파일명 번호 → 파일 딕셔너리 생성
-                files_by_number = {}
-                for file in sorted_files:
-                    file_num = extract_file_number(file.name)
-                    files_by_number[file_num] = file
-
-                # 매핑 로그
-                mapping_log = []
-
-                # 2. 각 씬에 고정 번호 매핑
-                for scene_idx, target_scene in enumerate(scenes):
-                    raw_id = target_scene['raw_id']
-                    images_by_shot[raw_id] = {}
-
-                    # 이 씬에 필요한 파일 번호 계산
-                    expected_a_num = scene_idx * 2 + 1  # 1, 3, 5, 7...
-                    expected_b_num = scene_idx * 2 + 2  # 2, 4, 6, 8...
-
-                    shot_images = []
-
-                    # A 이미지/영상 찾기
-                    if expected_a_num in files_by_number:
-                        file = files_by_number[expected_a_num]
-                        file_bytes = file.read()
-                        # 원본 파일 확장자 유지
-                        orig_ext = os.path.splitext(file.name)[1].lower()
-                        if orig_ext not in ['.png', '.jpg', '.jpeg', '.mp4']:
-                            orig_ext = '.png'
-                        path = os.path.join(output_dir, f"img_{expected_a_num:03d}{orig_ext}")
-                        with open(path, 'wb') as f:
-                            f.write(file_bytes)
-
-                        images_by_shot[raw_id]['A'] = {
-                            'path': path,
-                            'bytes': file_bytes,
-                            'file_num': expected_a_num,
-                            'original_name': file.name
-                        }
-                        shot_images.append(f"{file.name} (A)")
-                    else:
-                        shot_images.append(f"{expected_a_num:03d}.jpg 없음 (A)")
-
-                    # B 이미지/영상 찾기
-                    if expected_b_num in files_by_number:
-                        file = files_by_number[expected_b_num]
-                        file_bytes = file.read()
-                        # 원본 파일 확장자 유지
-                        orig_ext = os.path.splitext(file.name)[1].lower()
-                        if orig_ext not in ['.png', '.jpg', '.jpeg', '.mp4']:
-                            orig_ext = '.png'
-                        path = os.path.join(output_dir, f"img_{expected_b_num:03d}{orig_ext}")
-                        with open(path, 'wb') as f:
-                            f.write(file_bytes)
-
-                        images_by_shot[raw_id]['B'] = {
-                            'path': path,
-                            'bytes': file_bytes,
-                            'file_num': expected_b_num,
-                            'original_name': file.name
-                        }
-                        shot_images.append(f"{file.name} (B)")
-                    else:
-                        shot_images.append(f"{expected_b_num:03d}.jpg 없음 (B)")
-
-                    # 로그 기록
-                    mapping_log.append(f"씬 {raw_id}: {' + '.join(shot_images)}")
-
+        # 업로드 증분 반영 (고정 번호 매핑, 밀림 방지)
+        # 규칙: 파일명 번호로 고정 매핑 (순서 상관없음)
+        # 씬 1-1 (idx 0): 001.jpg (A), 002.jpg (B)
+        # 씬 1-2 (idx 1): 003.jpg (A), 004.jpg (B)
+        # 처음 보는 업로드만 저장(병렬) → 해당 번호 슬롯만 갱신
+        # 업로드 파일은 디스크 저장소에만 보관 (세션에는 경로/해시만)
+        if uploaded_files or st.session_state.get('ingested_uploads'):
+            ingested, added, removed = ingest_uploads(
+                [(f.file_id, f.name, f.getbuffer()) for f in uploaded_files or []],
+                st.session_state.get('ingested_uploads'),
+                store_dir=st.session_state.workspace['images']
+            )
+            st.session_state.ingested_uploads = ingested
+
+            if added or removed:
+                # 같은 번호가 여러 개면 나중 업로드 사용
+                files_by_number = {info['file_num']: info for info in ingested.values()}
+                images_by_shot = st.session_state.get('images_by_shot') or {}
+                mapping_log = update_numbered_slots(
+                    images_by_shot, scenes, files_by_number,
+                    [info['file_num'] for info in added + removed],
+                    stale_hashes={info['hash'] for info in removed}
+                )
                 st.session_state.images_by_shot = images_by_shot
-                st.session_state.uploaded_file_hash = hash(str([f.name for f in sorted_files]))
-
-                images_by_shot = st.session_state.images_by_shot
-
-                # 매칭 상태 표시
-                total_mapped = sum(1 for shot in images_by_shot.values() for key in shot.keys())
-                st.success(f"✅ {len(sorted_files)}장 업로드 → {total_mapped}개 이미지 매핑됨 (A+B 합계)")
+                refresh_duplicate_slots()
+
+                # 새 파일 썸네일만 생성 (병렬, 해시 기준 캐시)
+                ensure_thumbnails(added)
+
+                st.session_state.upload_summary = {
+                    'added': len(added),
+                    'removed': len(removed),
+                    'total': len(ingested),
+                    'mapping_log': mapping_log[:10]
+                }
+
+        summary = st.session_state.get('upload_summary')
+        if uploaded_files and summary:
+            total_mapped = sum(len(shot) for shot in st.session_state.get('images_by_shot', {}).values())
+            st.success(
+                f"✅ 업로드 {summary['total']}장 (새로 저장 {summary['added']}장, 제외 {summary['removed']}장) "
+                f"→ {total_mapped}개 이미지 매핑됨 (A+B 합계)"
+            )
+            with st.expander("📋 이번 업로드로 바뀐 슬롯 (처음 10개)", expanded=True):
+                for log_line in summary['mapping_log']:
+                    st.caption(log_line)
+
+        # ZIP/TAR 일괄 업로드 (수백 장을 한 파일로 - 항목을 디스크로 바로 스트리밍)
+        archive_file = st.file_uploader(
+            "또는 번호 파일(001.jpg, 002.png, 003.mp4 ...)을 묶은 ZIP/TAR 업로드",
+            type=['zip', 'tar', 'gz', 'tgz'],
+            key=f"archive_uploader_{st.session_state.uploader_key}"
+        )
 
-                # 매핑 상세 로그 (처음 10개만)
-                with st.expander("📋 이미지 매핑 상세 (처음 10개 씬)", expanded=True):
-                    for log_line in mapping_log[:10]:
-                        st.caption(log_line)
-            
-            
+        if archive_file and st.session_state.get('archive_file_id') != archive_file.file_id:
+            with st.spinner("압축 파일 저장 중..."):
+                try:
+                    ingest = ingest_archive(archive_file, archive_file.name, st.session_state.workspace['images'])
+                except (zipfile.BadZipFile, tarfile.TarError) as e:
+                    st.error(f"❌ 압축 파일을 읽을 수 없습니다: {e}")
+                    ingest = None
+
+            if ingest:
+                files_by_number = ingest['files_by_number']
+                images_by_shot, mapping_log = assign_numbered_files(
+                    scenes, files_by_number, st.session_state.get('images_by_shot')
+                )
+                st.session_state.images_by_shot = images_by_shot
+                refresh_duplicate_slots()
+                ensure_thumbnails(list(files_by_number.values()))
+
+                missing, unmapped = find_mapping_gaps(files_by_number.keys(), len(scenes))
+                st.session_state.archive_report = {
+                    'name': archive_file.name,
+                    'count': len(files_by_number),
+                    'mb': ingest['bytes'] / 1024 / 1024,
+                    'elapsed': ingest['elapsed'],
+                    'missing': missing,
+                    'unmapped': unmapped,
+                    'skipped': ingest['skipped'],
+                    'duplicates': ingest['duplicates'],
+                    'mapping_log': mapping_log[:10]
+                }
+            st.session_state.archive_file_id = archive_file.file_id
+
+        report = st.session_state.get('archive_report')
+        if archive_file and report:
+            st.success(
+                f"✅ {report['name']}: {report['count']}개 파일 저장 "
+                f"({report['mb']:.1f}MB, {report['elapsed']:.1f}초)"
+            )
+            if report['missing']:
+                st.warning(f"⚠️ 없는 번호 {len(report['missing'])}개: {format_number_ranges(report['missing'])}")
+            if report['unmapped']:
+                st.warning(f"⚠️ 씬 범위를 벗어난 번호 {len(report['unmapped'])}개: {format_number_ranges(report['unmapped'])}")
+            if report['duplicates']:
+                st.warning(f"⚠️ 번호 중복 (나중 파일 사용): {', '.join(report['duplicates'][:10])}")
+            if report['skipped']:
+                st.caption(f"번호 없는 파일 {len(report['skipped'])}개 제외: {', '.join(report['skipped'][:10])}")
+            with st.expander("📋 압축 파일 매핑 상세 (처음 10개 씬)"):
+                for log_line in report['mapping_log']:
+                    st.caption(log_line)
+
+        if st.session_state.get('images_by_shot'):
             st.markdown("---")
             st.markdown("**씬 단위 이미지 선택** (기본: A 선택)")
 
@@ -731,266 +976,37 @@ def main():
             if 'selected_images' not in st.session_state:
                 st.session_state.selected_images = {}
 
-            # session state에서 images_by_shot 가져오기
-            images_by_shot = st.session_state.get('images_by_shot', {})
-            output_dir = os.path.join(os.path.dirname(__file__), "outputs", "images")
-            os.makedirs(output_dir, exist_ok=True)
-
-            for idx, scene in enumerate(scenes):
-                raw_id = scene['raw_id']
-
-                # 해당 씬의 이미지 정보 가져오기
-                shot_images = images_by_shot.get(raw_id, {})
-                has_a = 'A' in shot_images
-                has_b = 'B' in shot_images
-                has_any = has_a or has_b
-
-                # 기본 선택: A (또는 B만 있으면 B)
-                if raw_id not in st.session_state.selected_images:
-                    if has_a:
-                        st.session_state.selected_images[raw_id] = 'A'
-                    elif has_b:
-                        st.session_state.selected_images[raw_id] = 'B'
+            # 중복 의심 이미지 (지각 해시가 가까운 슬롯, 이미지 구성이 바뀔 때 계산해 둔 결과)
+            duplicate_slots = st.session_state.get('duplicate_slots', {})
+            if duplicate_slots:
+                st.info(
+                    f"♻️ 눈으로 같은 이미지로 보이는 슬롯 {len(duplicate_slots)}개가 있습니다 "
+                    f"(카드에 '중복 의심' 표시). Step 3에서 '중복 이미지 합치기'를 켜면 미디어 1개로 패키징됩니다."
+                )
+
+            # 페이지 단위로 씬 카드 표시 (씬이 많아도 클릭당 렌더링 비용 일정)
+            page_cols = st.columns([1, 1, 2])
+            with page_cols[0]:
+                page_size = st.selectbox("페이지당 씬 수", SCENE_PAGE_SIZES, index=1, key="scene_page_size")
+            total_pages = max(1, (len(scenes) + page_size - 1) // page_size)
+            with page_cols[1]:
+                page = st.number_input("페이지", min_value=1, max_value=total_pages, value=1, step=1, key="scene_page")
+            with page_cols[2]:
+                page_start = (page - 1) * page_size
+                page_end = min(page_start + page_size, len(scenes))
+                st.session_state.scene_page_ids = {scenes[i]['raw_id'] for i in range(page_start, page_end)}
+                st.caption(f"씬 {page_start + 1}~{page_end} / 총 {len(scenes)}개 ({page}/{total_pages} 페이지)")
+
+            for idx in range(page_start, page_end):
+                render_scene_card(idx, scenes[idx])
 
-                # Expander 제목
-                expander_title = f"**씬 {raw_id}**: {scene['text'][:40]}..."
-                if not has_any:
-                    expander_title += " ⚠️ 이미지 없음"
-
-                with st.expander(expander_title, expanded=(idx < 2)):
-                    # 이 씬에 필요한 파일 번호 계산
-                    expected_a_num = idx * 2 + 1
-                    expected_b_num = idx * 2 + 2
-                    expected_a_name = f"{expected_a_num:03d}.jpg"
-                    expected_b_name = f"{expected_b_num:03d}.jpg"
-
-                    # 상단: 대본 표시
-                    st.markdown(f"**📝 한글 대본:**")
-                    if scene['text'] and scene['text'].strip():
-                        st.text(scene['text'][:200] + ("..." if len(scene['text']) > 200 else ""))
-                    else:
-                        st.warning("(대본 없음)")
-
-                    # 필요한 이미지 파일명 안내
-                    st.caption(f"📌 필요한 이미지: **{expected_a_name}** (A), **{expected_b_name}** (B)")
-                    st.markdown("---")
-
-                    # 이미지 표시 영역
-                    if has_any:
-                        # A, B 이미지를 가로로 배치
-                        cols = st.columns(2)
-
-                        # A 이미지/영상
-                        with cols[0]:
-                            if has_a:
-                                # mp4인 경우 st.video(), 이미지인 경우 st.image()
-                                if shot_images['A']['original_name'].lower().endswith('.mp4'):
-                                    st.video(shot_images['A']['bytes'])
-                                else:
-                                    st.image(shot_images['A']['bytes'], use_container_width=True)
-                                st.caption(f"📁 {shot_images['A']['original_name']}")
-
-                                # 라디오 버튼 + 교체 버튼을 한 줄로
-                                btn_cols = st.columns([1, 1])
-                                with btn_cols[0]:
-                                    if st.button("⭐ A 선택", key=f"select_a_{raw_id}", use_container_width=True,
-                                                type="primary" if st.session_state.selected_images.get(raw_id) == 'A' else "secondary"):
-                                        st.session_state.selected_images[raw_id] = 'A'
-                                        st.rerun()
-                                with btn_cols[1]:
-                                    if st.button("🔄 교체", key=f"replace_a_{raw_id}", use_container_width=True):
-                                        st.session_state.replace_mode[raw_id] = 'A'
-                                        st.rerun()
-
-                                # 교체 모드
-                                if st.session_state.replace_mode.get(raw_id) == 'A':
-                                    new_img = st.file_uploader(
-                                        "새 이미지/영상 A 선택",
-                                        type=['png', 'jpg', 'jpeg', 'mp4'],
-                                        key=f"upload_a_{raw_id}"
-                                    )
-                                    if new_img:
-                                        new_bytes = new_img.read()
-                                        new_path = shot_images['A']['path']
-                                        with open(new_path, 'wb') as f:
-                                            f.write(new_bytes)
-
-                                        images_by_shot[raw_id]['A']['bytes'] = new_bytes
-                                        images_by_shot[raw_id]['A']['original_name'] = new_img.name
-                                        st.session_state.images_by_shot = images_by_shot
-                                        st.session_state.replace_mode[raw_id] = None
-                                        st.success("✅ A 교체 완료!")
-                                        st.rerun()
-                            else:
-                                st.warning(f"⚠️ **{expected_a_name}** 파일이 없습니다")
-                                new_img_a = st.file_uploader(
-                                    f"{expected_a_name} 업로드",
-                                    type=['png', 'jpg', 'jpeg', 'mp4'],
-                                    key=f"new_upload_a_{raw_id}"
-                                )
-                                if new_img_a:
-                                    new_bytes = new_img_a.read()
-                                    # 원본 파일 확장자 유지
-                                    orig_ext = os.path.splitext(new_img_a.name)[1].lower()
-                                    if orig_ext not in ['.png', '.jpg', '.jpeg', '.mp4']:
-                                        orig_ext = '.png'
-                                    new_path = os.path.join(output_dir, f"img_{raw_id}_A{orig_ext}")
-                                    with open(new_path, 'wb') as f:
-                                        f.write(new_bytes)
-
-                                    images_by_shot[raw_id]['A'] = {
-                                        'path': new_path,
-                                        'bytes': new_bytes,
-                                        'file_num': 0,
-                                        'original_name': new_img_a.name
-                                    }
-                                    st.session_state.images_by_shot = images_by_shot
-                                    st.success("✅ A 업로드 완료!")
-                                    st.rerun()
-
-                        # B 이미지/영상
-                        with cols[1]:
-                            if has_b:
-                                # mp4인 경우 st.video(), 이미지인 경우 st.image()
-                                if shot_images['B']['original_name'].lower().endswith('.mp4'):
-                                    st.video(shot_images['B']['bytes'])
-                                else:
-                                    st.image(shot_images['B']['bytes'], use_container_width=True)
-                                st.caption(f"📁 {shot_images['B']['original_name']}")
-
-                                # 라디오 버튼 + 교체 버튼을 한 줄로
-                                btn_cols = st.columns([1, 1])
-                                with btn_cols[0]:
-                                    if st.button("⭐ B 선택", key=f"select_b_{raw_id}", use_container_width=True,
-                                                type="primary" if st.session_state.selected_images.get(raw_id) == 'B' else "secondary"):
-                                        st.session_state.selected_images[raw_id] = 'B'
-                                        st.rerun()
-                                with btn_cols[1]:
-                                    if st.button("🔄 교체", key=f"replace_b_{raw_id}", use_container_width=True):
-                                        st.session_state.replace_mode[raw_id] = 'B'
-                                        st.rerun()
-
-                                # 교체 모드
-                                if st.session_state.replace_mode.get(raw_id) == 'B':
-                                    new_img = st.file_uploader(
-                                        "새 이미지/영상 B 선택",
-                                        type=['png', 'jpg', 'jpeg', 'mp4'],
-                                        key=f"upload_b_{raw_id}"
-                                    )
-                                    if new_img:
-                                        new_bytes = new_img.read()
-                                        new_path = shot_images['B']['path']
-                                        with open(new_path, 'wb') as f:
-                                            f.write(new_bytes)
-
-                                        images_by_shot[raw_id]['B']['bytes'] = new_bytes
-                                        images_by_shot[raw_id]['B']['original_name'] = new_img.name
-                                        st.session_state.images_by_shot = images_by_shot
-                                        st.session_state.replace_mode[raw_id] = None
-                                        st.success("✅ B 교체 완료!")
-                                        st.rerun()
-                            else:
-                                st.warning(f"⚠️ **{expected_b_name}** 파일이 없습니다")
-                                new_img_b = st.file_uploader(
-                                    f"{expected_b_name} 업로드",
-                                    type=['png', 'jpg', 'jpeg', 'mp4'],
-                                    key=f"new_upload_b_{raw_id}"
-                                )
-                                if new_img_b:
-                                    new_bytes = new_img_b.read()
-                                    # 원본 파일 확장자 유지
-                                    orig_ext = os.path.splitext(new_img_b.name)[1].lower()
-                                    if orig_ext not in ['.png', '.jpg', '.jpeg', '.mp4']:
-                                        orig_ext = '.png'
-                                    new_path = os.path.join(output_dir, f"img_{raw_id}_B{orig_ext}")
-                                    with open(new_path, 'wb') as f:
-                                        f.write(new_bytes)
-
-                                    images_by_shot[raw_id]['B'] = {
-                                        'path': new_path,
-                                        'bytes': new_bytes,
-                                        'file_num': 0,
-                                        'original_name': new_img_b.name
-                                    }
-                                    st.session_state.images_by_shot = images_by_shot
-                                    st.success("✅ B 업로드 완료!")
-                                    st.rerun()
-                    else:
-                        # 이미지가 하나도 없을 때
-                        st.error(f"⚠️ **{expected_a_name}**, **{expected_b_name}** 파일이 없습니다. 아래에서 업로드하세요.")
-                        cols = st.columns(2)
-
-                        with cols[0]:
-                            st.markdown(f"**이미지 A ({expected_a_name})**")
-                            new_img_a = st.file_uploader(
-                                f"{expected_a_name} 업로드",
-                                type=['png', 'jpg', 'jpeg', 'mp4'],
-                                key=f"empty_upload_a_{raw_id}",
-                                label_visibility="collapsed"
-                            )
-                            if new_img_a:
-                                new_bytes = new_img_a.read()
-                                # 원본 파일 확장자 유지
-                                orig_ext = os.path.splitext(new_img_a.name)[1].lower()
-                                if orig_ext not in ['.png', '.jpg', '.jpeg', '.mp4']:
-                                    orig_ext = '.png'
-                                new_path = os.path.join(output_dir, f"img_{raw_id}_A{orig_ext}")
-                                with open(new_path, 'wb') as f:
-                                    f.write(new_bytes)
-
-                                if raw_id not in images_by_shot:
-                                    images_by_shot[raw_id] = {}
-
-                                images_by_shot[raw_id]['A'] = {
-                                    'path': new_path,
-                                    'bytes': new_bytes,
-                                    'file_num': 0,
-                                    'original_name': new_img_a.name
-                                }
-                                st.session_state.images_by_shot = images_by_shot
-                                st.session_state.selected_images[raw_id] = 'A'
-                                st.success("✅ A 업로드 완료!")
-                                st.rerun()
-
-                        with cols[1]:
-                            st.markdown(f"**이미지 B ({expected_b_name})**")
-                            new_img_b = st.file_uploader(
-                                f"{expected_b_name} 업로드",
-                                type=['png', 'jpg', 'jpeg', 'mp4'],
-                                key=f"empty_upload_b_{raw_id}",
-                                label_visibility="collapsed"
-                            )
-                            if new_img_b:
-                                new_bytes = new_img_b.read()
-                                # 원본 파일 확장자 유지
-                                orig_ext = os.path.splitext(new_img_b.name)[1].lower()
-                                if orig_ext not in ['.png', '.jpg', '.jpeg', '.mp4']:
-                                    orig_ext = '.png'
-                                new_path = os.path.join(output_dir, f"img_{raw_id}_B{orig_ext}")
-                                with open(new_path, 'wb') as f:
-                                    f.write(new_bytes)
-
-                                if raw_id not in images_by_shot:
-                                    images_by_shot[raw_id] = {}
-
-                                images_by_shot[raw_id]['B'] = {
-                                    'path': new_path,
-                                    'bytes': new_bytes,
-                                    'file_num': 0,
-                                    'original_name': new_img_b.name
-                                }
-                                st.session_state.images_by_shot = images_by_shot
-                                if raw_id not in st.session_state.selected_images:
-                                    st.session_state.selected_images[raw_id] = 'B'
-                                st.success("✅ B 업로드 완료!")
-                                st.rerun()
-            
             st.markdown("---")
             
             # 하단 네비게이션 버튼
             c1, c2, c3 = st.columns(3)
             with c1:
                 if st.button("🏠 처음으로", key="reset_bottom", use_container_width=True):
+                    stop_candidate_generation()
                     for key in list(st.session_state.keys()):
                         del st.session_state[key]
                     st.rerun()
@@ -1006,6 +1022,7 @@ def main():
     # ==================== STEP 3 ====================
     elif st.session_state.step == 3:
         clips = st.session_state.clips
+        clip_index = st.session_state.clip_index
         scenes = st.session_state.scenes
         images_by_shot = st.session_state.get('images_by_shot', {})
         selected = st.session_state.selected_images
@@ -1018,6 +1035,7 @@ def main():
             return
         
         st.markdown("### 📦 Vrew 파일 생성")
+        ensure_job_workers()
         
         col1, col2 = st.columns([2, 1])
         
@@ -1050,16 +1068,7 @@ def main():
             
             # 분할 미리보기
             split_size = st.session_state.get('split_size', 10)
-            parts = []
-
-            if split_size == 0:  # 전체
-                parts.append((0, total_shots - 1))
-            else:
-                # 씬 인덱스 기반으로 청크 나눔
-                for i in range(0, total_shots, split_size):
-                    start_idx = i
-                    end_idx = min(i + split_size - 1, total_shots - 1)
-                    parts.append((start_idx, end_idx))
+            parts = split_scene_ranges(total_shots, split_size)
 
             if split_size == 0:
                 st.info(f"**전체** → 1개 파일 생성")
@@ -1072,6 +1081,18 @@ def main():
                     first_shot = scenes[start_idx]['raw_id']
                     last_shot = scenes[end_idx]['raw_id']
                     st.caption(f"장면 {idx+1}: {first_shot} ~ {last_shot} (총 {len(shots_in_range)}씬)")
+
+            st.checkbox(
+                "🗜️ 이미지 정규화 (1920×1080 JPEG로 변환해 파일 크기 줄이기)",
+                key='normalize_images',
+                help="4K PNG 등 큰 이미지를 화면 크기에 맞춰 자르고 JPEG로 변환합니다. 투명 배경이 있는 이미지는 PNG로 유지됩니다."
+            )
+            st.checkbox(
+                "♻️ 중복 이미지 합치기 (눈으로 같은 이미지는 미디어 1개만 넣기)",
+                value=True,
+                key='dedupe_images',
+                help="다시 생성했거나 이름만 바꾼 같은 이미지를 지각 해시로 찾아 하나의 미디어로 공유합니다."
+            )
             
             st.markdown("---")
             
@@ -1090,7 +1111,8 @@ def main():
                 if button_disabled:
                     st.error("🎫 크레딧이 부족합니다. 관리자에게 문의하세요.")
 
-                if st.button("🎬 모든 Vrew 파일 생성 (크레딧 차감)", type="primary", use_container_width=True, disabled=button_disabled):
+                job_active = bool(st.session_state.get('vrew_job_id'))
+                if st.button("🎬 모든 Vrew 파일 생성 (크레딧 차감)", type="primary", use_container_width=True, disabled=button_disabled or job_active):
                     # 크레딧 차감
                     user = get_current_user()
                     user_id = user.get("id") if user else None
@@ -1103,112 +1125,60 @@ def main():
                     new_credits = current_credits - 1
                     st.session_state["credits"] = new_credits
 
-                    with st.spinner("Vrew 파일 생성 중..."):
-                        try:
-                            from modules.vrew_creator import create_vrew_project
-                            
-                            # 대본 파일명 가져오기
-                            script_name = st.session_state.get('script_filename', 'vrew')
-                            split_size = st.session_state.get('split_size', 10)
-
-                            # 씬 인덱스 범위 계산
-                            total_shots = len(scenes)
-                            parts = []
-
-                            if split_size == 0:  # 전체
-                                parts.append((0, total_shots - 1))
-                            else:
-                                for i in range(0, total_shots, split_size):
-                                    start_idx = i
-                                    end_idx = min(i + split_size - 1, total_shots - 1)
-                                    parts.append((start_idx, end_idx))
-                            
-                            template_path = os.path.join(os.path.dirname(__file__), "templates", "TEMPLATE.vrew")
-                            output_dir = os.path.join(os.path.dirname(__file__), "outputs")
-                            os.makedirs(output_dir, exist_ok=True)
-                            
-                            # 각 범위별로 파일 생성
-                            generated_files = []
-                            
-                            for part_idx, (start_idx, end_idx) in enumerate(parts):
-                                # 해당 범위의 clips 필터링
-                                part_images = []
-                                part_captions = []
-
-                                # 1. 이 범위(씬 인덱스 start_idx~end_idx)에 해당하는 씬들을 슬라이싱
-                                target_shots = scenes[start_idx:end_idx+1]
-
-                                # 2. 각 씬(raw_id)에 대해 루프
-                                for shot in target_shots:
-                                    raw_id = shot['raw_id']
-
-                                    # 해당 씬의 클립들 가져오기
-                                    shot_clips = [c for c in clips if c['raw_id'] == raw_id]
-
-                                    # 해당 씬의 선택된 이미지 가져오기
-                                    if raw_id in images_by_shot:
-                                        # 선택된 이미지 (A 또는 B)
-                                        selected_img = st.session_state.selected_images.get(raw_id, 'A')
-
-                                        # 선택된 이미지가 실제로 존재하는지 확인
-                                        if selected_img in images_by_shot[raw_id]:
-                                            img_path = images_by_shot[raw_id][selected_img]['path']
-                                        else:
-                                            # 선택된 이미지가 없으면 A 또는 B 중 존재하는 것 사용
-                                            if 'A' in images_by_shot[raw_id]:
-                                                img_path = images_by_shot[raw_id]['A']['path']
-                                            elif 'B' in images_by_shot[raw_id]:
-                                                img_path = images_by_shot[raw_id]['B']['path']
-                                            else:
-                                                continue  # 이미지가 아예 없으면 스킵
-
-                                        for clip in shot_clips:
-                                            part_images.append(img_path)
-                                            part_captions.append(clip['text'])
-                                
-                                # 파일명: 대본명_장면N.vrew
-                                first_shot = target_shots[0]['raw_id']
-                                last_shot = target_shots[-1]['raw_id']
-                                output_filename = f"{script_name}_장면{part_idx+1}.vrew"
-                                output_path = os.path.join(output_dir, output_filename)
-
-                                # 오버레이 로고 경로
-                                overlay_logo = st.session_state.get('overlay_logo_path')
-
-                                create_vrew_project(
-                                    template_path=template_path,
-                                    images=part_images,
-                                    captions=part_captions,
-                                    output_path=output_path,
-                                    overlay_logo=overlay_logo
-                                )
-
-                                generated_files.append({
-                                    'path': output_path,
-                                    'filename': output_filename,
-                                    'range': f"씬 {first_shot} ~ {last_shot}"
-                                })
-                            
-                            st.session_state.generated_vrew_files = generated_files
-                            st.success(f"✅ {len(generated_files)}개 Vrew 파일 생성 완료!")
-
-                            # 크레딧 0회 시 메시지 표시 (파일 생성 완료 후)
-                            if new_credits <= 0:
-                                st.session_state["logout_after_download"] = True
-                                st.warning("🎫 크레딧이 모두 소진되었습니다. 파일 다운로드 후 로그아웃됩니다.")
-
-                            st.rerun()
-                        
-                        except Exception as e:
-                            st.error(f"오류: {e}")
-                            import traceback
-                            st.code(traceback.format_exc())
+                    # 빌드 작업 등록 (워커 프로세스에서 실행, 이 페이지는 상태만 폴링)
+                    payload = {
+                        'scenes': scenes,
+                        'clips': clips,
+                        'clip_index': clip_index,
+                        'images_by_shot': images_by_shot,
+                        'selected_images': st.session_state.selected_images,
+                        'split_size': st.session_state.get('split_size', 10),
+                        'script_name': st.session_state.get('script_filename', 'vrew'),
+                        'output_dir': st.session_state.workspace['vrew'],
+                        'template_path': os.path.join(os.path.dirname(__file__), "templates", "TEMPLATE.vrew"),
+                        'overlay_logo': st.session_state.get('overlay_logo_path'),
+                        'normalize': st.session_state.get('normalize_images', False),
+                        'dedupe': st.session_state.get('dedupe_images', True)
+                    }
+                    st.session_state.vrew_job_id = submit_job(user_id, payload)
+                    # 취소/실패 시 환불할 작업 (완료되면 그대로 차감)
+                    st.session_state.vrew_job_charged = st.session_state.vrew_job_id
+                    st.session_state.vrew_job_refunded = False
+                    st.session_state.vrew_job_error = None
+                    st.session_state.vrew_job_cancelled = False
+                    st.session_state.generated_vrew_files = []
+                    st.session_state.generated_vrew_archive = None
+                    st.session_state.generated_vrew_normalize = None
+                    st.session_state.generated_vrew_dedupe = None
+
+                    # 크레딧 0회 시 다운로드 후 로그아웃
+                    if new_credits <= 0:
+                        st.session_state["logout_after_download"] = True
+
+                    st.rerun()
+
+            # 생성 작업 진행 상황 (1초마다 이 영역만 갱신)
+            if st.session_state.get('vrew_job_id'):
+                render_vrew_job_status(st.session_state.vrew_job_id)
+            elif st.session_state.get('vrew_job_cancelled'):
+                st.warning("⏹ 생성이 취소되었습니다. 생성 중이던 파일은 삭제되었습니다.")
+            elif st.session_state.get('vrew_job_error'):
+                job_error = st.session_state.vrew_job_error
+                st.error(f"오류: {job_error.splitlines()[0]}")
+                st.code(job_error)
+            if not st.session_state.get('vrew_job_id') and st.session_state.get('vrew_job_refunded'):
+                st.caption("🎫 차감된 크레딧 1회를 환불했습니다")
             
             # 생성된 파일 다운로드 UI
             if 'generated_vrew_files' in st.session_state and st.session_state.generated_vrew_files:
                 st.markdown("---")
                 st.markdown("### 📥 생성된 파일")
 
+                if st.session_state.get('generated_vrew_dedupe'):
+                    st.caption(f"♻️ {format_dedupe_report(st.session_state.generated_vrew_dedupe)}")
+                if st.session_state.get('generated_vrew_normalize'):
+                    st.caption(f"🗜️ {format_normalize_report(st.session_state.generated_vrew_normalize)}")
+
                 # 파일이 여러 개일 때만 개별 다운로드 버튼 표시
                 if len(st.session_state.generated_vrew_files) > 1:
                     for file_info in st.session_state.generated_vrew_files:
@@ -1219,15 +1189,14 @@ def main():
                             st.caption(f"({file_info['range']})")
 
                         with col_btn:
-                            with open(file_info['path'], 'rb') as f:
-                                st.download_button(
-                                    "📥",
-                                    data=f,
-                                    file_name=file_info['filename'],
-                                    mime="application/zip",
-                                    use_container_width=True,
-                                    key=f"download_{file_info['filename']}"
-                                )
+                            st.download_button(
+                                "📥",
+                                data=read_file_on_click(file_info['path']),
+                                file_name=file_info['filename'],
+                                mime="application/zip",
+                                use_container_width=True,
+                                key=f"download_{file_info['filename']}"
+                            )
                     st.markdown("---")
                 else:
                     # 파일 1개: 파일명만 표시
@@ -1240,34 +1209,30 @@ def main():
                 if len(st.session_state.generated_vrew_files) == 1:
                     # 파일 1개: 직접 다운로드 (.vrew)
                     file_info = st.session_state.generated_vrew_files[0]
-                    with open(file_info['path'], 'rb') as f:
-                        st.download_button(
-                            "📥 다운로드",
-                            data=f,
-                            file_name=file_info['filename'],
-                            mime="application/zip",
-                            use_container_width=True,
-                            type="primary",
-                            key="download_single_file"
-                        )
-                else:
-                    # 파일 여러 개: ZIP으로 묶기
-                    all_files_zip = io.BytesIO()
-                    with zipfile.ZipFile(all_files_zip, 'w', zipfile.ZIP_STORED) as zf:
-                        for file_info in st.session_state.generated_vrew_files:
-                            if os.path.exists(file_info['path']):
-                                zf.write(file_info['path'], file_info['filename'])
-                    all_files_zip.seek(0)
-
                     st.download_button(
-                        "📦 전체 다운로드 (ZIP)",
-                        data=all_files_zip,
-                        file_name=f"{script_name}_전체.zip",
+                        "📥 다운로드",
+                        data=read_file_on_click(file_info['path']),
+                        file_name=file_info['filename'],
                         mime="application/zip",
                         use_container_width=True,
                         type="primary",
-                        key="download_all_files"
+                        key="download_single_file"
                     )
+                else:
+                    # 파일 여러 개: 작업 완료 시 만들어 둔 ZIP 사용
+                    archive_path = st.session_state.get('generated_vrew_archive')
+                    if archive_path and os.path.exists(archive_path):
+                        st.download_button(
+                            "📦 전체 다운로드 (ZIP)",
+                            data=read_file_on_click(archive_path),
+                            file_name=f"{script_name}_전체.zip",
+                            mime="application/zip",
+                            use_container_width=True,
+                            type="primary",
+                            key="download_all_files"
+                        )
+                    else:
+                        st.warning("전체 ZIP 파일이 없습니다. 개별 파일을 다운로드해주세요.")
 
                 # 크레딧 소진 시 알림
                 if st.session_state.get("logout_after_download"):
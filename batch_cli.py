@@ -0,0 +1,215 @@
+"""
+엔라이트랩 Vrew 자동화 - 배치 모드 (Streamlit 없이 Step 1~3 실행)
+
+단일 에피소드:
+    python batch_cli.py --script 대본.txt --sheet 씬정보.xlsx --images ./images --split 10 --logo logo.png
+
+이미지 정규화 (1920x1080 JPEG로 변환 후 패키징, 절감 용량 출력):
+    python batch_cli.py ... --normalize
+
+중복 이미지 합치기 (지각 해시가 같은 이미지는 미디어 1개로 패키징):
+    python batch_cli.py ... --dedupe
+
+여러 에피소드 (매니페스트, 워커 풀 병렬 처리):
+    python batch_cli.py --manifest episodes.csv --workers 4
+
+매니페스트 형식 (CSV 헤더 또는 JSON 객체 리스트):
+    script, sheet, images, split(선택), logo(선택), name(선택)
+    - 상대 경로는 매니페스트 파일 위치 기준
+    - images 폴더 파일명 규칙: 씬 idx → 001(A)/002(B), 003(A)/004(B) ...
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.script_parser import (
+    parse_excel, read_scene_sheet, split_script_by_markers, create_clips, build_clip_index
+)
+from modules.image_normalizer import prune_normalize_cache
+from modules.media_mapper import map_image_folder
+from modules.vrew_builder import build_vrew_parts
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TEMPLATE = os.path.join(BASE_DIR, "templates", "TEMPLATE.vrew")
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "outputs", "batch")
+
+
+def run_episode(episode, template_path=DEFAULT_TEMPLATE, output_dir=DEFAULT_OUTPUT_DIR, normalize=False, dedupe=False):
+    """
+    에피소드 1개 처리: parse_excel → split_script_by_markers → create_clips → create_vrew_project
+
+    Args:
+        episode: {'script', 'sheet', 'images', 'split', 'logo', 'name'}
+        normalize: 이미지 정규화 후 패키징
+        dedupe: 중복 이미지를 미디어 1개로 합침
+
+    Returns:
+        {'name', 'success', 'files', 'scenes', 'clips', 'elapsed', 'error', 'normalize', 'dedupe'}
+    """
+    start_time = time.time()
+    name = episode.get('name') or os.path.splitext(os.path.basename(episode['script']))[0]
+    result = {'name': name, 'success': False, 'files': [], 'scenes': 0, 'clips': 0, 'elapsed': 0, 'error': None,
+              'normalize': None, 'dedupe': None}
+    last_event = {}
+
+    try:
+        # Step 1: 대본 + 씬 정보 → 씬/클립
+        with open(episode['script'], 'rb') as f:
+            script_text = f.read().decode('utf-8')
+        with open(episode['sheet'], 'rb') as f:
+            df = read_scene_sheet(f.read(), episode['sheet'])
+        if df is None:
+            raise ValueError(f"씬 정보 파일을 읽을 수 없습니다: {episode['sheet']}")
+
+        markers = parse_excel(df)
+        scenes = split_script_by_markers(script_text, markers)
+        clips = list(create_clips(scenes))
+        clip_index = build_clip_index(clips, len(scenes))
+        if not scenes:
+            raise ValueError("씬 정보가 없습니다")
+
+        # Step 2: 이미지 폴더 → 씬 A/B 매핑 (선택: A, 없으면 B)
+        images_by_shot, _ = map_image_folder(episode['images'], scenes)
+
+        # Step 3: 범위별 .vrew 생성
+        generated_files = build_vrew_parts(
+            scenes=scenes,
+            clips=clips,
+            clip_index=clip_index,
+            images_by_shot=images_by_shot,
+            selected_images={},
+            split_size=int(episode.get('split') or 0),
+            script_name=name,
+            output_dir=output_dir,
+            template_path=template_path,
+            overlay_logo=episode.get('logo') or None,
+            progress_callback=last_event.update,
+            normalize=normalize,
+            dedupe=dedupe
+        )
+
+        result.update(success=True, files=[f['path'] for f in generated_files],
+                      scenes=len(scenes), clips=len(clips), normalize=last_event.get('normalize'), dedupe=last_event.get('dedupe'))
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['elapsed'] = time.time() - start_time
+    return result
+
+
+def load_manifest(manifest_path):
+    """매니페스트(CSV/JSON) 로드 → 에피소드 리스트 (경로는 절대 경로로 변환)"""
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            episodes = json.load(f)
+    else:
+        with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+            episodes = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for episode in episodes:
+        for key in ['script', 'sheet', 'images', 'logo']:
+            if episode.get(key):
+                episode[key] = os.path.join(base_dir, episode[key])
+    return episodes
+
+
+def run_batch(episodes, workers, template_path=DEFAULT_TEMPLATE, output_dir=DEFAULT_OUTPUT_DIR, normalize=False,
+              dedupe=False):
+    """에피소드 목록을 워커 풀에서 병렬 처리 → 결과 리스트 (완료 순)"""
+    results = []
+    total = len(episodes)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_episode, ep, template_path, output_dir, normalize, dedupe) for ep in episodes]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "✅" if result['success'] else f"❌ {result['error']}"
+            print(f"[Batch] ({len(results)}/{total}) {result['name']}: {status} ({result['elapsed']:.1f}초)")
+
+    if normalize:
+        # 모든 에피소드 패키징이 끝난 뒤 정규화 캐시 용량 정리
+        prune_normalize_cache()
+
+    return results
+
+
+def print_summary(results, elapsed):
+    """처리량 요약 출력"""
+    succeeded = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+    total_files = sum(len(r['files']) for r in succeeded)
+    total_clips = sum(r['clips'] for r in succeeded)
+
+    print("\n========== 배치 요약 ==========")
+    print(f"에피소드: {len(succeeded)}개 성공 / {len(failed)}개 실패")
+    print(f"생성 파일: {total_files}개 .vrew | 클립: {total_clips}개")
+    print(f"소요 시간: {elapsed:.1f}초")
+    if elapsed > 0:
+        print(f"처리량: {len(succeeded) / elapsed * 60:.1f} 에피소드/분 | {total_clips / elapsed:.1f} 클립/초")
+    reports = [r['normalize'] for r in succeeded if r['normalize']]
+    if reports:
+        original = sum(report['original_bytes'] for report in reports)
+        saved = sum(report['saved_bytes'] for report in reports)
+        print(f"이미지 정규화: {original / 1024 / 1024:.1f}MB 중 {saved / 1024 / 1024:.1f}MB 절감"
+              f" ({saved / original if original else 0:.0%})")
+    dedupe_reports = [r['dedupe'] for r in succeeded if r['dedupe']]
+    if dedupe_reports:
+        duplicates = sum(report['duplicates'] for report in dedupe_reports)
+        saved = sum(report['saved_bytes'] for report in dedupe_reports)
+        print(f"중복 이미지: {duplicates}개 합침 ({saved / 1024 / 1024:.1f}MB 절감)")
+    for r in failed:
+        print(f"  ❌ {r['name']}: {r['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엔라이트랩 Vrew 자동화 - 배치 모드")
+    parser.add_argument("--script", help="대본 텍스트 파일 (.txt)")
+    parser.add_argument("--sheet", help="씬 정보 파일 (.xlsx/.xls/.csv)")
+    parser.add_argument("--images", help="이미지 폴더 (001/002 번호 규칙)")
+    parser.add_argument("--split", type=int, default=0, help="파일당 씬 개수 (0 = 전체)")
+    parser.add_argument("--logo", help="오버레이 로고 PNG (선택)")
+    parser.add_argument("--name", help="출력 파일명 접두어 (기본: 대본 파일명)")
+    parser.add_argument("--manifest", help="에피소드 매니페스트 (.csv/.json)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="병렬 워커 수")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="TEMPLATE.vrew 경로")
+    parser.add_argument("--normalize", action="store_true", help="이미지를 1920x1080 JPEG로 정규화 후 패키징")
+    parser.add_argument("--dedupe", action="store_true", help="눈으로 같은 이미지는 미디어 1개로 합쳐 패키징")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="출력 폴더")
+    args = parser.parse_args()
+
+    if args.manifest:
+        episodes = load_manifest(args.manifest)
+    elif args.script and args.sheet and args.images:
+        episodes = [{
+            'script': args.script,
+            'sheet': args.sheet,
+            'images': args.images,
+            'split': args.split,
+            'logo': args.logo,
+            'name': args.name
+        }]
+    else:
+        parser.error("--manifest 또는 --script/--sheet/--images 를 지정하세요")
+
+    start_time = time.time()
+    if len(episodes) == 1:
+        results = [run_episode(episodes[0], args.template, args.output, args.normalize, args.dedupe)]
+    else:
+        results = run_batch(episodes, max(1, args.workers), args.template, args.output, args.normalize,
+                            args.dedupe)
+    print_summary(results, time.time() - start_time)
+
+    return 0 if all(r['success'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
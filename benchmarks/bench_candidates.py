@@ -0,0 +1,63 @@
+"""
+Step 2 A/B 후보 생성 벤치마크 (로컬 대역 서버의 Replicate 형식 API)
+- 첫 씬 A/B가 모두 도착한 시각 (검토 시작 가능) / 첫 페이지(10씬) 완성 시각 / 전체 완료 시각
+- 동시 요청 1개(순차)와 4/8개 비교
+실행: python benchmarks/bench_candidates.py [씬 수]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.candidate_generator import apply_candidate_results, drain_candidate_results, start_candidate_generation
+
+FIRST_PAGE = 10
+
+
+def measure(scenes, max_in_flight, seed_offset):
+    """후보 생성 1회 → (첫 씬 완성, 첫 페이지 완성, 전체, 성공 수)"""
+    images_by_shot = {}
+    first_scene = first_page = None
+    page_ids = {scene['raw_id'] for scene in scenes[:FIRST_PAGE]}
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        start = time.perf_counter()
+        state = start_candidate_generation(scenes, store_dir, backend_name='standin-replicate',
+                                           seed_offset=seed_offset, max_in_flight=max_in_flight)
+        while True:
+            finished = state['finished']
+            apply_candidate_results(images_by_shot, drain_candidate_results(state))
+            now = time.perf_counter() - start
+            if first_scene is None and len(images_by_shot.get(scenes[0]['raw_id'], {})) == 2:
+                first_scene = now
+            if first_page is None and all(len(images_by_shot.get(raw_id, {})) == 2 for raw_id in page_ids):
+                first_page = now
+            if finished:
+                break
+            time.sleep(0.05)
+        total = time.perf_counter() - start
+
+    generated = sum(len(shot) for shot in images_by_shot.values())
+    return first_scene, first_page, total, generated
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    scenes = [{'raw_id': f"{i + 1}-1", 'prompt': f"cinematic shot {i}, korean village"} for i in range(count)]
+    print(f"[Bench] 씬 {count}개 → 후보 {count * 2}장 (대역 서버: 예측 1~3초, 초당 8회 제한, 무작위 429 3% / 실패 2%)")
+
+    def fmt(value):
+        return f"{value:5.1f}초" if value is not None else "  미완료"
+
+    for run, max_in_flight in enumerate((1, 4, 8)):
+        # 실행마다 다른 시드 → 디스크 캐시 적중 없이 측정
+        first_scene, first_page, total, generated = measure(scenes, max_in_flight, seed_offset=int(time.time()) + run * 10000)
+        print(f"  동시 {max_in_flight}개: 첫 씬 {fmt(first_scene)} | 첫 {FIRST_PAGE}씬 {fmt(first_page)} | "
+              f"전체 {fmt(total)}  성공 {generated}/{count * 2}")
+
+
+if __name__ == "__main__":
+    main()
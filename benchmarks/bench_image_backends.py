@@ -0,0 +1,49 @@
+"""
+이미지 백엔드 스케줄러 벤치마크 (로컬 대역 서버, 오프라인)
+- 동시 요청 수별 처리량(장/초)과 항목별 소요 시간 분포(p50/p95/p99, 재시도 대기 포함)
+실행: python benchmarks/bench_image_backends.py [이미지 수]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.image_backends import StandinBackend, run_batch
+from modules.standin_server import run_standin_server
+
+
+def percentile(values, q):
+    """단순 백분위 (최근접 순위)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    items = [{'prompt': f"cinematic shot {i}, korean village", 'text': f"장면 {i}", 'seed': i} for i in range(count)]
+
+    print(f"[Bench] 이미지 {count}장 (대역 서버: 지연 0.2~0.6초, 초당 8회 제한, 무작위 429 3% / 500 2%)")
+    print(f"  {'동시':>4} {'속도':>5} | {'시간':>6} {'장/초':>6} | {'p50':>6} {'p95':>6} {'p99':>6} | 시도  429  500  성공")
+
+    with run_standin_server() as (base_url, stats):
+        backend = StandinBackend(base_url)
+        for max_in_flight, rate in ((1, 8.0), (4, 8.0), (8, 8.0), (16, 8.0), (16, 16.0)):
+            stats.update(requests=0, throttled=0, failed=0)
+            with tempfile.TemporaryDirectory() as out:
+                start = time.perf_counter()
+                results = run_batch(backend, items, out, max_in_flight=max_in_flight, rate=rate, burst=int(rate))
+                wall = time.perf_counter() - start
+
+            latencies = [result['elapsed'] for result in results]
+            ok = sum(1 for result in results if result['path'])
+            attempts = sum(result['attempts'] for result in results)
+            print(f"  {max_in_flight:>4} {rate:>5g} | {wall:5.1f}초 {ok / wall:6.1f} | "
+                  f"{percentile(latencies, 50):5.2f}s {percentile(latencies, 95):5.2f}s {percentile(latencies, 99):5.2f}s | "
+                  f"{attempts:>4} {stats['throttled']:>4} {stats['failed']:>4}  {ok}/{count}")
+
+
+if __name__ == "__main__":
+    main()
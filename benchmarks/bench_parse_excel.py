@@ -0,0 +1,100 @@
+"""
+parse_excel / 엑셀 리더 벤치마크
+- 기존 iterrows 파서 vs 벡터화 파서
+- pd.read_excel (전체 로드) vs read_excel_streaming (A~C열 read-only)
+실행: python benchmarks/bench_parse_excel.py [행 수]
+"""
+
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.script_parser import parse_excel, read_excel_streaming
+
+
+def parse_excel_iterrows(df):
+    """기존 구현 (비교 기준) - 행 단위 iterrows 파싱"""
+    data = []
+    for idx, row in df.iterrows():
+        scene_shot_str = str(row.iloc[0]).strip() if len(row) > 0 else ""
+        start_text = str(row.iloc[1]).strip() if len(row) > 1 else ""
+        prompt = str(row.iloc[2]).strip() if len(row) > 2 else ""
+
+        scene_num = -1
+        shot_num = -1
+
+        if '-' in scene_shot_str:
+            try:
+                parts = scene_shot_str.split('-')
+                scene_num = int(parts[0])
+                shot_num = int(parts[1])
+            except:
+                pass
+
+        if start_text and start_text != 'nan' and scene_num > 0:
+            data.append({
+                'scene_num': scene_num,
+                'shot_num': shot_num,
+                'start_text': start_text,
+                'prompt': prompt,
+                'raw_id': scene_shot_str
+            })
+    return data
+
+
+def make_sheet(rows):
+    """테스트용 씬 시트 생성 (빈 행, 잘못된 ID, 추가 열 포함)"""
+    ids, starts, prompts, notes = [], [], [], []
+    for i in range(rows):
+        scene, shot = i // 5 + 1, i % 5 + 1
+        ids.append(f"{scene}-{shot}" if i % 97 else "메모")
+        starts.append(f"{i}번째 장면의 시작 문장입니다" if i % 53 else None)
+        prompts.append(f"cinematic shot {i}, dramatic lighting, korean village")
+        notes.append("비고" * 10)
+    return pd.DataFrame({'씬': ids, '시작문장': starts, '프롬프트': prompts, '비고': notes})
+
+
+def timeit(func, repeat=3):
+    """최소 실행 시간 (초)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    df = make_sheet(rows)
+
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+    xlsx_bytes = buf.getvalue()
+
+    print(f"[Bench] {rows}행 시트 ({len(xlsx_bytes) / 1024:.0f}KB)")
+
+    t_full, df_full = timeit(lambda: pd.read_excel(io.BytesIO(xlsx_bytes)))
+    t_stream, df_stream = timeit(lambda: read_excel_streaming(io.BytesIO(xlsx_bytes)))
+    print(f"  pd.read_excel           : {t_full * 1000:8.1f} ms")
+    print(f"  read_excel_streaming    : {t_stream * 1000:8.1f} ms  (x{t_full / t_stream:.1f})")
+
+    t_old, old = timeit(lambda: parse_excel_iterrows(df_full))
+    t_new, new = timeit(lambda: parse_excel(df_full))
+    print(f"  parse_excel (iterrows)  : {t_old * 1000:8.1f} ms")
+    print(f"  parse_excel (vectorized): {t_new * 1000:8.1f} ms  (x{t_old / t_new:.1f})")
+
+    assert old == new, "벡터화 파서 결과가 기존 구현과 다릅니다"
+    assert parse_excel(df_stream) == old, "스트리밍 리더 결과가 pd.read_excel과 다릅니다"
+    print(f"  결과 일치: {len(new)}개 씬")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+플레이스홀더 이미지 생성 벤치마크
+- 기존 구현: 이미지마다 draw.line 1080회 그라데이션 + 순차 저장
+- 캐시된 NumPy 배경 + 텍스트만 합성 + 프로세스 풀 인코딩
+실행: python benchmarks/bench_placeholder.py [장 수]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.image_generator import generate_placeholder_image, generate_placeholder_images
+
+
+def placeholder_legacy(text, output_path, width=1920, height=1080):
+    """기존 구현 (비교 기준) - 행 단위 draw.line 그라데이션"""
+    img = Image.new('RGB', (width, height), color=(30, 30, 50))
+    draw = ImageDraw.Draw(img)
+    for i in range(height):
+        r = int(30 + (i / height) * 20)
+        g = int(30 + (i / height) * 30)
+        b = int(50 + (i / height) * 40)
+        draw.line([(0, i), (width, i)], fill=(r, g, b))
+    try:
+        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 40)
+    except:
+        font = ImageFont.load_default()
+    y_offset = height // 2 - 25
+    for line in [text] if text else []:
+        bbox = draw.textbbox((0, 0), line, font=font)
+        x = (width - (bbox[2] - bbox[0])) // 2
+        draw.text((x+2, y_offset+2), line, font=font, fill=(0, 0, 0))
+        draw.text((x, y_offset), line, font=font, fill=(255, 255, 255))
+    draw.rectangle([(10, 10), (width-10, height-10)], outline=(100, 100, 150), width=3)
+    img.save(output_path)
+    return output_path
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    texts = [f"Scene {i+1} placeholder" for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as out:
+        # 배경 픽셀이 기존 구현과 같은지 확인 (텍스트 없이)
+        placeholder_legacy("", os.path.join(out, "old.png"))
+        generate_placeholder_image("", os.path.join(out, "new.png"))
+        same = np.array_equal(np.asarray(Image.open(os.path.join(out, "old.png"))),
+                              np.asarray(Image.open(os.path.join(out, "new.png"))))
+
+        print(f"[Bench] 플레이스홀더 {count}장 (1920x1080 PNG), 배경 픽셀 일치: {same}")
+
+        start = time.perf_counter()
+        for i, text in enumerate(texts):
+            placeholder_legacy(text, os.path.join(out, f"old_{i:03d}.png"))
+        t_old = time.perf_counter() - start
+        print(f"  기존 (draw.line + 순차)       : {t_old:6.2f}초")
+
+        start = time.perf_counter()
+        for i, text in enumerate(texts):
+            generate_placeholder_image(text, os.path.join(out, f"seq_{i:03d}.png"))
+        t_seq = time.perf_counter() - start
+        print(f"  캐시 배경 (순차)              : {t_seq:6.2f}초  (x{t_old / t_seq:.1f})")
+
+        start = time.perf_counter()
+        paths = generate_placeholder_images([(text, os.path.join(out, f"new_{i:03d}.png")) for i, text in enumerate(texts)])
+        t_new = time.perf_counter() - start
+        print(f"  캐시 배경 + 프로세스 풀 ({os.cpu_count()}코어): {t_new:6.2f}초  (x{t_old / t_new:.1f}), 성공 {sum(1 for p in paths if p)}/{count}")
+
+
+if __name__ == "__main__":
+    main()
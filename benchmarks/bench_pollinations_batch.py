@@ -0,0 +1,64 @@
+"""
+Pollinations 일괄 생성 벤치마크 (로컬 대역 서버)
+- 기존 방식: 1장씩 순차 요청 + 고정 딜레이
+- 동시 요청 + 토큰 버킷 + 지터 백오프
+실행: python benchmarks/bench_pollinations_batch.py [이미지 수] [기존 방식 딜레이(초)]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.image_generator as image_generator
+from modules import http_client
+from modules.standin_server import run_standin_server
+
+
+def batch_sequential(prompts, output_dir, delay):
+    """기존 구현 (비교 기준) - 순차 요청 + 고정 딜레이, 실패 시 재시도 없음"""
+    results = []
+    for i, p in enumerate(prompts):
+        output_path = os.path.join(output_dir, f"scene_{i+1:03d}.png")
+        result = image_generator._fetch_pollinations(p['prompt'], output_path, 1920, 1080)
+        results.append(result['path'])
+        if i < len(prompts) - 1:
+            time.sleep(delay)
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    prompts = [{'prompt': f"cinematic shot {i}, korean village", 'text': f"장면 {i}"} for i in range(count)]
+
+    print(f"[Bench] 이미지 {count}장 (대역 서버: 지연 0.2~0.6초, 초당 8회 제한, 무작위 429 3% / 500 2%)")
+
+    with run_standin_server() as (base_url, stats):
+        image_generator.POLLINATIONS_BASE_URL = base_url
+
+        with tempfile.TemporaryDirectory() as out:
+            start = time.perf_counter()
+            old = batch_sequential(prompts, out, delay)
+            t_old = time.perf_counter() - start
+            old_ok = sum(1 for path in old if path)
+            print(f"  순차 + 딜레이 {delay:g}초       : {t_old:6.1f}초  성공 {old_ok}/{count}")
+
+        stats.update(requests=0, throttled=0, failed=0)
+        with tempfile.TemporaryDirectory() as out:
+            start = time.perf_counter()
+            new = image_generator.generate_images_batch_pollinations(
+                prompts, out, max_in_flight=8, rate=6.0, burst=6, use_cache=False
+            )
+            t_new = time.perf_counter() - start
+            in_order = [os.path.basename(path) for path in new] == [f"scene_{i+1:03d}.png" for i in range(count)]
+            print(f"  동시 8 + 토큰 버킷 6/초      : {t_new:6.1f}초  (x{t_old / t_new:.1f})  "
+                  f"요청 {stats['requests']}회, 429 {stats['throttled']}회, 순서 유지 {in_order}")
+
+        print(f"  HTTP 통계 - {http_client.format_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
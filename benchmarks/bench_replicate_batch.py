@@ -0,0 +1,57 @@
+"""
+Replicate 일괄 생성 벤치마크 (로컬 대역 서버의 Replicate 형식 API)
+- 기존 방식: 1장씩 예측 생성 → 완료까지 대기 → 다운로드 + 1초 딜레이
+- 예측을 동시에 진행 (max_in_flight개까지) + 끝나는 대로 다운로드
+실행: python benchmarks/bench_replicate_batch.py [이미지 수]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.image_generator as image_generator
+from modules.image_backends import StandinReplicateBackend, run_batch
+from modules.standin_server import run_standin_server
+
+
+def batch_sequential(items, output_dir, api_url):
+    """기존 구현 (비교 기준) - 순차 예측 + 1초 딜레이, 실패 시 재시도 없음"""
+    results = []
+    for i, item in enumerate(items):
+        output_path = os.path.join(output_dir, f"scene_{i+1:03d}.png")
+        result = image_generator._fetch_replicate(item['prompt'], output_path, api_url=api_url, token="standin")
+        results.append(result['path'])
+        time.sleep(1)
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    items = [{'prompt': f"cinematic shot {i}, korean village", 'seed': i} for i in range(count)]
+    image_generator.REPLICATE_POLL_INTERVAL = 0.5  # 두 방식 같은 확인 간격
+
+    print(f"[Bench] 이미지 {count}장 (대역 서버: 예측 1~3초, 초당 8회 제한, 무작위 429 3% / 실패 2%)")
+
+    with run_standin_server() as (base_url, stats):
+        with tempfile.TemporaryDirectory() as out:
+            start = time.perf_counter()
+            old = batch_sequential(items, out, f"{base_url}/v1")
+            t_old = time.perf_counter() - start
+            print(f"  순차 + 딜레이 1초        : {t_old:6.1f}초  성공 {sum(1 for path in old if path)}/{count}")
+
+        for max_in_flight in (4, 8, 16):
+            with tempfile.TemporaryDirectory() as out:
+                start = time.perf_counter()
+                results = run_batch(StandinReplicateBackend(base_url), items, out, max_in_flight=max_in_flight)
+                t_new = time.perf_counter() - start
+            slowest = max(result['elapsed'] for result in results)
+            ok = sum(1 for result in results if result['path'])
+            print(f"  동시 예측 {max_in_flight:>2}개            : {t_new:6.1f}초  (x{t_old / t_new:.1f})  "
+                  f"가장 느린 항목 {slowest:.1f}초, 성공 {ok}/{count}")
+
+
+if __name__ == "__main__":
+    main()
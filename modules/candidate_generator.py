@@ -0,0 +1,165 @@
+"""
+씬 A/B 후보 이미지 생성 모듈 (Step 2)
+- scene['prompt']로 씬마다 A/B 2장 생성 (시드만 다름) → 이미지 백엔드 공용 스케줄러 (동시 요청 수 제한)
+- 백그라운드 스레드에서 실행, 완성된 이미지는 바로 저장소에 넣고(썸네일 포함) 결과 큐에 쌓음
+- 화면(fragment)은 drain_candidate_results로 새 결과만 가져가 씬 슬롯에 반영
+  → 앞쪽 씬을 검토하는 동안 뒤쪽 씬이 계속 생성됨
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from modules.image_backends import get_backend, run_batch
+from modules.media_store import make_thumbnail, store_upload
+
+# 동시 요청 수 (비우면 백엔드 기본값)
+CANDIDATE_MAX_IN_FLIGHT = int(os.getenv("VREW_CANDIDATE_MAX_IN_FLIGHT", "0")) or None
+
+# 후보 슬롯
+CANDIDATE_SLOTS = ('A', 'B')
+
+
+def _image_name(file_num, data):
+    """저장 파일명 (백엔드마다 형식이 달라 내용으로 확장자 결정: Replicate PNG / Pollinations JPEG)"""
+    ext = '.png' if data.startswith(b'\x89PNG') else '.jpg'
+    return f"{file_num:03d}{ext}"
+
+
+def build_candidate_items(scenes, images_by_shot=None, overwrite=False, seed_offset=0):
+    """
+    생성할 후보 목록 (씬 순서 → 앞쪽 씬부터 완성)
+
+    Args:
+        scenes: 씬 리스트 ('raw_id', 'prompt')
+        images_by_shot: 현재 슬롯 상태 (overwrite=False면 빈 슬롯만)
+        overwrite: True면 이미 이미지가 있는 슬롯도 다시 생성
+        seed_offset: 시드에 더할 값 (같은 값이면 디스크 캐시 재사용, 바꾸면 새 이미지)
+
+    Returns:
+        [{'prompt', 'text', 'seed', 'filename', 'raw_id', 'slot', 'file_num'}, ...]
+    """
+    images_by_shot = images_by_shot or {}
+    items = []
+    for idx, scene in enumerate(scenes):
+        if not scene.get('prompt'):
+            continue
+        for slot_idx, slot in enumerate(CANDIDATE_SLOTS):
+            if not overwrite and slot in images_by_shot.get(scene['raw_id'], {}):
+                continue
+            file_num = idx * 2 + slot_idx + 1  # 001(A)/002(B), 003(A)/004(B) ...
+            items.append({
+                'prompt': scene['prompt'],
+                'text': f"Scene {scene['raw_id']} {slot}",
+                'seed': seed_offset + file_num,
+                'filename': f"{file_num:03d}.png",  # 임시 파일명 (저장소에는 내용 형식대로)
+                'raw_id': scene['raw_id'],
+                'slot': slot,
+                'file_num': file_num
+            })
+    return items
+
+
+def start_candidate_generation(scenes, store_dir, images_by_shot=None, backend_name=None,
+                               overwrite=False, seed_offset=0, max_in_flight=CANDIDATE_MAX_IN_FLIGHT):
+    """
+    후보 생성 시작 (daemon 스레드)
+
+    Args:
+        scenes: 씬 리스트
+        store_dir: 세션 이미지 저장소 폴더 (store_upload 대상)
+        images_by_shot / overwrite / seed_offset: build_candidate_items 참고
+        backend_name: image_backends.BACKENDS 키 (None이면 기본 백엔드)
+        max_in_flight: 동시 요청 수 (None이면 백엔드 기본값)
+
+    Returns:
+        state = {'total', 'done', 'failed', 'errors', 'results', 'backend',
+                 'overwrite', 'started', 'elapsed', 'finished', 'error', 'cancel', 'lock'}
+        - results: 아직 화면에 반영되지 않은 완료 항목 (drain_candidate_results로 가져감)
+        - cancel: threading.Event (set하면 아직 요청하지 않은 항목은 건너뜀)
+
+    Raises:
+        ValueError - 알 수 없는 백엔드
+    """
+    backend = get_backend(backend_name)
+    items = build_candidate_items(scenes, images_by_shot, overwrite, seed_offset)
+    state = {
+        'total': len(items), 'done': 0, 'failed': 0, 'errors': [], 'results': [],
+        'backend': backend.name, 'overwrite': overwrite,
+        'started': time.time(), 'elapsed': 0.0, 'finished': not items, 'error': None,
+        'cancel': threading.Event(), 'lock': threading.Lock()
+    }
+    if not items:
+        return state
+
+    work_dir = tempfile.mkdtemp(prefix="_generating_", dir=store_dir)
+
+    def on_result(result):
+        # 완성 즉시 저장소로 옮기고 (내용 해시 파일명 + 지각 해시 + 썸네일) 결과 큐에 추가
+        item = items[result['index']]
+        entry = {'raw_id': item['raw_id'], 'slot': item['slot'], 'info': None, 'error': result['error']}
+        if result['path']:
+            try:
+                with open(result['path'], 'rb') as f:
+                    data = f.read()
+                entry['info'] = dict(store_upload(data, _image_name(item['file_num'], data), store_dir),
+                                     file_num=item['file_num'], generated=state['backend'])
+                os.remove(result['path'])
+                make_thumbnail(entry['info']['path'], entry['info']['hash'])
+            except OSError as e:
+                entry['error'] = str(e)
+        with state['lock']:
+            state['done'] += 1
+            if entry['info'] is None:
+                state['failed'] += 1
+                if entry['error'] and entry['error'] not in state['errors']:
+                    state['errors'].append(entry['error'])
+            state['results'].append(entry)
+
+    def worker():
+        try:
+            run_batch(backend, items, work_dir, max_in_flight=max_in_flight,
+                      on_result=on_result, should_cancel=state['cancel'].is_set)
+        except Exception as e:
+            print(f"[Candidates] 생성 중단: {e}")
+            state['error'] = str(e)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            state['elapsed'] = time.time() - state['started']
+            state['finished'] = True
+            print(f"[Candidates] {state['backend']}: {state['done'] - state['failed']}/{state['total']}장 생성 "
+                  f"({state['elapsed']:.1f}초)")
+
+    threading.Thread(target=worker, daemon=True, name="candidate-generation").start()
+    print(f"[Candidates] {backend.name}로 후보 {len(items)}장 생성 시작")
+    return state
+
+
+def drain_candidate_results(state):
+    """아직 반영하지 않은 완료 항목을 꺼냄 (완료 순서)"""
+    with state['lock']:
+        results, state['results'] = state['results'], []
+    return results
+
+
+def apply_candidate_results(images_by_shot, results, overwrite=False):
+    """
+    완료 항목을 씬 슬롯에 반영 (제자리 수정)
+
+    - overwrite=False면 그사이 사용자가 채운 슬롯은 그대로 둠
+
+    Returns:
+        반영된 완료 항목 리스트 ({'raw_id', 'slot', 'info', 'error'})
+    """
+    applied = []
+    for entry in results:
+        if entry['info'] is None:
+            continue
+        shot = images_by_shot.setdefault(entry['raw_id'], {})
+        if not overwrite and entry['slot'] in shot:
+            continue
+        shot[entry['slot']] = entry['info']
+        applied.append(entry)
+    return applied
@@ -0,0 +1,292 @@
+"""
+공용 HTTP 클라이언트 모듈
+- 호스트별 keep-alive Session 재사용 (연결 풀)
+- 기본 타임아웃 (연결 / 응답)
+- 멱등 요청(GET/HEAD/PUT/DELETE/OPTIONS) 재시도 + 백오프 (urllib3 Retry)
+- 호스트별 지연 시간 / 연결 재사용 통계
+- 파일 다운로드: 청크 단위 스트리밍 + 크기 확인 + Range 이어받기 + 원자적 저장
+"""
+
+import os
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 기본 타임아웃 (연결, 응답) 초
+DEFAULT_TIMEOUT = (5, 30)
+
+# 호스트당 최대 연결 수 (동시 요청 수보다 크게)
+POOL_MAXSIZE = 16
+
+# 다운로드 청크 크기 / 끊겼을 때 이어받기 최대 횟수
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_MAX_RESUMES = 3
+
+# 멱등 요청 재시도 정책 (POST/PATCH는 재시도하지 않음 - 연결 실패만 재시도)
+RETRY_POLICY = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    status=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+# 자체 재시도를 하는 호출용 (연결 실패만 1회 재시도)
+NO_RETRY_POLICY = Retry(total=1, connect=1, read=0, status=0, raise_on_status=False)
+
+_sessions = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _host_of(url):
+    """URL → 'scheme://host:port'"""
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url, retry=True):
+    """
+    호스트별 공유 Session (없으면 생성)
+
+    Args:
+        url: 요청 URL (호스트 판별용)
+        retry: False면 상태코드 재시도 없는 Session (호출 측에서 직접 재시도할 때)
+    """
+    key = (_host_of(url), retry)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=POOL_MAXSIZE,
+                max_retries=RETRY_POLICY if retry else NO_RETRY_POLICY
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def _record(host, elapsed, error):
+    """호스트별 요청 통계 기록"""
+    with _lock:
+        stats = _stats.setdefault(host, {'requests': 0, 'errors': 0, 'total_latency': 0.0, 'max_latency': 0.0})
+        stats['requests'] += 1
+        stats['errors'] += int(error)
+        stats['total_latency'] += elapsed
+        stats['max_latency'] = max(stats['max_latency'], elapsed)
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, retry=True, **kwargs):
+    """
+    공유 Session으로 HTTP 요청
+
+    Args:
+        method: 'GET', 'POST', 'PATCH' ...
+        url: 요청 URL
+        timeout: (연결, 응답) 타임아웃 초 또는 단일 값
+        retry: 멱등 요청 자동 재시도 여부
+        **kwargs: requests.Session.request 인자 (params, json, headers, stream ...)
+
+    Returns:
+        requests.Response (예외는 requests 예외 그대로 전달)
+    """
+    host = _host_of(url)
+    start = time.perf_counter()
+    error = True
+    try:
+        response = get_session(url, retry).request(method, url, timeout=timeout, **kwargs)
+        error = response.status_code >= 400
+        return response
+    finally:
+        _record(host, time.perf_counter() - start, error)
+
+
+def get(url, **kwargs):
+    """GET 요청"""
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    """POST 요청 (재시도 없음)"""
+    return request('POST', url, **kwargs)
+
+
+def patch(url, **kwargs):
+    """PATCH 요청 (재시도 없음)"""
+    return request('PATCH', url, **kwargs)
+
+
+def _content_total(response, offset):
+    """응답 기준 전체 파일 크기 (알 수 없으면 None)"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range and not content_range.endswith('/*'):
+        return int(content_range.rsplit('/', 1)[1])
+    length = response.headers.get('Content-Length')
+    if length is None:
+        return None
+    return int(length) + (offset if response.status_code == 206 else 0)
+
+
+def download_to_file(url, output_path, timeout=DEFAULT_TIMEOUT, retry=True,
+                     max_resumes=DOWNLOAD_MAX_RESUMES, chunk_size=DOWNLOAD_CHUNK_SIZE, **kwargs):
+    """
+    URL 내용을 파일로 스트리밍 저장 (메모리에 전체를 올리지 않음)
+
+    - output_path.part 에 청크 단위로 기록 → 크기 확인 → output_path로 rename
+    - 전송이 끊기면 받은 만큼 이어서 Range 요청 (If-Range로 같은 파일인지 확인,
+      서버가 200으로 전체를 다시 보내면 처음부터)
+    - 실패 시 .part 삭제
+    - Accept-Encoding: identity 요청 (크기 확인/Range는 전송 바이트 기준) - 서버가 그래도 압축해 보내면
+      크기 확인 생략, 끊기면 처음부터 다시 받음
+
+    Args:
+        url: 다운로드 URL
+        output_path: 저장 경로
+        timeout: (연결, 응답) 타임아웃
+        retry: 멱등 요청 자동 재시도 여부 (상태코드 재시도)
+        max_resumes: 끊김 후 이어받기 최대 횟수
+        **kwargs: 추가 요청 인자 (headers 등)
+
+    Returns:
+        {'path': 저장 경로 또는 None (2xx가 아닌 응답), 'status', 'headers', 'bytes', 'resumes'}
+
+    Raises:
+        requests 예외 - 이어받기 횟수를 넘겨 실패한 경우
+    """
+    part_path = f"{output_path}.part"
+    base_headers = dict(kwargs.pop('headers', None) or {})
+    base_headers.setdefault('Accept-Encoding', 'identity')
+    validator = None
+    resumes = 0
+    encoded = False
+
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+    try:
+        while True:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = dict(base_headers)
+            if offset:
+                headers['Range'] = f"bytes={offset}-"
+                if validator:
+                    headers['If-Range'] = validator
+
+            try:
+                with request('GET', url, timeout=timeout, retry=retry, stream=True, headers=headers, **kwargs) as response:
+                    if response.status_code == 416 and offset:
+                        # 이미 끝까지 받음 (Content-Range: bytes */전체)
+                        if _content_total(response, 0) == offset:
+                            break
+                        os.remove(part_path)
+                        continue
+
+                    if response.status_code not in (200, 206):
+                        return {'path': None, 'status': response.status_code, 'headers': response.headers,
+                                'bytes': 0, 'resumes': resumes}
+
+                    if response.status_code == 200:
+                        offset = 0  # Range 무시 → 처음부터
+                    validator = validator or response.headers.get('ETag') or response.headers.get('Last-Modified')
+                    # 압축 전송이면 Content-Length는 압축된 크기 (받은 바이트는 풀린 크기) → 비교 불가
+                    encoded = response.headers.get('Content-Encoding', 'identity').lower() not in ('', 'identity')
+                    total = None if encoded else _content_total(response, offset)
+                    last_headers = response.headers
+
+                    with open(part_path, 'ab' if offset else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                if resumes >= max_resumes:
+                    raise
+                resumes += 1
+                if encoded and os.path.exists(part_path):
+                    os.remove(part_path)  # 압축 본문은 이어받기 위치를 알 수 없음 → 처음부터
+                time.sleep(min(2 ** resumes * 0.5, 5))
+                continue
+
+            received = os.path.getsize(part_path)
+            if total is None or received == total:
+                break
+            if received > total or resumes >= max_resumes:
+                raise requests.exceptions.ContentDecodingError(
+                    f"다운로드 크기 불일치: {received} / {total} bytes ({url})"
+                )
+            resumes += 1  # 덜 받음 → 이어받기
+
+        os.replace(part_path, output_path)
+        return {'path': output_path, 'status': 200, 'headers': last_headers,
+                'bytes': os.path.getsize(output_path), 'resumes': resumes}
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def _pool_counts(session):
+    """Session 연결 풀의 (새 연결 수, 요청 수)"""
+    connections = requests_sent = 0
+    for adapter in session.adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+    return connections, requests_sent
+
+
+def get_metrics():
+    """
+    호스트별 통계
+
+    Returns:
+        {host: {'requests', 'errors', 'avg_latency_ms', 'max_latency_ms',
+                'connections', 'reuse_rate'}}
+        reuse_rate = 기존 연결을 재사용한 요청 비율 (재시도 포함 실제 전송 기준)
+    """
+    with _lock:
+        stats = {host: dict(values) for host, values in _stats.items()}
+        sessions = list(_sessions.items())
+
+    pool_counts = {}
+    for (host, _), session in sessions:
+        connections, requests_sent = _pool_counts(session)
+        total = pool_counts.setdefault(host, [0, 0])
+        total[0] += connections
+        total[1] += requests_sent
+
+    metrics = {}
+    for host, values in stats.items():
+        connections, requests_sent = pool_counts.get(host, (0, 0))
+        metrics[host] = {
+            'requests': values['requests'],
+            'errors': values['errors'],
+            'avg_latency_ms': values['total_latency'] / values['requests'] * 1000,
+            'max_latency_ms': values['max_latency'] * 1000,
+            'connections': connections,
+            'reuse_rate': 1 - connections / requests_sent if requests_sent else 0.0
+        }
+    return metrics
+
+
+def format_metrics():
+    """통계 요약 문자열 (로그용)"""
+    lines = []
+    for host, m in sorted(get_metrics().items()):
+        lines.append(
+            f"{host}: 요청 {m['requests']}회 (오류 {m['errors']}), 평균 {m['avg_latency_ms']:.0f}ms, "
+            f"최대 {m['max_latency_ms']:.0f}ms, 연결 {m['connections']}개, 재사용 {m['reuse_rate']:.0%}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,378 @@
+"""
+이미지 생성 백엔드 모듈
+- 모든 백엔드가 같은 호출 형식: await backend.generate(prompt, size, seed, output_path)
+  → {'path', 'retryable', 'retry_after', 'error'}
+- 공용 일괄 스케줄러 (generate_batch / run_batch)
+  동시 요청 수 제한 + 토큰 버킷 + 지터 백오프 재시도 + 디스크 캐시 + 입력 순서 유지
+- 백엔드: pollinations / replicate / placeholder / standin, standin-replicate (로컬 대역 서버, 오프라인 벤치마크용)
+"""
+
+import asyncio
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from modules import image_cache
+from modules.image_generator import (
+    _fetch_pollinations, _replicate_cancel, _replicate_download, _replicate_poll, _replicate_submit,
+    generate_placeholder_image, generate_placeholder_images,
+    POLLINATIONS_MAX_IN_FLIGHT, POLLINATIONS_RATE, POLLINATIONS_BURST, POLLINATIONS_MAX_RETRIES,
+    REPLICATE_DEFAULT_MODEL, REPLICATE_FINAL_STATUS, REPLICATE_MAX_IN_FLIGHT, REPLICATE_POLL_INTERVAL,
+    REPLICATE_PREDICTION_TIMEOUT, REPLICATE_RATE
+)
+from modules.rate_limiter import backoff_delay, TokenBucket
+
+# 기본 백엔드 (BACKENDS 키)
+DEFAULT_BACKEND = os.getenv("VREW_IMAGE_BACKEND", "pollinations")
+
+# 기본 이미지 크기 (16:9)
+DEFAULT_SIZE = (1920, 1080)
+
+# 화면 백엔드 선택지에 테스트용 백엔드(로컬 대역 서버)도 표시할지 (개발용)
+SHOW_TEST_BACKENDS = os.getenv("VREW_SHOW_TEST_BACKENDS", "") == "1"
+
+_standin_lock = threading.Lock()
+_standin_url = None
+
+
+class ImageBackend:
+    """
+    이미지 생성 백엔드 기본 클래스
+
+    하위 클래스는 generate()만 구현. 스케줄러 기본값(max_in_flight, rate, burst)은 클래스 속성으로 지정
+    """
+
+    name = "base"
+    model = "default"
+    cacheable = True        # 같은 (프롬프트, 크기, 시드) 결과를 디스크 캐시에 저장할지
+    max_in_flight = 4       # 동시 요청 수
+    rate = 1.0              # 초당 요청 수
+    burst = 4               # 순간 허용 요청 수
+    draws_text = False      # True면 프롬프트 대신 항목의 표시 텍스트('text')를 넘김 (플레이스홀더)
+    test_only = False       # True면 오프라인 개발/벤치마크용 (화면 선택지에서 숨김)
+
+    async def generate(self, prompt, size, seed=None, output_path=None):
+        """
+        이미지 1장 생성 (1회 시도, 재시도는 스케줄러가 담당)
+
+        Args:
+            prompt: 이미지 프롬프트
+            size: (너비, 높이)
+            seed: 시드 (None이면 무작위)
+            output_path: 저장 경로
+
+        Returns:
+            {'path': 저장 경로 또는 None, 'retryable', 'retry_after': 서버 지정 대기(초) 또는 None, 'error'}
+        """
+        raise NotImplementedError
+
+    def cache_key(self, prompt, size, seed):
+        """디스크 캐시 키"""
+        return image_cache.cache_key(self.name, self.model, prompt, size[0], size[1], seed)
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """동기 함수를 이벤트 루프 기본 스레드 풀에서 실행"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+
+class PollinationsBackend(ImageBackend):
+    """Pollinations.ai (무료, API 키 불필요)"""
+
+    name = "pollinations"
+    max_in_flight = POLLINATIONS_MAX_IN_FLIGHT
+    rate = POLLINATIONS_RATE
+    burst = POLLINATIONS_BURST
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+
+    async def generate(self, prompt, size, seed=None, output_path=None):
+        return await self._run_blocking(_fetch_pollinations, prompt, output_path, size[0], size[1], seed,
+                                        base_url=self.base_url)
+
+
+class StandinBackend(PollinationsBackend):
+    """로컬 대역 서버 (지연/실패/속도 제한 흉내, 캐시 안 함) - base_url 없으면 프로세스당 1개 자동 시작"""
+
+    name = "standin"
+    cacheable = False
+    test_only = True
+    max_in_flight = 8
+    rate = 6.0
+    burst = 6
+
+    def __init__(self, base_url=None):
+        super().__init__(base_url or _shared_standin_url())
+
+
+class ReplicateBackend(ImageBackend):
+    """
+    Replicate (FLUX, 유료) - 크기는 16:9 비율로 고정
+
+    예측을 생성한 뒤 완료될 때까지 비동기로 상태를 확인하고, 끝나는 대로 다운로드
+    (대기 중에는 스레드를 점유하지 않으므로 동시 진행 예측 수 = max_in_flight)
+    """
+
+    name = "replicate"
+    max_in_flight = REPLICATE_MAX_IN_FLIGHT
+    rate = REPLICATE_RATE
+    burst = REPLICATE_MAX_IN_FLIGHT
+
+    def __init__(self, model=REPLICATE_DEFAULT_MODEL, api_url=None, token=None,
+                 poll_interval=REPLICATE_POLL_INTERVAL, timeout=REPLICATE_PREDICTION_TIMEOUT):
+        self.model = model
+        self.api_url = api_url
+        self.token = token
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def cache_key(self, prompt, size, seed):
+        return image_cache.cache_key(self.name, self.model, prompt, None, None, seed)
+
+    async def generate(self, prompt, size, seed=None, output_path=None):
+        submitted = await self._run_blocking(_replicate_submit, prompt, self.model, seed, self.api_url, self.token)
+        prediction = submitted.pop('prediction')
+        if prediction is None:
+            return dict(submitted, path=None)
+
+        deadline = time.monotonic() + self.timeout
+        while prediction['status'] not in REPLICATE_FINAL_STATUS:
+            if time.monotonic() > deadline:
+                await self._run_blocking(_replicate_cancel, prediction, self.token)
+                return {'path': None, 'retryable': False, 'retry_after': None,
+                        'error': f"예측 시간 초과 ({self.timeout:g}초)"}
+            await asyncio.sleep(self.poll_interval)
+            try:
+                prediction = await self._run_blocking(_replicate_poll, prediction, self.token)
+            except requests.exceptions.RequestException as e:
+                print(f"[Replicate] 상태 확인 실패 (계속 대기): {e}")
+
+        return await self._run_blocking(_replicate_download, prediction, output_path)
+
+
+class StandinReplicateBackend(ReplicateBackend):
+    """로컬 대역 서버의 Replicate 형식 API (예측 생성 → 상태 확인 → 다운로드, 캐시 안 함)"""
+
+    name = "standin-replicate"
+    cacheable = False
+    test_only = True
+
+    def __init__(self, base_url=None, poll_interval=0.5, **options):
+        super().__init__(api_url=f"{base_url or _shared_standin_url()}/v1", token="standin",
+                         poll_interval=poll_interval, **options)
+
+
+class PlaceholderBackend(ImageBackend):
+    """플레이스홀더 (API 없이 테스트용, 프롬프트 대신 표시 텍스트를 그림)"""
+
+    name = "placeholder"
+    cacheable = False
+    max_in_flight = 4
+    rate = 1000.0
+    burst = 1000
+    draws_text = True
+
+    async def generate(self, prompt, size, seed=None, output_path=None):
+        # prompt = 항목의 표시 텍스트 (draws_text)
+        path = await self._run_blocking(generate_placeholder_image, prompt, output_path, size[0], size[1])
+        return {'path': path, 'retryable': False, 'retry_after': None, 'error': None if path else "PIL 없음"}
+
+
+BACKENDS = {
+    'pollinations': PollinationsBackend,
+    'replicate': ReplicateBackend,
+    'placeholder': PlaceholderBackend,
+    'standin': StandinBackend,
+    'standin-replicate': StandinReplicateBackend,
+}
+
+
+def get_backend(name=None, **options):
+    """
+    이름으로 백엔드 생성
+
+    Args:
+        name: BACKENDS 키 (None이면 DEFAULT_BACKEND)
+        **options: 백엔드 생성 인자 (base_url, model 등)
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 이미지 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name](**options)
+
+
+def list_backends(include_test=SHOW_TEST_BACKENDS):
+    """화면 선택지용 백엔드 이름 (테스트용 대역 서버 백엔드는 include_test일 때만)"""
+    return [name for name, backend_class in BACKENDS.items() if include_test or not backend_class.test_only]
+
+
+def _shared_standin_url():
+    """프로세스 공용 대역 서버 주소 (처음 호출 시 시작)"""
+    global _standin_url
+    with _standin_lock:
+        if _standin_url is None:
+            from modules.standin_server import start_standin_server
+
+            _, _standin_url, _ = start_standin_server()
+            print(f"[Standin] 대역 이미지 서버 시작: {_standin_url}")
+        return _standin_url
+
+
+async def _generate_item(backend, index, item, output_path, size, bucket, max_retries, cache_key, pending):
+    """항목 1개 생성 (캐시 → 같은 키 대기 → 생성 + 재시도)"""
+    prompt = item.get('prompt') or item.get('text') or f"scene {index + 1}"
+    request_text = (item.get('text') or prompt) if backend.draws_text else prompt
+    seed = item.get('seed')
+    result = {
+        'index': index, 'path': None, 'prompt': prompt, 'text': item.get('text', ''), 'seed': seed,
+        'backend': backend.name, 'attempts': 0, 'cached': False, 'placeholder': False, 'error': None
+    }
+
+    if cache_key:
+        # 같은 배치 안에서 같은 키를 생성 중이면 그 결과를 복사
+        if cache_key in pending:
+            source = await asyncio.shield(pending[cache_key])
+            if source:
+                shutil.copyfile(source, output_path)
+                result.update(path=output_path, cached=True)
+            else:
+                result['error'] = "같은 요청 실패"
+            return result
+
+        if image_cache.copy_cached(cache_key, output_path):
+            result.update(path=output_path, cached=True)
+            return result
+        pending[cache_key] = asyncio.get_running_loop().create_future()
+
+    try:
+        for attempt in range(max_retries + 1):
+            wait = bucket.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+
+            result['attempts'] = attempt + 1
+            try:
+                outcome = await backend.generate(request_text, size, seed, output_path)
+            except Exception as e:
+                outcome = {'path': None, 'retryable': False, 'retry_after': None, 'error': str(e)}
+
+            if outcome['path']:
+                result['path'] = outcome['path']
+                result['error'] = None
+                if cache_key:
+                    image_cache.put(cache_key, outcome['path'])
+                break
+
+            result['error'] = outcome['error']
+            if not outcome['retryable'] or attempt == max_retries:
+                print(f"[{backend.name}] ❌ 실패: {outcome['error']} ({attempt + 1}회 시도)")
+                break
+
+            delay = backoff_delay(attempt)
+            if outcome['retry_after'] is not None:
+                # 서버가 알려준 대기 시간은 모든 요청에 적용
+                bucket.penalize(outcome['retry_after'])
+                delay = max(delay, outcome['retry_after'])
+            await asyncio.sleep(delay)
+    finally:
+        if cache_key:
+            pending.pop(cache_key).set_result(result['path'])
+
+    return result
+
+
+async def generate_batch(backend, items, output_dir, size=DEFAULT_SIZE,
+                         max_in_flight=None, rate=None, burst=None,
+                         max_retries=POLLINATIONS_MAX_RETRIES, use_cache=True,
+                         placeholder_fallback=False, progress_callback=None, on_result=None, should_cancel=None):
+    """
+    여러 이미지 생성 (공용 스케줄러)
+
+    Args:
+        backend: ImageBackend
+        items: [{'prompt', 'text'(선택), 'seed'(선택), 'filename'(선택, 기본 scene_001.png ...)}, ...]
+        output_dir: 출력 폴더
+        size: (너비, 높이)
+        max_in_flight / rate / burst: 동시 요청 수 / 초당 요청 수 / 순간 허용량 (None이면 백엔드 기본값)
+        max_retries: 항목당 재시도 횟수 (재시도 가능한 실패만)
+        use_cache: 디스크 캐시 + 같은 요청 합치기 (백엔드가 cacheable이고 항목에 시드가 있을 때만 -
+                   시드 없는 요청은 매번 다른 이미지를 기대하므로)
+        placeholder_fallback: 실패한 항목을 플레이스홀더로 채움 (결과 'placeholder': True)
+        progress_callback: progress_callback(완료 수, 전체 수, 메시지) - 완료될 때마다
+        on_result: on_result(결과) - 완료될 때마다 (완료 순서)
+        should_cancel: 각 항목 요청 직전 호출, True면 그 항목은 요청하지 않음 (error '취소됨')
+
+    Returns:
+        결과 리스트 (입력 순서)
+        [{'index', 'path', 'prompt', 'text', 'seed', 'backend', 'attempts', 'elapsed', 'cached', 'placeholder', 'error'}]
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    semaphore = asyncio.Semaphore(max(1, max_in_flight or backend.max_in_flight))
+    bucket = TokenBucket(rate or backend.rate, burst or backend.burst)
+    total = len(items)
+    results = [None] * total
+    pending = {}
+    done = 0
+
+    async def run(index, item):
+        nonlocal done
+        output_path = os.path.join(output_dir, item.get('filename') or f"scene_{index + 1:03d}.png")
+        key = None
+        if use_cache and backend.cacheable and item.get('seed') is not None:
+            prompt = item.get('prompt') or item.get('text') or f"scene {index + 1}"
+            key = backend.cache_key(prompt, size, item.get('seed'))
+
+        async with semaphore:
+            start = time.perf_counter()
+            if should_cancel and should_cancel():
+                result = {'index': index, 'path': None, 'prompt': item.get('prompt'), 'text': item.get('text', ''),
+                          'seed': item.get('seed'), 'backend': backend.name, 'attempts': 0,
+                          'cached': False, 'placeholder': False, 'error': "취소됨"}
+            else:
+                result = await _generate_item(backend, index, item, output_path, size, bucket, max_retries, key, pending)
+            result['elapsed'] = time.perf_counter() - start
+
+        results[index] = result
+        done += 1
+        if on_result:
+            on_result(result)
+        if progress_callback:
+            progress_callback(done, total, f"이미지 {done}/{total} 생성 완료")
+
+    await asyncio.gather(*(run(i, item) for i, item in enumerate(items)))
+
+    # 실패한 항목은 플레이스홀더로 (프로세스 풀에서 한 번에)
+    failed = [result for result in results if not result['path']]
+    if placeholder_fallback and failed:
+        paths = generate_placeholder_images(
+            [(items[r['index']].get('text') or f"Scene {r['index'] + 1}",
+              os.path.join(output_dir, items[r['index']].get('filename') or f"scene_{r['index'] + 1:03d}.png"))
+             for r in failed],
+            size[0], size[1]
+        )
+        for result, path in zip(failed, paths):
+            result.update(path=path, placeholder=bool(path))
+
+    return results
+
+
+def run_batch(backend, items, output_dir, **options):
+    """
+    generate_batch 동기 실행 (새 이벤트 루프, 스레드 풀은 동시 요청 수만큼)
+
+    Args / Returns: generate_batch와 같음
+    """
+    max_in_flight = max(1, options.get('max_in_flight') or backend.max_in_flight)
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"image-{backend.name}") as executor:
+            asyncio.get_running_loop().set_default_executor(executor)
+            return await generate_batch(backend, items, output_dir, **options)
+
+    return asyncio.run(main())
@@ -0,0 +1,188 @@
+"""
+생성 이미지 디스크 캐시 모듈
+- 키: (백엔드, 모델, 프롬프트, 너비, 높이, 시드) → 같은 요청은 네트워크 없이 즉시 반환
+- 용량 한도 초과 시 오래 안 쓴 순(LRU, 파일 mtime 기준) 삭제
+- 같은 키를 동시에 요청하면 1번만 생성하고 나머지는 결과를 공유
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import Future
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 캐시 폴더 (outputs는 주기적으로 정리되므로 별도 폴더)
+IMAGE_CACHE_DIR = os.getenv("VREW_IMAGE_CACHE_DIR", os.path.join(BASE_DIR, "cache", "images"))
+
+# 캐시 용량 한도
+IMAGE_CACHE_MAX_BYTES = int(float(os.getenv("VREW_IMAGE_CACHE_MB", "2048")) * 1024 * 1024)
+
+_lock = threading.Lock()
+_indexes = {}       # {캐시 폴더: {'entries': {키: [크기, 마지막 사용 시각]}, 'bytes'}} - 첫 사용 시 폴더 1회 스캔
+_inflight = {}      # {키: Future} - 생성 중인 요청
+_stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evicted': 0}
+
+
+def cache_key(backend, model, prompt, width, height, seed):
+    """캐시 키 (sha256 hex)"""
+    raw = json.dumps([backend, model, prompt, width, height, seed], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key, cache_dir):
+    return os.path.join(cache_dir, key[:2], f"{key}.img")
+
+
+def _load_index(cache_dir):
+    """캐시 폴더 인덱스 (처음이면 스캔, _lock 안에서 호출)"""
+    index = _indexes.get(cache_dir)
+    if index is not None:
+        return index
+
+    index = {'entries': {}, 'bytes': 0}
+    for dirpath, _, filenames in os.walk(cache_dir):
+        for name in filenames:
+            if not name.endswith('.img'):
+                continue
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            index['entries'][name[:-4]] = [st.st_size, st.st_mtime]
+            index['bytes'] += st.st_size
+    _indexes[cache_dir] = index
+    return index
+
+
+def _evict(index, cache_dir, max_bytes):
+    """용량 한도까지 LRU 삭제 (_lock 안에서 호출)"""
+    if index['bytes'] <= max_bytes:
+        return
+    for key, (size, _) in sorted(index['entries'].items(), key=lambda item: item[1][1]):
+        if index['bytes'] <= max_bytes:
+            break
+        try:
+            os.remove(_cache_path(key, cache_dir))
+        except OSError:
+            pass
+        del index['entries'][key]
+        index['bytes'] -= size
+        _stats['evicted'] += 1
+
+
+def lookup(key, cache_dir=IMAGE_CACHE_DIR):
+    """캐시 조회 (있으면 경로, 사용 시각 갱신)"""
+    path = _cache_path(key, cache_dir)
+    with _lock:
+        entry = _load_index(cache_dir)['entries'].get(key)
+        if entry is None or not os.path.exists(path):
+            return None
+        os.utime(path, None)
+        entry[1] = os.path.getmtime(path)
+    return path
+
+
+def _store(key, tmp_path, cache_dir, max_bytes):
+    """생성된 파일을 캐시에 등록 후 용량 정리"""
+    path = _cache_path(key, cache_dir)
+    os.replace(tmp_path, path)
+    size = os.path.getsize(path)
+    with _lock:
+        index = _load_index(cache_dir)
+        old = index['entries'].get(key)
+        if old:
+            index['bytes'] -= old[0]
+        index['entries'][key] = [size, os.path.getmtime(path)]
+        index['bytes'] += size
+        _evict(index, cache_dir, max_bytes)
+    return path
+
+
+def _copy_out(cached_path, output_path):
+    """캐시 파일을 요청한 출력 경로로 복사"""
+    if os.path.abspath(cached_path) != os.path.abspath(output_path):
+        shutil.copyfile(cached_path, output_path)
+    return output_path
+
+
+def get_or_fetch(key, output_path, fetch, cache_dir=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+    """
+    캐시에 있으면 복사, 없으면 fetch로 생성 후 캐시에 저장
+
+    Args:
+        key: cache_key 결과
+        output_path: 최종 저장 경로
+        fetch: fetch(저장 경로) → 저장 경로 또는 None (실패) - 캐시 임시 파일에 기록
+        cache_dir / max_bytes: 캐시 폴더 / 용량 한도
+
+    Returns:
+        output_path 또는 None (생성 실패)
+    """
+    cached = lookup(key, cache_dir)
+    if cached:
+        with _lock:
+            _stats['hits'] += 1
+        return _copy_out(cached, output_path)
+
+    with _lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+            _stats['misses'] += 1
+        else:
+            _stats['coalesced'] += 1
+
+    if not leader:
+        # 같은 키를 생성 중인 요청의 결과 대기
+        cached = future.result()
+        return _copy_out(cached, output_path) if cached else None
+
+    cached = None
+    try:
+        os.makedirs(os.path.dirname(_cache_path(key, cache_dir)), exist_ok=True)
+        tmp_path = f"{_cache_path(key, cache_dir)}.{threading.get_ident()}.tmp"
+        try:
+            if fetch(tmp_path):
+                cached = _store(key, tmp_path, cache_dir, max_bytes)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    finally:
+        future.set_result(cached)
+        with _lock:
+            _inflight.pop(key, None)
+
+    return _copy_out(cached, output_path) if cached else None
+
+
+def copy_cached(key, output_path, cache_dir=IMAGE_CACHE_DIR):
+    """캐시에 있으면 output_path로 복사 (반환: output_path 또는 None, 적중/실패 통계 기록)"""
+    cached = lookup(key, cache_dir)
+    with _lock:
+        _stats['hits' if cached else 'misses'] += 1
+    return _copy_out(cached, output_path) if cached else None
+
+
+def put(key, source_path, cache_dir=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+    """이미 생성된 파일을 캐시에 복사해 등록 (원본은 그대로, 반환: 캐시 경로)"""
+    path = _cache_path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(source_path, tmp_path)
+        return _store(key, tmp_path, cache_dir, max_bytes)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_cache_stats(cache_dir=IMAGE_CACHE_DIR):
+    """캐시 통계 {'hits', 'misses', 'coalesced', 'evicted', 'entries', 'bytes'}"""
+    with _lock:
+        index = _load_index(cache_dir)
+        return dict(_stats, entries=len(index['entries']), bytes=index['bytes'])
@@ -0,0 +1,181 @@
+"""
+중복 이미지 탐지 모듈 (지각 해시 dHash 기반)
+- 같은 프롬프트로 다시 생성한 이미지, 이름만 바꾼 같은 파일 등 눈으로 같은 이미지를 찾음
+- 해밍 거리 DEDUP_MAX_DISTANCE 이하면 후보 그룹 (NumPy로 전체 쌍 비교)
+- 후보는 160x90 흑백 픽셀 비교로 한 번 더 확인 (배경이 같고 글자만 다른 이미지는 합치지 않음)
+- Step 2: 중복 의심 슬롯 표시 / Step 3: 그룹마다 미디어 1개만 패키징
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+from modules.media_store import ensure_perceptual_hashes
+
+# 같은 이미지로 볼 최대 해밍 거리 (64비트 중, 0 = 완전히 같은 해시만)
+DEDUP_MAX_DISTANCE = int(os.getenv("VREW_DEDUP_DISTANCE", "5"))
+
+# 확인 단계: 비교 크기 / 허용 최대 픽셀 차이 (재압축·크기 변경은 1~2, 글자 한 글자 차이는 60 이상)
+CONFIRM_SIZE = (160, 90)
+CONFIRM_MAX_DIFF = 24
+
+# 확인용 축소 이미지 캐시 {(경로, 수정 시각, 크기): uint8 배열} / 최대 항목 수 (넘으면 비움, 1개 14KB)
+_signature_cache = {}
+SIGNATURE_CACHE_MAX = 4096
+
+
+def hamming_distance(a, b):
+    """두 dHash의 해밍 거리 (다른 비트 수)"""
+    return (a ^ b).bit_count()
+
+
+def _popcount(values):
+    """uint64 배열 원소별 1비트 수"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _signature(path):
+    """확인용 축소 흑백 이미지 (원본 해상도로 디코딩 후 INTER_AREA 축소, 실패 시 None)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime, stat.st_size)
+    if key not in _signature_cache:
+        if len(_signature_cache) >= SIGNATURE_CACHE_MAX:
+            _signature_cache.clear()
+        img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        _signature_cache[key] = None if img is None else cv2.resize(img, CONFIRM_SIZE, interpolation=cv2.INTER_AREA)
+    return _signature_cache[key]
+
+
+def is_same_image(path_a, path_b, max_diff=CONFIRM_MAX_DIFF):
+    """두 이미지가 눈으로 같은지 (축소 흑백 픽셀 차이의 최댓값 기준)"""
+    if path_a == path_b:
+        return True
+    a, b = _signature(path_a), _signature(path_b)
+    if a is None or b is None:
+        return False
+    return int(cv2.absdiff(a, b).max()) <= max_diff
+
+
+def confirm_groups(groups, path_of=lambda key: key):
+    """
+    해시 그룹을 픽셀 비교로 다시 나눔 (각 항목을 앞쪽 대표들과 비교)
+
+    Args:
+        groups: group_near_duplicates 결과
+        path_of: 키 → 이미지 경로
+
+    Returns:
+        [[키, ...], ...] - 확인된 2개 이상 그룹만 (입력 순서 유지)
+    """
+    confirmed = []
+    for group in groups:
+        clusters = []
+        for key in group:
+            for cluster in clusters:
+                if is_same_image(path_of(cluster[0]), path_of(key)):
+                    cluster.append(key)
+                    break
+            else:
+                clusters.append([key])
+        confirmed.extend(cluster for cluster in clusters if len(cluster) > 1)
+    return confirmed
+
+
+def group_near_duplicates(hashes, max_distance=DEDUP_MAX_DISTANCE):
+    """
+    해시가 가까운 항목끼리 묶음 (거리 조건을 이어서 만족하면 같은 그룹)
+
+    Args:
+        hashes: {키: dHash 또는 None} - None은 비교하지 않음 (영상/디코딩 실패)
+        max_distance: 같은 그룹으로 볼 최대 해밍 거리
+
+    Returns:
+        [[키, ...], ...] - 2개 이상인 그룹만, 그룹/그룹 안 모두 입력 순서
+    """
+    keys = [key for key, value in hashes.items() if value is not None]
+    if len(keys) < 2:
+        return []
+
+    values = np.array([hashes[key] for key in keys], dtype=np.uint64)
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # 행 단위로 뒤쪽 전체와 한 번에 비교 (n번의 벡터 연산)
+    for i in range(len(keys) - 1):
+        distances = _popcount(values[i] ^ values[i + 1:])
+        for j in np.nonzero(distances <= max_distance)[0]:
+            root_i, root_j = find(i), find(i + 1 + int(j))
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(find(i), []).append(key)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicate_slots(images_by_shot, max_distance=DEDUP_MAX_DISTANCE):
+    """
+    씬 이미지 중 중복 의심 슬롯 찾기 (Step 2 표시용)
+
+    Args:
+        images_by_shot: {raw_id: {'A': {'path', 'dhash', ...}, 'B': {...}}} - dhash 없는 항목은 계산해 채움
+
+    Returns:
+        {(raw_id, slot): [(다른 raw_id, slot), ...]} - 중복 의심 슬롯만
+    """
+    infos = {(raw_id, slot): info for raw_id, shot in images_by_shot.items() for slot, info in shot.items()}
+    ensure_perceptual_hashes(list(infos.values()))
+
+    groups = group_near_duplicates({key: info.get('dhash') for key, info in infos.items()}, max_distance)
+    duplicates = {}
+    for group in confirm_groups(groups, lambda key: infos[key]['path']):
+        for key in group:
+            duplicates[key] = [other for other in group if other != key]
+    return duplicates
+
+
+def build_media_aliases(paths, known_hashes=None, max_distance=DEDUP_MAX_DISTANCE):
+    """
+    패키징할 이미지 경로 → 대표 경로 (그룹에서 처음 나온 경로)
+
+    Args:
+        paths: 이미지 경로 리스트 (중복 허용)
+        known_hashes: {경로: dHash} - 이미 계산된 해시 (없는 경로만 새로 계산)
+
+    Returns:
+        (aliases, report)
+        aliases = {경로: 대표 경로} - 대표가 아닌 경로만
+        report = {'images', 'groups', 'duplicates', 'saved_bytes'}
+    """
+    unique = list(dict.fromkeys(path for path in paths if path and os.path.exists(path)))
+    infos = [{'path': path, 'dhash': known_hashes[path]} if known_hashes and path in known_hashes else {'path': path}
+             for path in unique]
+    ensure_perceptual_hashes(infos)
+
+    groups = confirm_groups(group_near_duplicates({info['path']: info['dhash'] for info in infos}, max_distance))
+    aliases = {path: group[0] for group in groups for path in group[1:]}
+    report = {
+        'images': len(unique),
+        'groups': len(groups),
+        'duplicates': len(aliases),
+        'saved_bytes': sum(os.path.getsize(path) for path in aliases)
+    }
+    return aliases, report
+
+
+def format_dedupe_report(report):
+    """중복 제거 리포트 → 한 줄 요약"""
+    return (f"이미지 {report['images']}개 중 중복 {report['duplicates']}개 합침 "
+            f"({report['groups']}그룹, {report['saved_bytes'] / 1024 / 1024:.1f}MB 절감)")
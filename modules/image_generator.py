@@ -1,8 +1,9 @@
 """
 이미지 생성 모듈
 - Pollinations.ai (무료, API 키 불필요) ⭐
-- Replicate (FLUX) - 유료
+- Replicate (FLUX) - 유료, REST API (예측 생성 → 상태 확인 → 다운로드)
 - 플레이스홀더 이미지 생성
+- 공통 백엔드 인터페이스 / 일괄 스케줄러는 image_backends 모듈
 """
 
 import os
@@ -11,13 +12,94 @@ import urllib.parse
 import base64
 from typing import Optional
 import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from modules import http_client
+from modules.image_cache import cache_key, get_or_fetch
 
 # API 키 설정
 REPLICATE_API_TOKEN = os.getenv("REPLICATE_API_TOKEN", "")
 
+# Pollinations 서버 주소 (로컬 대역 서버로 벤치마크/테스트 가능)
+POLLINATIONS_BASE_URL = os.getenv("POLLINATIONS_BASE_URL", "https://image.pollinations.ai")
+
+# Pollinations 일괄 생성 기본값: 동시 요청 수 / 초당 요청 수 / 순간 허용량 / 재시도 횟수
+POLLINATIONS_MAX_IN_FLIGHT = int(os.getenv("POLLINATIONS_MAX_IN_FLIGHT", "4"))
+POLLINATIONS_RATE = float(os.getenv("POLLINATIONS_RATE", "1.0"))
+POLLINATIONS_BURST = int(os.getenv("POLLINATIONS_BURST", "4"))
+POLLINATIONS_MAX_RETRIES = 3
+
+# Replicate REST API 주소 (로컬 대역 서버로 벤치마크/테스트 가능) / 기본 모델
+REPLICATE_API_URL = os.getenv("REPLICATE_API_URL", "https://api.replicate.com/v1")
+REPLICATE_DEFAULT_MODEL = "black-forest-labs/flux-schnell"
+
+# Replicate 일괄 생성 기본값: 동시 진행 예측 수 / 초당 예측 생성 수 (API 한도 600회/분)
+REPLICATE_MAX_IN_FLIGHT = int(os.getenv("REPLICATE_MAX_IN_FLIGHT", "8"))
+REPLICATE_RATE = float(os.getenv("REPLICATE_RATE", "5.0"))
+
+# Replicate 예측 상태 확인 간격 / 예측 최대 대기 시간 (초)
+REPLICATE_POLL_INTERVAL = 1.0
+REPLICATE_PREDICTION_TIMEOUT = 300
+
+# 예측 종료 상태
+REPLICATE_FINAL_STATUS = {'succeeded', 'failed', 'canceled'}
+
+# 재시도할 HTTP 상태 (속도 제한 / 일시적 서버 오류)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# 플레이스홀더: 그라데이션 (위 색, 아래 색) / 테두리 색 / 일괄 생성 프로세스 수
+PLACEHOLDER_PALETTE = ((30, 30, 50), (50, 60, 90))
+PLACEHOLDER_BORDER = (100, 100, 150)
+PLACEHOLDER_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _fetch_pollinations(prompt: str, output_path: str, width: int, height: int,
+                        seed: Optional[int] = None, timeout: float = 120,
+                        base_url: Optional[str] = None) -> dict:
+    """
+    Pollinations 요청 1회
+
+    Args:
+        base_url: 서버 주소 (기본 POLLINATIONS_BASE_URL, 대역 서버 등)
+
+    Returns:
+        {'path': 저장 경로 또는 None, 'retryable': 재시도 가치 여부, 'retry_after': 서버 지정 대기(초) 또는 None,
+         'error': 실패 사유}
+    """
+    # URL 인코딩
+    encoded_prompt = urllib.parse.quote(prompt)
+
+    # Pollinations.ai URL (16:9, 로고 없음)
+    url = f"{base_url or POLLINATIONS_BASE_URL}/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true"
+    if seed is not None:
+        url += f"&seed={seed}"
+
+    try:
+        # 파일로 스트리밍 저장 (끊기면 이어받기), 상태코드 재시도는 호출 측(토큰 버킷 + 백오프)에서 처리
+        download = http_client.download_to_file(url, output_path, timeout=(10, timeout), retry=False)
+    except requests.exceptions.Timeout:
+        return {'path': None, 'retryable': True, 'retry_after': None, 'error': f"타임아웃 ({timeout:g}초 초과)"}
+    except requests.exceptions.RequestException as e:
+        return {'path': None, 'retryable': True, 'retry_after': None, 'error': f"연결 오류: {e}"}
+
+    if download['path']:
+        return {'path': output_path, 'retryable': False, 'retry_after': None, 'error': None}
+
+    retry_after = download['headers'].get('Retry-After')
+    return {
+        'path': None,
+        'retryable': download['status'] in RETRYABLE_STATUS,
+        'retry_after': float(retry_after) if retry_after and retry_after.isdigit() else None,
+        'error': f"HTTP {download['status']}"
+    }
+
 
 def generate_image_pollinations(prompt: str, output_path: str, 
-                                width: int = 1920, height: int = 1080) -> Optional[str]:
+                                width: int = 1920, height: int = 1080,
+                                seed: Optional[int] = None, use_cache: bool = True) -> Optional[str]:
     """
     Pollinations.ai로 이미지 생성 (무료, API 키 불필요!)
     
@@ -26,88 +108,206 @@ def generate_image_pollinations(prompt: str, output_path: str,
         output_path: 저장 경로
         width: 이미지 너비 (기본 1920)
         height: 이미지 높이 (기본 1080)
+        seed: 시드 (같은 시드 = 같은 이미지)
+        use_cache: 같은 (프롬프트, 크기, 시드) 요청은 디스크 캐시 사용 (시드가 없으면 매번 새로 생성)
     
     Returns:
         저장된 이미지 경로 또는 None
     """
-    try:
-        # URL 인코딩
-        encoded_prompt = urllib.parse.quote(prompt)
-        
-        # Pollinations.ai URL (16:9, 로고 없음)
-        url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true"
-        
+    def fetch(path):
         print(f"[Pollinations] 생성 중: {prompt[:50]}...")
-        
+
         # 이미지 다운로드 (타임아웃 120초)
-        response = requests.get(url, timeout=120)
-        
-        if response.status_code == 200:
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
-            print(f"[Pollinations] ✅ 완료: {output_path}")
-            return output_path
+        result = _fetch_pollinations(prompt, path, width, height, seed)
+        if not result['path']:
+            print(f"[Pollinations] ❌ 실패: {result['error']}")
+        return result['path']
+
+    try:
+        if use_cache and seed is not None:
+            key = cache_key("pollinations", "default", prompt, width, height, seed)
+            result = get_or_fetch(key, output_path, fetch)
         else:
-            print(f"[Pollinations] ❌ 실패: HTTP {response.status_code}")
-            return None
+            result = fetch(output_path)
+
+        if result:
+            print(f"[Pollinations] ✅ 완료: {output_path}")
+        return result
             
-    except requests.exceptions.Timeout:
-        print(f"[Pollinations] ❌ 타임아웃 (120초 초과)")
-        return None
     except Exception as e:
         print(f"[Pollinations] ❌ 오류: {e}")
         return None
 
 
 def generate_images_batch_pollinations(prompts: list, output_dir: str, 
-                                       delay: float = 3.0,
-                                       progress_callback=None) -> list:
+                                       delay: Optional[float] = None,
+                                       progress_callback=None,
+                                       max_in_flight: int = POLLINATIONS_MAX_IN_FLIGHT,
+                                       rate: float = POLLINATIONS_RATE,
+                                       burst: int = POLLINATIONS_BURST,
+                                       max_retries: int = POLLINATIONS_MAX_RETRIES,
+                                       width: int = 1920, height: int = 1080,
+                                       use_cache: bool = True) -> list:
     """
     여러 이미지 일괄 생성 (Pollinations.ai - 무료)
     
+    공용 스케줄러(image_backends.run_batch)로 동시에 max_in_flight개까지 요청하고,
+    요청 시작 속도는 토큰 버킷(rate/burst)으로 제한
+    
     Args:
         prompts: 프롬프트 딕셔너리 리스트 [{"prompt": "...", "text": "..."}]
         output_dir: 출력 폴더
-        delay: 요청 간 딜레이 (초) - 서버 부하 방지
-        progress_callback: 진행률 콜백 함수
+        delay: (호환용) 요청 간 최소 간격 (초) - 지정 시 rate = 1/delay, burst = 1
+        progress_callback: 진행률 콜백 함수 (완료될 때마다, 호출 스레드에서 실행)
+        max_in_flight: 동시 요청 수
+        rate: 초당 요청 수
+        burst: 순간 허용 요청 수
+        max_retries: 요청당 재시도 횟수 (429/5xx/타임아웃)
+        use_cache: 디스크 캐시 사용 (프롬프트 딕셔너리의 'seed'도 키에 포함, 'seed'가 없는 항목은 캐시 안 함)
     
     Returns:
-        생성된 이미지 경로 리스트
+        생성된 이미지 경로 리스트 (입력 순서 유지, 실패는 플레이스홀더)
     """
-    os.makedirs(output_dir, exist_ok=True)
-    
-    generated_images = []
-    total = len(prompts)
-    
-    for i, p in enumerate(prompts):
-        prompt_text = p.get('prompt', p.get('text', f'scene {i+1}'))
-        output_path = os.path.join(output_dir, f"scene_{i+1:03d}.png")
-        
-        if progress_callback:
-            progress_callback(i + 1, total, f"이미지 {i+1}/{total} 생성 중...")
-        
-        result = generate_image_pollinations(prompt_text, output_path)
-        
-        if result:
-            generated_images.append(result)
-        else:
-            # 실패시 플레이스홀더 생성
-            placeholder = generate_placeholder_image(
-                p.get('text', f'Scene {i+1}'),
-                output_path
-            )
-            if placeholder:
-                generated_images.append(placeholder)
-        
-        # 다음 요청 전 딜레이 (마지막 제외)
-        if i < total - 1:
-            time.sleep(delay)
-    
-    return generated_images
+    from modules.image_backends import PollinationsBackend, run_batch
+
+    if delay:
+        rate, burst = 1.0 / delay, 1
+
+    results = run_batch(
+        PollinationsBackend(), prompts, output_dir, size=(width, height),
+        max_in_flight=max_in_flight, rate=rate, burst=burst, max_retries=max_retries,
+        use_cache=use_cache, placeholder_fallback=True, progress_callback=progress_callback
+    )
+    return [result['path'] for result in results if result['path']]
+
+
+def _replicate_headers(token: Optional[str] = None) -> dict:
+    return {'Authorization': f"Bearer {token or REPLICATE_API_TOKEN}", 'Content-Type': 'application/json'}
+
+
+def _replicate_submit(prompt: str, model: str = REPLICATE_DEFAULT_MODEL, seed: Optional[int] = None,
+                      api_url: Optional[str] = None, token: Optional[str] = None) -> dict:
+    """
+    Replicate 예측 생성 (완료를 기다리지 않음)
+
+    Args:
+        model: 'owner/name' (공식 모델) 또는 'owner/name:version'
+        api_url: API 주소 (기본 REPLICATE_API_URL)
+        token: API 토큰 (기본 REPLICATE_API_TOKEN)
+
+    Returns:
+        {'prediction': 예측 딕셔너리 또는 None, 'retryable', 'retry_after', 'error'}
+    """
+    if not (token or REPLICATE_API_TOKEN):
+        return {'prediction': None, 'retryable': False, 'retry_after': None, 'error': "Replicate API 토큰 없음"}
+
+    model_input = {
+        "prompt": prompt,
+        "num_outputs": 1,
+        "aspect_ratio": "16:9",
+        "output_format": "png"
+    }
+    if seed is not None:
+        model_input["seed"] = seed
+
+    api_url = api_url or REPLICATE_API_URL
+    if ':' in model:
+        url, body = f"{api_url}/predictions", {'version': model.split(':', 1)[1], 'input': model_input}
+    else:
+        url, body = f"{api_url}/models/{model}/predictions", {'input': model_input}
+
+    try:
+        # 예측 생성은 멱등이 아니므로 자동 재시도 없음 (스케줄러가 재시도)
+        response = http_client.post(url, json=body, headers=_replicate_headers(token))
+    except requests.exceptions.RequestException as e:
+        return {'prediction': None, 'retryable': True, 'retry_after': None, 'error': f"연결 오류: {e}"}
+
+    if response.status_code in (200, 201):
+        return {'prediction': response.json(), 'retryable': False, 'retry_after': None, 'error': None}
+
+    retry_after = response.headers.get('Retry-After')
+    return {
+        'prediction': None,
+        'retryable': response.status_code in RETRYABLE_STATUS,
+        'retry_after': float(retry_after) if retry_after and retry_after.isdigit() else None,
+        'error': f"예측 생성 HTTP {response.status_code}"
+    }
+
+
+def _replicate_poll(prediction: dict, token: Optional[str] = None) -> dict:
+    """예측 상태 조회 (반환: 최신 예측 딕셔너리, 요청 실패 시 requests 예외)"""
+    response = http_client.get(prediction['urls']['get'], headers=_replicate_headers(token))
+    response.raise_for_status()
+    return response.json()
+
+
+def _replicate_cancel(prediction: dict, token: Optional[str] = None):
+    """예측 취소 (실패해도 무시)"""
+    try:
+        http_client.post(prediction['urls']['cancel'], headers=_replicate_headers(token))
+    except (requests.exceptions.RequestException, KeyError):
+        pass
+
+
+def _replicate_download(prediction: dict, output_path: str) -> dict:
+    """
+    종료된 예측의 출력 다운로드
+
+    Returns:
+        {'path', 'retryable', 'retry_after', 'error'} - _fetch_pollinations와 같은 형식
+    """
+    if prediction['status'] != 'succeeded':
+        # 예측 자체가 실패 (프롬프트 거부 등) - 다시 해도 같음
+        return {'path': None, 'retryable': False, 'retry_after': None,
+                'error': f"예측 {prediction['status']}: {prediction.get('error') or ''}".strip()}
+
+    output = prediction.get('output')
+    image_url = output[0] if isinstance(output, list) and output else output
+    if not image_url:
+        return {'path': None, 'retryable': False, 'retry_after': None, 'error': "출력 없음"}
+
+    try:
+        download = http_client.download_to_file(image_url, output_path, timeout=(10, 120))
+    except requests.exceptions.RequestException as e:
+        return {'path': None, 'retryable': True, 'retry_after': None, 'error': f"다운로드 오류: {e}"}
+    if not download['path']:
+        return {'path': None, 'retryable': download['status'] in RETRYABLE_STATUS, 'retry_after': None,
+                'error': f"다운로드 HTTP {download['status']}"}
+    return {'path': output_path, 'retryable': False, 'retry_after': None, 'error': None}
+
+
+def _fetch_replicate(prompt: str, output_path: str, model: str = REPLICATE_DEFAULT_MODEL,
+                     seed: Optional[int] = None, api_url: Optional[str] = None,
+                     token: Optional[str] = None) -> dict:
+    """
+    Replicate 예측 1회 (생성 → 완료까지 상태 확인 → 다운로드, 현재 스레드에서 대기)
+
+    Returns:
+        {'path': 저장 경로 또는 None, 'retryable', 'retry_after', 'error'} - _fetch_pollinations와 같은 형식
+    """
+    submitted = _replicate_submit(prompt, model, seed, api_url, token)
+    prediction = submitted.pop('prediction')
+    if prediction is None:
+        return dict(submitted, path=None)
+
+    deadline = time.monotonic() + REPLICATE_PREDICTION_TIMEOUT
+    while prediction['status'] not in REPLICATE_FINAL_STATUS:
+        if time.monotonic() > deadline:
+            _replicate_cancel(prediction, token)
+            return {'path': None, 'retryable': False, 'retry_after': None,
+                    'error': f"예측 시간 초과 ({REPLICATE_PREDICTION_TIMEOUT}초)"}
+        time.sleep(REPLICATE_POLL_INTERVAL)
+        try:
+            prediction = _replicate_poll(prediction, token)
+        except requests.exceptions.RequestException as e:
+            print(f"[Replicate] 상태 확인 실패 (계속 대기): {e}")
+
+    return _replicate_download(prediction, output_path)
 
 
 def generate_image_replicate(prompt: str, output_path: str, 
-                             model: str = "black-forest-labs/flux-schnell") -> Optional[str]:
+                             model: str = REPLICATE_DEFAULT_MODEL,
+                             seed: Optional[int] = None, use_cache: bool = True) -> Optional[str]:
     """
     Replicate API를 통해 이미지 생성 (FLUX 모델)
     
@@ -115,6 +315,8 @@ def generate_image_replicate(prompt: str, output_path: str,
         prompt: 이미지 프롬프트
         output_path: 저장할 파일 경로
         model: 사용할 모델
+        seed: 시드 (같은 시드 = 같은 이미지)
+        use_cache: 같은 (모델, 프롬프트, 시드) 요청은 디스크 캐시 사용 (시드가 없으면 매번 새로 생성)
     
     Returns:
         생성된 이미지 경로 또는 None
@@ -124,39 +326,84 @@ def generate_image_replicate(prompt: str, output_path: str,
         print("[Replicate API 토큰이 설정되지 않았습니다]")
         return None
     
+    def fetch(path):
+        result = _fetch_replicate(prompt, path, model, seed)
+        if not result['path']:
+            print(f"[이미지 생성 오류: {result['error']}]")
+        return result['path']
+
     try:
-        import replicate
-        
-        output = replicate.run(
-            model,
-            input={
-                "prompt": prompt,
-                "num_outputs": 1,
-                "aspect_ratio": "16:9",
-                "output_format": "png"
-            }
-        )
-        
-        # 이미지 다운로드
-        if output and len(output) > 0:
-            image_url = output[0]
-            response = requests.get(image_url)
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
-            
-            return output_path
+        if use_cache and seed is not None:
+            # 크기는 aspect_ratio(16:9)로 고정
+            key = cache_key("replicate", model, prompt, None, None, seed)
+            return get_or_fetch(key, output_path, fetch)
+        return fetch(output_path)
     
     except Exception as e:
         print(f"[이미지 생성 오류: {str(e)}]")
         return None
 
 
+@lru_cache(maxsize=8)
+def _placeholder_background(width: int, height: int, palette: tuple = PLACEHOLDER_PALETTE) -> bytes:
+    """
+    그라데이션 + 테두리 배경 (크기/팔레트별 1회 생성 후 캐시)
+
+    Returns:
+        RGB 원시 바이트 (Image.frombytes용)
+    """
+    top = np.array(palette[0], dtype=np.float64)
+    bottom = np.array(palette[1], dtype=np.float64)
+
+    # 행별 색 (기존 draw.line 루프와 같은 int 절삭)
+    ratio = np.arange(height, dtype=np.float64)[:, None] / height
+    rows = (top + ratio * (bottom - top)).astype(np.uint8)
+    bg = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+
+    # 테두리 (10px 안쪽, 두께 3)
+    x0, y0, x1, y1 = 10, 10, width - 10, height - 10
+    bg[y0:y0 + 3, x0:x1 + 1] = PLACEHOLDER_BORDER
+    bg[y1 - 2:y1 + 1, x0:x1 + 1] = PLACEHOLDER_BORDER
+    bg[y0:y1 + 1, x0:x0 + 3] = PLACEHOLDER_BORDER
+    bg[y0:y1 + 1, x1 - 2:x1 + 1] = PLACEHOLDER_BORDER
+
+    return bg.tobytes()
+
+
+@lru_cache(maxsize=1)
+def _placeholder_font():
+    """플레이스홀더 글꼴 (1회 로드)"""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 40)
+    except:
+        return ImageFont.load_default()
+
+
+def _wrap_placeholder_text(text: str, max_chars: int = 40) -> list:
+    """텍스트 줄바꿈 (단어 단위, 줄당 max_chars자 미만)"""
+    lines = []
+    current_line = ""
+
+    for word in text.split():
+        if len(current_line + word) < max_chars:
+            current_line += word + " "
+        else:
+            lines.append(current_line.strip())
+            current_line = word + " "
+    if current_line:
+        lines.append(current_line.strip())
+    return lines
+
+
 def generate_placeholder_image(text: str, output_path: str, 
                                width: int = 1920, height: int = 1080) -> str:
     """
     플레이스홀더 이미지 생성 (API 없이 테스트용)
     
+    배경(그라데이션 + 테두리)은 크기별로 캐시하고 이미지마다 텍스트만 그림
+    
     Args:
         text: 이미지에 표시할 텍스트
         output_path: 저장할 파일 경로
@@ -168,39 +415,12 @@ def generate_placeholder_image(text: str, output_path: str,
     """
     
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
         
-        # 그라데이션 배경 생성
-        img = Image.new('RGB', (width, height), color=(30, 30, 50))
+        img = Image.frombytes('RGB', (width, height), _placeholder_background(width, height))
         draw = ImageDraw.Draw(img)
-        
-        # 그라데이션 효과
-        for i in range(height):
-            r = int(30 + (i / height) * 20)
-            g = int(30 + (i / height) * 30)
-            b = int(50 + (i / height) * 40)
-            draw.line([(0, i), (width, i)], fill=(r, g, b))
-        
-        # 텍스트 추가
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 40)
-        except:
-            font = ImageFont.load_default()
-        
-        # 텍스트 줄바꿈
-        max_chars = 40
-        lines = []
-        words = text.split()
-        current_line = ""
-        
-        for word in words:
-            if len(current_line + word) < max_chars:
-                current_line += word + " "
-            else:
-                lines.append(current_line.strip())
-                current_line = word + " "
-        if current_line:
-            lines.append(current_line.strip())
+        font = _placeholder_font()
+        lines = _wrap_placeholder_text(text)
         
         # 텍스트 그리기
         y_offset = height // 2 - (len(lines) * 25)
@@ -214,9 +434,6 @@ def generate_placeholder_image(text: str, output_path: str,
             draw.text((x, y_offset), line, font=font, fill=(255, 255, 255))
             y_offset += 50
         
-        # 테두리
-        draw.rectangle([(10, 10), (width-10, height-10)], outline=(100, 100, 150), width=3)
-        
         img.save(output_path)
         return output_path
     
@@ -229,6 +446,31 @@ def generate_placeholder_image(text: str, output_path: str,
         return None
 
 
+def _placeholder_task(args):
+    """프로세스 풀 작업 단위 (text, output_path, width, height)"""
+    return generate_placeholder_image(*args)
+
+
+def generate_placeholder_images(items: list, width: int = 1920, height: int = 1080,
+                                max_workers: int = PLACEHOLDER_WORKERS) -> list:
+    """
+    플레이스홀더 여러 장 생성 (PNG 인코딩을 프로세스 풀로 병렬 처리)
+    
+    Args:
+        items: [(텍스트, 저장 경로), ...]
+        max_workers: 프로세스 수 (1이면 현재 프로세스에서 순차 처리)
+    
+    Returns:
+        생성된 경로 리스트 (입력 순서, 실패는 None)
+    """
+    tasks = [(text, path, width, height) for text, path in items]
+    if max_workers <= 1 or len(tasks) < 4:
+        return [_placeholder_task(task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_placeholder_task, tasks, chunksize=max(1, len(tasks) // (max_workers * 4))))
+
+
 def generate_images_batch(prompts: list, output_dir: str, 
                           use_api: bool = False) -> list:
     """
@@ -246,20 +488,22 @@ def generate_images_batch(prompts: list, output_dir: str,
     os.makedirs(output_dir, exist_ok=True)
     
     generated_images = []
+    output_paths = [os.path.join(output_dir, f"scene_{i+1:03d}.png") for i in range(len(prompts))]
+    
+    if use_api and REPLICATE_API_TOKEN:
+        # 공용 스케줄러로 동시 요청 (속도 제한 + 재시도)
+        from modules.image_backends import ReplicateBackend, run_batch
+
+        results = run_batch(ReplicateBackend(), prompts, output_dir)
+        paths = [result['path'] for result in results]
+    else:
+        # 플레이스홀더는 프로세스 풀에서 한 번에 생성
+        paths = generate_placeholder_images(
+            [(prompt_info.get("text", f"Scene {i+1}"), path) for i, (prompt_info, path) in enumerate(zip(prompts, output_paths))]
+        )
     
     for i, prompt_info in enumerate(prompts):
-        output_path = os.path.join(output_dir, f"scene_{i+1:03d}.png")
-        
-        if use_api and REPLICATE_API_TOKEN:
-            result = generate_image_replicate(
-                prompt_info.get("prompt", prompt_info.get("text", "")),
-                output_path
-            )
-        else:
-            result = generate_placeholder_image(
-                prompt_info.get("text", f"Scene {i+1}"),
-                output_path
-            )
+        result = paths[i]
         
         if result:
             generated_images.append({
@@ -268,13 +512,9 @@ def generate_images_batch(prompts: list, output_dir: str,
                 "text": prompt_info.get("text", ""),
                 "prompt": prompt_info.get("prompt", "")
             })
-            print(f"[{i+1}/{len(prompts)}] 이미지 생성 완료: {output_path}")
+            print(f"[{i+1}/{len(prompts)}] 이미지 생성 완료: {output_paths[i]}")
         else:
             print(f"[{i+1}/{len(prompts)}] 이미지 생성 실패")
-        
-        # API 호출 시 딜레이
-        if use_api:
-            time.sleep(1)
     
     return generated_images
 
@@ -292,11 +532,9 @@ def download_image(url: str, output_path: str) -> Optional[str]:
     """
     
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+        download = http_client.download_to_file(url, output_path, timeout=(10, 30))
+        if not download['path']:
+            raise requests.exceptions.HTTPError(f"HTTP {download['status']}")
         
         return output_path
     
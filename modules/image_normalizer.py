@@ -0,0 +1,268 @@
+"""
+이미지 정규화 모듈 (패키징 전 단계, 선택)
+- 1920x1080 화면을 꽉 채우도록 축소 후 가운데 크롭 (cover, 작은 이미지는 확대하지 않고 16:9로 크롭만)
+- JPEG(품질 지정)로 변환, 투명 픽셀이 실제로 있는 이미지만 PNG 유지
+- 원본 내용 해시로 캐시 (같은 이미지는 다시 변환하지 않음)
+- 프로세스 풀에서 병렬 처리, 절감 용량 리포트
+"""
+
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from modules.media_store import _atomic_write, is_video
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 정규화 결과 캐시 폴더 / 용량 한도 (초과 시 오래 안 쓴 순 삭제)
+NORMALIZE_CACHE_DIR = os.getenv("VREW_NORMALIZE_CACHE_DIR", os.path.join(BASE_DIR, "cache", "normalized"))
+NORMALIZE_CACHE_MAX_BYTES = int(float(os.getenv("VREW_NORMALIZE_CACHE_MB", "4096")) * 1024 * 1024)
+
+# 최근 이 시간(초) 안에 쓴 캐시 파일은 용량 초과여도 삭제하지 않음 (패키징 중인 빌드 보호)
+NORMALIZE_CACHE_MIN_IDLE_SECONDS = 10 * 60
+
+# 목표 크기 (Vrew 16:9) / JPEG 품질 / PNG 압축 레벨
+NORMALIZE_SIZE = (1920, 1080)
+NORMALIZE_JPEG_QUALITY = int(os.getenv("VREW_NORMALIZE_QUALITY", "90"))
+NORMALIZE_PNG_COMPRESSION = 6
+
+# 병렬 프로세스 수
+NORMALIZE_WORKERS = min(8, os.cpu_count() or 1)
+
+# 변환 방식이 바뀌면 올려서 기존 캐시 무효화 (2: EXIF 방향 적용)
+NORMALIZE_VERSION = 2
+
+
+def _file_hash(path, chunk_size=1024 * 1024):
+    """파일 내용 sha256 (청크 단위)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_uint8(img):
+    """16비트/실수 이미지 → 8비트"""
+    if img.dtype == np.uint8:
+        return img
+    if img.dtype == np.uint16:
+        return (img >> 8).astype(np.uint8)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def _decode(src_path):
+    """
+    이미지 디코딩 (한글 경로 대응: imread 대신 imdecode)
+
+    - JPEG: IMREAD_COLOR로 디코딩해 EXIF 방향(Orientation) 적용 (휴대폰 사진은 회전된 채 저장됨, 알파 없음)
+    - 그 외(PNG 등): 알파 채널 확인을 위해 IMREAD_UNCHANGED
+    """
+    data = np.fromfile(src_path, dtype=np.uint8)
+    if data[:2].tobytes() == b'\xff\xd8':
+        return cv2.imdecode(data, cv2.IMREAD_COLOR | cv2.IMREAD_ANYDEPTH)
+    return cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+
+
+def cover_resize(img, size=NORMALIZE_SIZE, upscale=False):
+    """
+    화면을 꽉 채우도록 비율 유지 리사이즈 후 가운데 크롭
+
+    Args:
+        img: cv2 이미지 (H, W, C)
+        size: (너비, 높이)
+        upscale: False면 목표보다 작은 이미지는 확대하지 않고 같은 비율로 크롭만
+                 (확대는 Vrew가 재생 시 처리 - 파일만 커짐)
+    """
+    target_w, target_h = size
+    h, w = img.shape[:2]
+    if (w, h) == (target_w, target_h):
+        return img
+
+    scale = max(target_w / w, target_h / h)
+    if scale < 1 or upscale:
+        new_w, new_h = max(target_w, round(w * scale)), max(target_h, round(h * scale))
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+        img = cv2.resize(img, (new_w, new_h), interpolation=interpolation)
+        crop_w, crop_h = target_w, target_h
+    else:
+        new_w, new_h = w, h
+        crop_w, crop_h = min(w, round(h * target_w / target_h)), min(h, round(w * target_h / target_w))
+
+    x = (new_w - crop_w) // 2
+    y = (new_h - crop_h) // 2
+    return img[y:y + crop_h, x:x + crop_w]
+
+
+def normalize_image(src_path, cache_dir=NORMALIZE_CACHE_DIR, size=NORMALIZE_SIZE, quality=NORMALIZE_JPEG_QUALITY):
+    """
+    이미지 1장 정규화 (캐시에 있으면 기존 결과 사용)
+
+    - 크기 변화가 없는데 변환 결과가 원본보다 크면 원본을 그대로 사용
+    - 영상/디코딩 실패는 원본 그대로
+
+    Returns:
+        {'source', 'path', 'original_bytes', 'bytes', 'format': 'jpg'|'png'|None, 'cached', 'error'}
+    """
+    original_bytes = os.path.getsize(src_path)
+    info = {'source': src_path, 'path': src_path, 'original_bytes': original_bytes, 'bytes': original_bytes,
+            'format': None, 'cached': False, 'error': None}
+    if is_video(src_path):
+        return info
+
+    key = f"{_file_hash(src_path)}_{size[0]}x{size[1]}_q{quality}_v{NORMALIZE_VERSION}"
+    for ext in ('jpg', 'png', 'orig'):
+        cached_path = os.path.join(cache_dir, key[:2], f"{key}.{ext}")
+        if os.path.exists(cached_path):
+            os.utime(cached_path, None)
+            if ext == 'orig':
+                # 변환해도 줄지 않는 이미지 (표시 파일)
+                info.update(cached=True)
+            else:
+                info.update(path=cached_path, bytes=os.path.getsize(cached_path), format=ext, cached=True)
+            return info
+
+    try:
+        img = _decode(src_path)
+        if img is None:
+            info['error'] = "디코딩 실패"
+            return info
+
+        img = _to_uint8(img)
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        original_shape = img.shape[:2]
+
+        # 알파 채널은 실제로 투명한 픽셀이 있을 때만 유지
+        keep_alpha = img.shape[2] == 4 and img[:, :, 3].min() < 255
+        if img.shape[2] == 4 and not keep_alpha:
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+
+        img = cover_resize(img, size)
+        if keep_alpha:
+            ext = 'png'
+            ok, buf = cv2.imencode('.png', img, [cv2.IMWRITE_PNG_COMPRESSION, NORMALIZE_PNG_COMPRESSION])
+        else:
+            ext = 'jpg'
+            ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+        if not ok:
+            info['error'] = "인코딩 실패"
+            return info
+
+        os.makedirs(os.path.join(cache_dir, key[:2]), exist_ok=True)
+        if img.shape[:2] == original_shape and len(buf) >= original_bytes:
+            _atomic_write(os.path.join(cache_dir, key[:2], f"{key}.orig"), b'')
+            return info
+
+        cached_path = os.path.join(cache_dir, key[:2], f"{key}.{ext}")
+        _atomic_write(cached_path, buf.tobytes())
+        info.update(path=cached_path, bytes=len(buf), format=ext)
+        return info
+    except Exception as e:
+        print(f"[Normalize] 변환 실패 (원본 사용): {src_path} - {e}")
+        info['error'] = str(e)
+        return info
+
+
+def _normalize_task(args):
+    """프로세스 풀 작업 단위 (src_path, cache_dir, size, quality)"""
+    return normalize_image(*args)
+
+
+def prune_normalize_cache(cache_dir=NORMALIZE_CACHE_DIR, max_bytes=NORMALIZE_CACHE_MAX_BYTES,
+                          min_idle_seconds=NORMALIZE_CACHE_MIN_IDLE_SECONDS):
+    """
+    캐시 용량 한도 초과 시 오래 안 쓴 순(mtime) 삭제 (반환: 삭제 수)
+
+    - 빌드 중에는 호출하지 않음 (janitor / 배치 종료 후) - 다른 빌드가 매핑해 둔 파일이 사라지지 않도록
+    - min_idle_seconds 안에 쓴 파일은 제외
+    """
+    idle_cutoff = time.time() - min_idle_seconds
+    entries = []
+    for dirpath, _, filenames in os.walk(cache_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes or mtime >= idle_cutoff:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def normalize_images(paths, cache_dir=NORMALIZE_CACHE_DIR, size=NORMALIZE_SIZE,
+                     quality=NORMALIZE_JPEG_QUALITY, max_workers=NORMALIZE_WORKERS):
+    """
+    여러 이미지 정규화 (중복 경로는 1번만, 프로세스 풀 병렬)
+
+    Args:
+        paths: 이미지/영상 경로 리스트
+        max_workers: 프로세스 수 (1이거나 4장 미만이면 현재 프로세스에서 순차 처리, daemon 프로세스 안에서는 스레드)
+
+    Returns:
+        (mapping, report)
+        mapping = {원본 경로: 정규화된 경로}
+        report = {'images', 'converted', 'cached', 'unchanged', 'failed',
+                  'original_bytes', 'bytes', 'saved_bytes', 'elapsed'}
+    """
+    started = time.perf_counter()
+    unique = list(dict.fromkeys(path for path in paths if path and os.path.exists(path)))
+    tasks = [(path, cache_dir, size, quality) for path in unique]
+
+    if max_workers <= 1 or len(tasks) < 4:
+        infos = [_normalize_task(task) for task in tasks]
+    elif multiprocessing.current_process().daemon:
+        # 작업 큐 워커(daemon 프로세스)는 자식 프로세스를 만들 수 없음 → 스레드 (cv2는 GIL을 풀어줌)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            infos = list(executor.map(_normalize_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            infos = list(executor.map(_normalize_task, tasks, chunksize=max(1, len(tasks) // (max_workers * 4))))
+
+    report = {'images': len(infos), 'converted': 0, 'cached': 0, 'unchanged': 0, 'failed': 0,
+              'original_bytes': 0, 'bytes': 0, 'saved_bytes': 0, 'elapsed': 0.0}
+    for info in infos:
+        report['original_bytes'] += info['original_bytes']
+        report['bytes'] += info['bytes']
+        if info['error']:
+            report['failed'] += 1
+        elif info['path'] == info['source']:
+            report['unchanged'] += 1
+        elif info['cached']:
+            report['cached'] += 1
+        else:
+            report['converted'] += 1
+    report['saved_bytes'] = report['original_bytes'] - report['bytes']
+    report['elapsed'] = time.perf_counter() - started
+
+    return {info['source']: info['path'] for info in infos}, report
+
+
+def format_normalize_report(report):
+    """정규화 리포트 → 한 줄 요약"""
+    original_mb = report['original_bytes'] / 1024 / 1024
+    final_mb = report['bytes'] / 1024 / 1024
+    ratio = report['saved_bytes'] / report['original_bytes'] if report['original_bytes'] else 0.0
+    text = (f"이미지 {report['images']}개 정규화: {original_mb:.1f}MB → {final_mb:.1f}MB "
+            f"({report['saved_bytes'] / 1024 / 1024:.1f}MB, {ratio:.0%} 절감) · "
+            f"변환 {report['converted']} / 캐시 {report['cached']} / 원본 유지 {report['unchanged']}")
+    if report['failed']:
+        text += f" / 실패 {report['failed']}"
+    return text + f" · {report['elapsed']:.1f}초"
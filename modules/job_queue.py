@@ -0,0 +1,418 @@
+"""
+Vrew 생성 작업 큐 모듈
+- SQLite 기반 영속 큐 (서버 재시작 후에도 작업 유지)
+- 고정 개수 워커 프로세스가 Step 3 빌드 실행
+- 스케줄링: 사용자별 FIFO + 사용자 간 공정 분배
+- 작업 상태/진행률 기록 (Streamlit에서 폴링)
+- 작업 취소 (대기 중: 즉시 / 실행 중: 다음 파트 시작 전)
+"""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 작업 DB 경로 (outputs 폴더는 재시작 시 삭제되므로 별도 폴더 사용)
+JOBS_DB_PATH = os.getenv("VREW_JOBS_DB", os.path.join(BASE_DIR, "jobs", "jobs.db"))
+
+# 워커 개수 (고정)
+JOB_WORKERS = int(os.getenv("VREW_JOB_WORKERS", "2"))
+
+# 작업 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+# 하트비트가 이 시간(초) 이상 끊긴 실행 중 작업은 다시 대기열로 (워커 비정상 종료 복구)
+STALE_JOB_SECONDS = 60
+HEARTBEAT_INTERVAL = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    progress_message TEXT NOT NULL DEFAULT '',
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    progress_detail TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_user ON jobs (status, user_id, id);
+"""
+
+# 기존 DB에 없으면 추가할 컬럼 (CREATE TABLE IF NOT EXISTS는 컬럼을 추가하지 않음)
+MIGRATION_COLUMNS = {
+    'progress_detail': "TEXT",
+    'cancel_requested': "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def _connect(db_path=None):
+    """SQLite 연결 (WAL 모드 - 워커/앱 동시 접근)"""
+    db_path = db_path or JOBS_DB_PATH
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn):
+    """이전 버전 DB에 새 컬럼 추가"""
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for name, ddl in MIGRATION_COLUMNS.items():
+        if name not in columns:
+            try:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {ddl}")
+            except sqlite3.OperationalError:
+                pass  # 다른 프로세스가 먼저 추가함
+
+
+def _row_to_job(row):
+    """DB 행 → 작업 딕셔너리"""
+    if row is None:
+        return None
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    job['progress_detail'] = json.loads(job['progress_detail']) if job['progress_detail'] else None
+    return job
+
+
+def submit_job(user_id, payload, db_path=None):
+    """
+    작업 등록
+
+    Args:
+        user_id: 요청 사용자 ID (공정 분배 기준)
+        payload: build_vrew_parts 인자 딕셔너리 (JSON 직렬화 가능해야 함)
+
+    Returns:
+        job_id
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.execute(
+            "INSERT INTO jobs (user_id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+            (str(user_id), STATUS_QUEUED, json.dumps(payload, ensure_ascii=False), time.time())
+        )
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def get_job(job_id, db_path=None):
+    """작업 조회 (없으면 None)"""
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row)
+    finally:
+        conn.close()
+
+
+def get_active_output_dirs(db_path=None):
+    """대기/실행 중 작업의 출력 폴더 집합 (정리 대상에서 제외할 작업 폴더 판단용)"""
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT payload FROM jobs WHERE status IN (?, ?)", (STATUS_QUEUED, STATUS_RUNNING)
+        ).fetchall()
+        return {json.loads(row['payload']).get('output_dir') for row in rows} - {None}
+    finally:
+        conn.close()
+
+
+def get_queue_position(job_id, db_path=None):
+    """대기 중인 작업 앞에 있는 대기 작업 수 (대기 중이 아니면 0)"""
+    conn = _connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND id < ? "
+            "AND EXISTS (SELECT 1 FROM jobs WHERE id = ? AND status = ?)",
+            (STATUS_QUEUED, job_id, job_id, STATUS_QUEUED)
+        ).fetchone()
+        return row[0]
+    finally:
+        conn.close()
+
+
+def claim_next_job(worker_name, db_path=None):
+    """
+    다음 작업 할당 (원자적)
+
+    스케줄링 규칙:
+    1. 사용자별 FIFO - 각 사용자의 가장 오래된 대기 작업만 후보
+    2. 공정 분배 - 실행 중 작업이 적은 사용자 → 가장 오래전에 처리된 사용자 우선
+    3. 동률이면 먼저 등록된 작업
+
+    Returns:
+        작업 딕셔너리 또는 None
+    """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            """
+            SELECT j.* FROM jobs j
+            WHERE j.status = :queued
+              AND j.id = (SELECT MIN(q.id) FROM jobs q
+                          WHERE q.user_id = j.user_id AND q.status = :queued)
+            ORDER BY
+              (SELECT COUNT(*) FROM jobs r
+               WHERE r.user_id = j.user_id AND r.status = :running) ASC,
+              (SELECT MAX(s.started_at) FROM jobs s
+               WHERE s.user_id = j.user_id AND s.started_at IS NOT NULL) ASC,
+              j.id ASC
+            LIMIT 1
+            """,
+            {"queued": STATUS_QUEUED, "running": STATUS_RUNNING}
+        ).fetchone()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+            (STATUS_RUNNING, worker_name, now, now, row['id'])
+        )
+        conn.execute("COMMIT")
+
+        job = _row_to_job(row)
+        job.update(status=STATUS_RUNNING, worker=worker_name, started_at=now)
+        return job
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def update_progress(job_id, progress, message="", detail=None, db_path=None):
+    """진행률(0~1), 메시지, 상세 이벤트(dict) 기록 (하트비트 갱신 포함)"""
+    conn = _connect(db_path)
+    try:
+        conn.execute(
+            "UPDATE jobs SET progress = ?, progress_message = ?, progress_detail = ?, heartbeat_at = ? WHERE id = ?",
+            (progress, message, json.dumps(detail, ensure_ascii=False) if detail is not None else None,
+             time.time(), job_id)
+        )
+    finally:
+        conn.close()
+
+
+def request_cancel(job_id, db_path=None):
+    """
+    작업 취소 요청
+
+    대기 중이면 바로 취소, 실행 중이면 취소 플래그만 기록
+    (워커가 다음 파트 시작 전에 확인 후 생성된 파일을 지우고 중단)
+
+    Returns:
+        취소(요청) 반영 여부 (이미 끝난 작업이면 False)
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (STATUS_CANCELLED, time.time(), job_id, STATUS_QUEUED)
+        )
+        if cur.rowcount:
+            return True
+        cur = conn.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+            (job_id, STATUS_RUNNING)
+        )
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+def is_cancel_requested(job_id, db_path=None):
+    """실행 중 작업의 취소 요청 여부"""
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+    finally:
+        conn.close()
+
+
+def heartbeat(job_id, db_path=None):
+    """실행 중 작업 하트비트 갱신"""
+    conn = _connect(db_path)
+    try:
+        conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+    finally:
+        conn.close()
+
+
+def finish_job(job_id, result=None, error=None, cancelled=False, db_path=None):
+    """작업 완료(result), 실패(error) 또는 취소 기록"""
+    conn = _connect(db_path)
+    try:
+        status = STATUS_CANCELLED if cancelled else STATUS_FAILED if error else STATUS_DONE
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+            "progress = CASE WHEN ? = ? THEN 1 ELSE progress END WHERE id = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+             error, time.time(), status, STATUS_DONE, job_id)
+        )
+    finally:
+        conn.close()
+
+
+def requeue_stale_jobs(stale_seconds=STALE_JOB_SECONDS, db_path=None):
+    """하트비트가 끊긴 실행 중 작업을 다시 대기열로 - 취소 요청된 작업은 취소 처리 (반환: 복구된 작업 수)"""
+    conn = _connect(db_path)
+    try:
+        now = time.time()
+        cur = conn.execute(
+            "UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END, "
+            "finished_at = CASE WHEN cancel_requested THEN ? ELSE finished_at END, "
+            "worker = NULL, progress = 0, progress_message = '', progress_detail = NULL "
+            "WHERE status = ? AND heartbeat_at < ?",
+            (STATUS_CANCELLED, STATUS_QUEUED, now, STATUS_RUNNING, now - stale_seconds)
+        )
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def run_vrew_build_job(job, db_path=None):
+    """
+    Step 3 빌드 작업 실행 (워커 프로세스에서 호출)
+
+    Returns:
+        {'files': 생성된 파일 정보 리스트, 'archive': 전체 ZIP 경로 (파트 1개면 None),
+         'normalize': 이미지 정규화 리포트 (미사용 시 None), 'dedupe': 중복 제거 리포트 (미사용 시 None)}
+    """
+    from modules.vrew_builder import build_vrew_parts, bundle_vrew_parts
+
+    last_event = {}
+
+    def on_progress(event):
+        last_event.update(event)
+        if event['clips_total']:
+            progress = event['clips_done'] / event['clips_total']
+        else:
+            progress = event['part'] / max(1, event['parts'])
+        message = f"{event['part']}/{event['parts']} 파일 생성"
+        if event['file']:
+            message += f": {event['file']['filename']}"
+        update_progress(job['id'], progress, message, detail=event, db_path=db_path)
+
+    def should_cancel():
+        return is_cancel_requested(job['id'], db_path)
+
+    payload = job['payload']
+    files = build_vrew_parts(progress_callback=on_progress, should_cancel=should_cancel, **payload)
+
+    # 여러 파트면 전체 다운로드용 ZIP을 여기서 1회 생성 (다운로드 화면에서는 파일만 읽음)
+    archive = None
+    if len(files) > 1:
+        update_progress(job['id'], 1.0, "전체 다운로드 ZIP 생성 중...", db_path=db_path)
+        archive = bundle_vrew_parts(
+            files, os.path.join(payload['output_dir'], f"{payload['script_name']}_전체_{job['id']}.zip")
+        )
+
+    return {'files': files, 'archive': archive, 'normalize': last_event.get('normalize'),
+            'dedupe': last_event.get('dedupe')}
+
+
+def _heartbeat_loop(job_id, stop_event, db_path):
+    """작업 실행 중 주기적으로 하트비트 갱신 (긴 파일 1개 생성 중에도 복구 대상이 되지 않도록)"""
+    while not stop_event.wait(HEARTBEAT_INTERVAL):
+        try:
+            heartbeat(job_id, db_path)
+        except Exception as e:
+            print(f"[JobWorker] 하트비트 실패 (job {job_id}): {e}")
+
+
+def worker_loop(worker_name, db_path=None, poll_interval=1.0, stop_event=None):
+    """
+    워커 메인 루프: 대기 작업 할당 → 실행 → 결과 기록
+
+    Args:
+        worker_name: 워커 이름 (작업 기록용)
+        db_path: 작업 DB 경로
+        poll_interval: 대기 작업이 없을 때 재조회 간격 (초)
+        stop_event: 종료 신호 (multiprocessing/threading Event, 선택)
+    """
+    from modules.vrew_builder import BuildCancelled
+
+    print(f"[JobWorker] {worker_name} 시작")
+
+    while stop_event is None or not stop_event.is_set():
+        try:
+            recovered = requeue_stale_jobs(db_path=db_path)
+            if recovered:
+                print(f"[JobWorker] 중단된 작업 {recovered}개 재등록")
+
+            job = claim_next_job(worker_name, db_path)
+        except sqlite3.Error as e:
+            print(f"[JobWorker] DB 오류: {e}")
+            time.sleep(poll_interval)
+            continue
+
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        print(f"[JobWorker] {worker_name} → job {job['id']} (user {job['user_id']})")
+        hb_stop = threading.Event()
+        hb_thread = threading.Thread(target=_heartbeat_loop, args=(job['id'], hb_stop, db_path), daemon=True)
+        hb_thread.start()
+
+        try:
+            result = run_vrew_build_job(job, db_path)
+            finish_job(job['id'], result=result, db_path=db_path)
+            print(f"[JobWorker] ✅ job {job['id']} 완료 ({len(result['files'])}개 파일)")
+        except BuildCancelled as e:
+            finish_job(job['id'], cancelled=True, db_path=db_path)
+            print(f"[JobWorker] ⏹ job {job['id']} 취소: {e}")
+        except Exception as e:
+            finish_job(job['id'], error=f"{e}\n{traceback.format_exc()}", db_path=db_path)
+            print(f"[JobWorker] ❌ job {job['id']} 실패: {e}")
+        finally:
+            hb_stop.set()
+
+
+def start_worker_pool(num_workers=JOB_WORKERS, db_path=None):
+    """
+    워커 프로세스 풀 시작 (daemon - 부모 프로세스 종료 시 함께 종료)
+
+    Returns:
+        Process 리스트
+    """
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for i in range(num_workers):
+        process = ctx.Process(
+            target=worker_loop,
+            args=(f"worker-{os.getpid()}-{i+1}", db_path),
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+    print(f"[JobWorker] 워커 {num_workers}개 시작 (DB: {db_path or JOBS_DB_PATH})")
+    return processes
@@ -0,0 +1,171 @@
+"""
+이미지/영상 ↔ 씬 매핑 모듈
+- 파일명 번호 추출 (001.jpg → 1)
+- 고정 번호 규칙: 씬 idx → A: idx*2+1, B: idx*2+2
+- 폴더 단위 일괄 매핑 (배치 생성용)
+- 매핑 누락/초과 번호 리포트
+"""
+
+import os
+import re
+
+# 씬 이미지로 허용하는 확장자 (그 외는 .png로 저장)
+MEDIA_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.mp4']
+
+
+def extract_file_number(filename):
+    """파일명 앞쪽 숫자 추출 (없으면 9999)"""
+    match = re.match(r'^(\d+)', filename)
+    return int(match.group(1)) if match else 9999
+
+
+def scene_file_numbers(scene_idx):
+    """
+    씬 인덱스 → (A 파일 번호, B 파일 번호)
+
+    씬 1-1 (idx 0): 001 (A), 002 (B)
+    씬 1-2 (idx 1): 003 (A), 004 (B)
+    """
+    return scene_idx * 2 + 1, scene_idx * 2 + 2
+
+
+def file_number_slot(file_num):
+    """파일 번호 → (씬 인덱스, 'A'/'B') - scene_file_numbers의 역변환"""
+    return (file_num - 1) // 2, 'A' if file_num % 2 else 'B'
+
+
+def normalize_media_ext(filename):
+    """원본 확장자 유지 (허용되지 않은 확장자는 .png)"""
+    ext = os.path.splitext(filename)[1].lower()
+    return ext if ext in MEDIA_EXTENSIONS else '.png'
+
+
+def map_image_folder(image_dir, scenes):
+    """
+    폴더 안의 번호 파일을 씬 A/B 슬롯에 매핑
+
+    Args:
+        image_dir: 이미지/영상 폴더 (001.jpg, 002.png, 003.mp4 ...)
+        scenes: 씬 리스트
+
+    Returns:
+        (images_by_shot, mapping_log)
+        images_by_shot = {raw_id: {'A': {'path', 'file_num', 'original_name'}, 'B': {...}}}
+    """
+    files_by_number = {}
+    for name in sorted(os.listdir(image_dir)):
+        path = os.path.join(image_dir, name)
+        ext = os.path.splitext(name)[1].lower()
+        if not os.path.isfile(path) or ext not in MEDIA_EXTENSIONS:
+            continue
+        files_by_number[extract_file_number(name)] = path
+
+    return assign_numbered_files(scenes, {
+        file_num: {'path': path, 'original_name': os.path.basename(path)}
+        for file_num, path in files_by_number.items()
+    })
+
+
+def assign_numbered_files(scenes, files_by_number, images_by_shot=None):
+    """
+    번호별 파일 정보를 씬 A/B 슬롯에 매핑
+
+    Args:
+        scenes: 씬 리스트
+        files_by_number: {파일 번호: {'path', 'original_name', ...}}
+        images_by_shot: 기존 매핑 (주어지면 해당 번호가 있는 슬롯만 덮어씀)
+
+    Returns:
+        (images_by_shot, mapping_log)
+    """
+    images_by_shot = {} if images_by_shot is None else images_by_shot
+    mapping_log = []
+
+    for scene_idx, scene in enumerate(scenes):
+        raw_id = scene['raw_id']
+        shot = images_by_shot.setdefault(raw_id, {})
+        shot_images = []
+
+        for slot, file_num in zip(['A', 'B'], scene_file_numbers(scene_idx)):
+            if file_num in files_by_number:
+                info = files_by_number[file_num]
+                shot[slot] = dict(info, file_num=file_num)
+                shot_images.append(f"{info['original_name']} ({slot})")
+            elif slot in shot:
+                shot_images.append(f"{shot[slot]['original_name']} ({slot}, 기존)")
+            else:
+                shot_images.append(f"{file_num:03d} 없음 ({slot})")
+
+        mapping_log.append(f"씬 {raw_id}: {' + '.join(shot_images)}")
+
+    return images_by_shot, mapping_log
+
+
+def update_numbered_slots(images_by_shot, scenes, files_by_number, file_numbers, stale_hashes=()):
+    """
+    지정한 번호의 슬롯만 갱신 (증분 업로드용 - 나머지 슬롯은 건드리지 않음)
+
+    Args:
+        images_by_shot: 기존 매핑 (제자리 수정)
+        scenes: 씬 리스트
+        files_by_number: 현재 업로드 전체 {파일 번호: 파일 정보}
+        file_numbers: 갱신할 번호들 (추가/삭제된 업로드의 번호)
+        stale_hashes: 업로더에서 빠진 파일 해시 (슬롯이 아직 이 파일이면 비움)
+
+    Returns:
+        갱신 로그 리스트
+    """
+    log = []
+    for file_num in sorted(set(file_numbers)):
+        if file_num < 1:
+            continue
+        scene_idx, slot = file_number_slot(file_num)
+        if scene_idx >= len(scenes):
+            continue
+
+        raw_id = scenes[scene_idx]['raw_id']
+        shot = images_by_shot.setdefault(raw_id, {})
+        info = files_by_number.get(file_num)
+
+        if info:
+            if shot.get(slot, {}).get('hash') != info['hash']:
+                shot[slot] = dict(info, file_num=file_num)
+                log.append(f"씬 {raw_id}: {info['original_name']} ({slot})")
+        elif slot in shot and shot[slot].get('hash') in stale_hashes:
+            del shot[slot]
+            log.append(f"씬 {raw_id}: {file_num:03d} 제거 ({slot})")
+
+    return log
+
+
+def find_mapping_gaps(file_numbers, scene_count):
+    """
+    매핑 누락/초과 번호 확인
+
+    Args:
+        file_numbers: 업로드된 파일 번호들
+        scene_count: 씬 개수 (필요 번호: 1 ~ scene_count*2)
+
+    Returns:
+        (missing, unmapped) - 없는 번호 / 씬 범위를 벗어난 번호 (정렬됨)
+    """
+    numbers = set(file_numbers)
+    last = scene_count * 2
+    missing = [n for n in range(1, last + 1) if n not in numbers]
+    unmapped = sorted(n for n in numbers if n < 1 or n > last)
+    return missing, unmapped
+
+
+def format_number_ranges(numbers, limit=20):
+    """번호 목록을 구간 문자열로 (1,2,3,7 → '001~003, 007')"""
+    ranges = []
+    for n in sorted(numbers):
+        if ranges and n == ranges[-1][1] + 1:
+            ranges[-1][1] = n
+        else:
+            ranges.append([n, n])
+
+    parts = [f"{a:03d}" if a == b else f"{a:03d}~{b:03d}" for a, b in ranges[:limit]]
+    if len(ranges) > limit:
+        parts.append(f"외 {len(ranges) - limit}구간")
+    return ", ".join(parts)
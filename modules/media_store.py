@@ -0,0 +1,366 @@
+"""
+업로드 미디어 저장소 모듈 (Step 2)
+- 업로드 파일은 디스크에만 저장 (세션 메모리에 bytes 보관 안 함)
+- 내용 해시(sha256) 기준 파일명 → 같은 파일은 한 번만 저장
+- 미리보기 썸네일: OpenCV로 1회 생성 후 해시 기준 캐시
+- ZIP/TAR 일괄 업로드: 항목을 청크 단위로 바로 저장소에 기록
+- 지각 해시(dHash): 저장할 때 1회 계산 (중복 이미지 탐지용, image_dedup)
+"""
+
+import hashlib
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from modules.media_mapper import MEDIA_EXTENSIONS, extract_file_number, normalize_media_ext
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 업로드 원본 저장 폴더
+MEDIA_STORE_DIR = os.path.join(BASE_DIR, "outputs", "images")
+
+# 썸네일 캐시 폴더 (내용 해시 기준이라 세션 간 공유)
+THUMB_CACHE_DIR = os.path.join(BASE_DIR, "outputs", "thumbs")
+
+# 썸네일 가로 크기 / JPEG 품질
+THUMB_WIDTH = 480
+THUMB_QUALITY = 80
+
+# 썸네일 생성 워커 수 (OpenCV는 GIL을 해제하므로 스레드 풀로 충분)
+THUMB_WORKERS = min(8, os.cpu_count() or 1)
+
+# 업로드 저장(해시 계산 + 기록) 워커 수 (hashlib/파일 쓰기 모두 GIL 해제)
+STORE_WORKERS = min(8, os.cpu_count() or 1)
+
+# 압축 항목 스트리밍 청크 크기
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# 지각 해시 캐시 {내용 해시: dHash} - 같은 파일은 다시 디코딩하지 않음
+_dhash_cache = {}
+
+
+def content_hash(data):
+    """파일 내용 해시 (sha256 hex)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path, data):
+    """임시 파일에 쓴 뒤 rename (동시 요청 시 반쯤 쓰인 파일 노출 방지, 임시 파일명은 호출마다 고유 - 스레드 안전)"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def store_upload(data, original_name, store_dir=MEDIA_STORE_DIR):
+    """
+    업로드 파일을 디스크에 저장 (이미 같은 내용이 있으면 쓰기 생략)
+
+    Args:
+        data: 파일 내용 (bytes 또는 memoryview)
+        original_name: 원본 파일명 (확장자 판별용)
+        store_dir: 저장 폴더
+
+    Returns:
+        {'path', 'hash', 'original_name', 'dhash'}
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    file_hash = content_hash(data)
+    path = os.path.join(store_dir, f"{file_hash}{normalize_media_ext(original_name)}")
+
+    if not os.path.exists(path):
+        _atomic_write(path, data)
+
+    return {
+        'path': path,
+        'hash': file_hash,
+        'original_name': original_name,
+        'dhash': perceptual_hash(path, file_hash)
+    }
+
+
+def ingest_uploads(uploads, ingested=None, store_dir=MEDIA_STORE_DIR, max_workers=STORE_WORKERS):
+    """
+    업로드 목록 증분 저장 - 처음 보는 업로드만 해시 계산 + 기록 (병렬)
+
+    Args:
+        uploads: [(업로드 ID, 파일명, 데이터)] - 현재 업로더에 있는 전체 목록 (업로드 순서)
+        ingested: 이전 호출 결과 {업로드 ID: 저장 정보}
+        store_dir: 저장 폴더
+
+    Returns:
+        (ingested, added, removed)
+        ingested = {업로드 ID: {'path', 'hash', 'original_name', 'dhash', 'file_num'}} (업로드 순서)
+        added / removed = 새로 저장된 / 업로더에서 빠진 저장 정보 리스트
+    """
+    ingested = ingested or {}
+    current_ids = {upload_id for upload_id, _, _ in uploads}
+    removed = [info for upload_id, info in ingested.items() if upload_id not in current_ids]
+    new_uploads = [(upload_id, name, data) for upload_id, name, data in uploads if upload_id not in ingested]
+
+    stored = {}
+    if new_uploads:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                upload_id: executor.submit(store_upload, data, name, store_dir)
+                for upload_id, name, data in new_uploads
+            }
+            stored = {upload_id: future.result() for upload_id, future in futures.items()}
+
+    result = {}
+    added = []
+    for upload_id, name, _ in uploads:
+        if upload_id in stored:
+            info = dict(stored[upload_id], file_num=extract_file_number(name))
+            added.append(info)
+        else:
+            info = ingested[upload_id]
+        result[upload_id] = info
+
+    return result, added, removed
+
+
+def store_stream(fileobj, original_name, store_dir=MEDIA_STORE_DIR, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    파일 객체를 청크 단위로 읽으며 해시 계산 + 임시 파일 기록 후 rename
+    (파일 전체를 메모리에 올리지 않음)
+
+    Returns:
+        {'path', 'hash', 'original_name', 'size'}
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+                hasher.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+        file_hash = hasher.hexdigest()
+        path = os.path.join(store_dir, f"{file_hash}{normalize_media_ext(original_name)}")
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {
+        'path': path,
+        'hash': file_hash,
+        'original_name': original_name,
+        'size': size
+    }
+
+
+def _is_media_entry(name):
+    """압축 항목 중 씬 미디어 파일 여부 (숨김/macOS 메타데이터 제외)"""
+    base = os.path.basename(name)
+    if not base or base.startswith('.') or '__MACOSX' in name:
+        return False
+    return os.path.splitext(base)[1].lower() in MEDIA_EXTENSIONS
+
+
+def _iter_archive_entries(fileobj, archive_name):
+    """압축 파일 항목을 (파일명, 읽기 스트림)으로 순회 (zip: 중앙 디렉터리, tar: 순차 스트림)"""
+    if archive_name.lower().endswith('.zip'):
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not _is_media_entry(info.filename):
+                    continue
+                with zf.open(info) as stream:
+                    yield os.path.basename(info.filename), stream
+    else:
+        # tar / tar.gz / tgz - 'r|*' 모드는 되감기 없이 앞에서부터 한 번만 읽음
+        with tarfile.open(fileobj=fileobj, mode='r|*') as tf:
+            for member in tf:
+                if not member.isfile() or not _is_media_entry(member.name):
+                    continue
+                stream = tf.extractfile(member)
+                if stream is not None:
+                    yield os.path.basename(member.name), stream
+
+
+def ingest_archive(fileobj, archive_name, store_dir=MEDIA_STORE_DIR):
+    """
+    ZIP/TAR 안의 번호 파일(001.jpg, 002.mp4 ...)을 저장소에 스트리밍 저장
+
+    Args:
+        fileobj: 압축 파일 객체 (zip은 seek 가능해야 함)
+        archive_name: 압축 파일명 (형식 판별용)
+        store_dir: 저장 폴더
+
+    Returns:
+        {
+            'files_by_number': {파일 번호: store_stream 결과 + 'dhash'},
+            'skipped': 번호 없는 파일명 리스트,
+            'duplicates': 같은 번호가 여러 번 나온 파일명 리스트 (나중 항목 사용),
+            'bytes': 기록한 총 바이트, 'elapsed': 소요 시간(초)
+        }
+    """
+    start = time.perf_counter()
+    files_by_number = {}
+    skipped = []
+    duplicates = []
+    total_bytes = 0
+
+    for name, stream in _iter_archive_entries(fileobj, archive_name):
+        file_num = extract_file_number(name)
+        if file_num == 9999:
+            skipped.append(name)
+            continue
+
+        stored = store_stream(stream, name, store_dir)
+        total_bytes += stored['size']
+        if file_num in files_by_number:
+            duplicates.append(name)
+        files_by_number[file_num] = stored
+
+    # 지각 해시는 압축 해제가 끝난 뒤 병렬로 (스트림 읽기를 막지 않도록)
+    ensure_perceptual_hashes(list(files_by_number.values()))
+
+    elapsed = time.perf_counter() - start
+    print(f"[MediaStore] 압축 업로드 {archive_name}: {len(files_by_number)}개 저장 "
+          f"({total_bytes / 1024 / 1024:.1f}MB, {elapsed:.1f}초)")
+
+    return {
+        'files_by_number': files_by_number,
+        'skipped': skipped,
+        'duplicates': duplicates,
+        'bytes': total_bytes,
+        'elapsed': elapsed
+    }
+
+
+def is_video(path):
+    """영상 파일 여부 (mp4)"""
+    return path.lower().endswith('.mp4')
+
+
+def perceptual_hash(path, file_hash=None):
+    """
+    지각 해시 (64비트) - 축소 흑백 8x8에서 가로로 이웃한 픽셀 밝기 비교(dHash 56비트)
+    + 평균 밝기 8비트 (온도계 코드: 0~8개의 1 → 밝기 단계 차이 = 해밍 거리)
+    - 밝기 비트가 없으면 단색/그라데이션 이미지는 밝기와 상관없이 같은 해시가 됨
+
+    Args:
+        path: 이미지 경로
+        file_hash: 내용 해시 (주면 캐시 사용)
+
+    Returns:
+        int 또는 None (영상/디코딩 실패)
+    """
+    if is_video(path):
+        return None
+    if file_hash and file_hash in _dhash_cache:
+        return _dhash_cache[file_hash]
+
+    try:
+        # 1/4 크기로 디코딩 (JPEG는 디코더가 바로 축소 → 빠름)
+        img = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if img is None:
+            return None
+        small = cv2.resize(img, (8, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        level = int(round(float(small.mean()) / 255 * 8))
+        value = (int.from_bytes(np.packbits(bits).tobytes(), 'big') << 8) | ((1 << level) - 1)
+    except Exception as e:
+        print(f"[MediaStore] 지각 해시 계산 실패: {path} - {e}")
+        return None
+
+    if file_hash:
+        _dhash_cache[file_hash] = value
+    return value
+
+
+def ensure_perceptual_hashes(infos, max_workers=THUMB_WORKERS):
+    """저장 정보 중 'dhash'가 없는 항목만 병렬로 계산해 채움 (제자리 수정)"""
+    missing = [info for info in infos if 'dhash' not in info]
+    if not missing:
+        return infos
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = list(executor.map(lambda info: perceptual_hash(info['path'], info.get('hash')), missing))
+    for info, value in zip(missing, hashes):
+        info['dhash'] = value
+    return infos
+
+
+def make_thumbnail(src_path, file_hash, thumb_dir=THUMB_CACHE_DIR, width=THUMB_WIDTH):
+    """
+    미리보기 썸네일 생성 (이미 있으면 기존 파일 사용)
+
+    Returns:
+        썸네일 경로 또는 None (영상/디코딩 실패)
+    """
+    if is_video(src_path):
+        return None
+
+    thumb_path = os.path.join(thumb_dir, f"{file_hash}_{width}.jpg")
+    if os.path.exists(thumb_path):
+        try:
+            # 사용 시각 갱신 → janitor가 보고 있는 썸네일은 지우지 않음
+            os.utime(thumb_path, None)
+            return thumb_path
+        except OSError:
+            pass  # 방금 정리됨 → 다시 생성
+
+    try:
+        # 한글 경로 대응: imread 대신 imdecode
+        img = cv2.imdecode(np.fromfile(src_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return None
+
+        h, w = img.shape[:2]
+        if w > width:
+            img = cv2.resize(img, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+
+        ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])
+        if not ok:
+            return None
+
+        os.makedirs(thumb_dir, exist_ok=True)
+        _atomic_write(thumb_path, buf.tobytes())
+        return thumb_path
+    except Exception as e:
+        print(f"[MediaStore] 썸네일 생성 실패: {src_path} - {e}")
+        return None
+
+
+def ensure_thumbnails(items, thumb_dir=THUMB_CACHE_DIR, width=THUMB_WIDTH, max_workers=THUMB_WORKERS):
+    """
+    여러 파일의 썸네일을 병렬로 미리 생성
+
+    Args:
+        items: [{'path', 'hash'}, ...]
+
+    Returns:
+        {hash: 썸네일 경로 또는 None}
+    """
+    unique = {item['hash']: item['path'] for item in items}
+    if not unique:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            file_hash: executor.submit(make_thumbnail, path, file_hash, thumb_dir, width)
+            for file_hash, path in unique.items()
+        }
+        return {file_hash: future.result() for file_hash, future in futures.items()}
@@ -0,0 +1,69 @@
+"""
+요청 속도 제한 / 재시도 대기 유틸
+- 토큰 버킷: 평균 초당 요청 수 + 순간 허용량(burst), 여러 스레드가 공유
+- 지터 백오프: 재시도 간격을 지수적으로 늘리되 무작위 분산 (동시 재시도 몰림 방지)
+"""
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷
+
+    Args:
+        rate: 초당 토큰 보충량 (평균 초당 요청 수)
+        burst: 버킷 최대 토큰 수 (순간 허용 요청 수)
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1.0):
+        """토큰이 생길 때까지 대기 후 차감 (반환: 대기한 시간(초))"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def reserve(self, tokens=1.0):
+        """토큰을 미리 차감하고 기다려야 할 시간(초)을 반환 (asyncio 등 직접 대기할 때)"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+    def penalize(self, seconds):
+        """서버가 속도 제한(429)을 알려오면 그 시간만큼 토큰을 비워 모든 요청을 늦춤"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    지터 백오프 대기 시간 (full jitter)
+
+    Args:
+        attempt: 재시도 횟수 (0부터)
+        base: 첫 재시도 최대 대기 (초)
+        cap: 최대 대기 (초)
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,414 @@
+"""
+대본 분할 모듈 (Step 1)
+- 엑셀/CSV 시작문장 파싱
+- 시작문장 기준 대본 분할 (Fuzzy Matching)
+- 문장 단위 클립 생성
+"""
+
+import codecs
+import io
+import re
+
+import pandas as pd
+
+
+# 문장 분할용 패턴 (모듈 로드 시 1회 컴파일)
+# 공백 이외 문자의 연속 = 어절 (줄바꿈/연속 공백은 자연스럽게 하나로 합쳐짐)
+WORD_PATTERN = re.compile(r'\S+')
+
+# 문장 종결 부호 (어절이 이 문자로 끝나면 문장 끝)
+SENTENCE_ENDINGS = ('.', '!', '?')
+
+
+def iter_sentences(text):
+    """
+    문장 단위 분할 제너레이터 (텍스트를 한 번만 훑음)
+
+    규칙:
+    - 줄바꿈/빈 행/연속 공백은 공백 하나로 합침
+    - 마침표(.), 물음표(?), 느낌표(!)로 끝나는 어절 뒤에서 분할
+    - "정말...그래요" 같은 어절 안의 말줄임표에서는 분할하지 않음
+    - 종결 부호가 없으면 남은 어절을 한 문장으로 반환
+    """
+    if not text:
+        return
+
+    words = []
+    for match in WORD_PATTERN.finditer(text):
+        word = match.group()
+        words.append(word)
+        if word.endswith(SENTENCE_ENDINGS):
+            yield ' '.join(words)
+            words = []
+
+    if words:
+        yield ' '.join(words)
+
+
+def split_text_30chars(text, max_chars=100):
+    """
+    문장 단위로 분할 (종결어미 기준)
+    
+    규칙:
+    - 마침표(.), 물음표(?), 느낌표(!) 뒤에서 분할
+    - 단일 문장은 분리하지 않음 (길어도 유지)
+    - max_chars를 넘어도 종결어미가 나올 때까지 유지
+    """
+    return list(iter_sentences(text))
+
+
+# A열 "1-1" 형식 (씬-샷) - 샷 번호는 두 번째 '-' 앞까지만 인정
+SCENE_SHOT_PATTERN = r'^\s*(\d+)\s*-(?:\s*(\d+)\s*(?=-|$))?'
+
+# 스트리밍 리더가 읽는 열 개수 (A: 씬-샷, B: 시작문장, C: 프롬프트)
+SHEET_COLUMNS = 3
+
+
+def _column_as_text(df, col_idx):
+    """DataFrame 열을 문자열 Series로 변환 (열이 없으면 빈 문자열, 결측값은 'nan')"""
+    if df.shape[1] <= col_idx:
+        return pd.Series("", index=df.index, dtype=object)
+    # 결측값(NaN/None)을 먼저 'nan'으로 - pandas 2.x는 astype(str)에서 None을 'None'으로 바꿈 (스트리밍 리더의 빈 셀)
+    return df.iloc[:, col_idx].fillna('nan').astype(str).str.strip()
+
+
+def parse_excel(df):
+    """엑셀 파일 파싱 - A열(씬-샷), B열(시작문장), C열(프롬프트)"""
+    # 엑셀에 헤더가 없는 경우를 대비해 iloc로 접근
+    # 예상 컬럼: 0:Scene-Shot(1-1), 1:Start_Text, 2:Prompt
+    # 행 단위(iterrows) 대신 열 단위 벡터 연산으로 처리
+    if df is None or len(df) == 0:
+        return []
+
+    raw_ids = _column_as_text(df, 0)
+    start_texts = _column_as_text(df, 1)
+    prompts = _column_as_text(df, 2)
+
+    # A열 Parsing (1-1 -> Scene 1, Shot 1)
+    nums = raw_ids.str.extract(SCENE_SHOT_PATTERN)
+    scene_nums = pd.to_numeric(nums[0], errors='coerce').fillna(-1).astype(int)
+    shot_nums = pd.to_numeric(nums[1], errors='coerce').fillna(-1).astype(int)
+
+    valid = (scene_nums > 0) & (start_texts != '') & (start_texts != 'nan')
+
+    return [
+        {
+            'scene_num': scene_num,
+            'shot_num': shot_num,
+            'start_text': start_text,
+            'prompt': prompt,
+            'raw_id': raw_id
+        }
+        for scene_num, shot_num, start_text, prompt, raw_id in zip(
+            scene_nums[valid].tolist(),
+            shot_nums[valid].tolist(),
+            start_texts[valid].tolist(),
+            prompts[valid].tolist(),
+            raw_ids[valid].tolist()
+        )
+    ]
+
+
+def detect_csv_encoding(raw_bytes):
+    """
+    CSV 인코딩 판별 (원본 바이트만 검사, 파싱 없음)
+    1. UTF-8 BOM → utf-8-sig
+    2. 엄격한 UTF-8 디코딩 성공 → utf-8
+    3. CP949 디코딩 성공 → cp949 (EUC-KR 상위 호환)
+
+    Returns:
+        인코딩 이름 또는 None (인식 불가)
+    """
+    if raw_bytes.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    for encoding in ['utf-8', 'cp949']:
+        try:
+            raw_bytes.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+    return None
+
+
+def read_excel_streaming(source, max_cols=SHEET_COLUMNS):
+    """
+    엑셀(.xlsx) 첫 번째 시트의 앞쪽 열만 스트리밍으로 읽기
+    - openpyxl read-only 모드 (전체 워크북을 메모리에 올리지 않음)
+    - pd.read_excel과 동일하게 첫 행을 헤더로 사용
+
+    Args:
+        source: 파일 경로 또는 file-like 객체
+        max_cols: 읽을 열 개수 (기본 3: A~C열)
+
+    Returns:
+        DataFrame
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = [tuple(row) for row in ws.iter_rows(max_col=max_cols, values_only=True)]
+    finally:
+        wb.close()
+
+    # 끝쪽 빈 행 제거 (pd.read_excel과 동일)
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    if not rows:
+        return pd.DataFrame()
+
+    # 실제 값이 있는 열까지만 사용
+    width = max((i + 1 for row in rows for i, v in enumerate(row) if v is not None), default=0)
+    header = rows[0]
+    columns = []
+    for i in range(width):
+        name = header[i] if i < len(header) else None
+        columns.append(str(name) if name is not None else f"Unnamed: {i}")
+
+    data = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows[1:]]
+    return pd.DataFrame(data, columns=columns)
+
+
+def read_scene_sheet(raw_bytes, file_name, encoding=None):
+    """
+    씬 정보 시트(엑셀/CSV) 로드
+
+    Args:
+        raw_bytes: 업로드 파일 바이트
+        file_name: 파일명 (확장자로 형식 판별)
+        encoding: CSV 인코딩 (None이면 detect_csv_encoding으로 판별)
+
+    Returns:
+        DataFrame 또는 None (CSV 인코딩/파싱 실패)
+    """
+    if file_name.lower().endswith('.csv'):
+        encoding = encoding or detect_csv_encoding(raw_bytes)
+        if encoding is None:
+            return None
+        try:
+            return pd.read_csv(io.BytesIO(raw_bytes), encoding=encoding)
+        except Exception as e:
+            print(f"[Step1] CSV 파싱 실패 ({encoding}): {e}")
+            return None
+    if file_name.lower().endswith('.xlsx'):
+        # A~C열만 read-only 모드로 스트리밍
+        return read_excel_streaming(io.BytesIO(raw_bytes))
+    return pd.read_excel(io.BytesIO(raw_bytes))
+
+
+def normalize_text(text):
+    """
+    1. 괄호와 그 안의 내용 제거
+    2. 공백, 특수문자 제거 후 정규화된 텍스트와 원본 인덱스 매핑 반환
+    """
+    if not text:
+        return "", []
+    
+    # 원본 텍스트 매핑을 위해 전체 텍스트 순회
+    normalized = ""
+    mapping = []
+    
+    # 괄호 안의 내용은 매핑에서 건너뛰고 싶지만, 
+    # 원본(script_text)은 괄호가 없을 수도 있고 있을 수도 있음.
+    # 단순화를 위해: 원본은 alphanumeric만 남기는 정규화.
+    # 검색어(markers)는 괄호를 제거하고 정규화.
+    
+    for i, char in enumerate(text):
+        if char.isalnum():
+            normalized += char
+            mapping.append(i)
+            
+    return normalized, mapping
+
+def normalize_search_text(text):
+    """검색어 전용 정규화 (괄호 내용 삭제)"""
+    if not text:
+        return ""
+    # (경어) 등 제거
+    text_clean = re.sub(r'\(.*?\)', '', text)
+    
+    normalized = ""
+    for char in text_clean:
+        if char.isalnum():
+            normalized += char
+    return normalized
+
+def find_fuzzy(full_text_norm, full_text_map, search_text, start_offset_idx=0):
+    """
+    정규화된 텍스트에서 검색어 위치 찾기
+    """
+    search_norm = normalize_search_text(search_text)
+    
+    if len(search_norm) < 3:
+        return -1
+        
+    start_norm_idx = -1
+    
+    # start_offset_idx(원본 인덱스)에 해당하는 정규화 인덱스 찾기
+    # full_text_map은 정규화된 i번째 글자가 원본의 map[i]번째 글자임을 뜻함
+    # 따라서 map[k] >= start_offset_idx 인 최소 k를 찾아야 함
+    # (단순 선형 탐색은 느릴 수 있으나 텍스트 크기가 크지 않아 괜찮음)
+    
+    current_norm_offset = 0
+    if start_offset_idx > 0:
+        for i, original_idx in enumerate(full_text_map):
+            if original_idx >= start_offset_idx:
+                current_norm_offset = i
+                break
+        else:
+            return -1 # 범위를 벗어남
+            
+    # 검색 범위 제한 (검색 속도 최적화)
+    search_space = full_text_norm[current_norm_offset:]
+    
+    # 1. 전체 매칭
+    idx = search_space.find(search_norm)
+    
+    # 2. 앞 20자 매칭
+    if idx == -1:
+        snippet = search_norm[:20]
+        if len(snippet) >= 5:
+            idx = search_space.find(snippet)
+            
+    # 3. 앞 10자 매칭
+    if idx == -1:
+        snippet = search_norm[:10]
+        if len(snippet) >= 5:
+            idx = search_space.find(snippet)
+
+    # 4. 앞 5자 매칭 (강력한 오타 대응)
+    if idx == -1:
+        snippet = search_norm[:5]
+        if len(snippet) >= 3:
+            idx = search_space.find(snippet)
+            
+    # 5. 뒤 20자 매칭 (앞부분 오타 대비)
+    if idx == -1:
+        snippet = search_norm[-20:]
+        if len(snippet) >= 5:
+            idx = search_space.find(snippet)
+            if idx != -1:
+                idx = idx - len(search_norm) + len(snippet)
+
+    if idx != -1:
+        # 찾은 정규화 인덱스를 원본 인덱스로 변환
+        found_norm_abs = current_norm_offset + idx
+        # 범위 체크
+        if found_norm_abs < len(full_text_map):
+            return full_text_map[found_norm_abs]
+            
+    return -1
+
+def split_script_by_markers(script_text, markers):
+    """시작 문장 기준으로 대본 분할 (Fuzzy Matching 적용) - 순서 자동 정렬"""
+
+    # 전체 텍스트 정규화 (한 번만 수행)
+    norm_full, map_full = normalize_text(script_text)
+
+    # 1단계: 모든 마커의 위치를 먼저 찾음 (순서 제한 없이, 전체 텍스트에서)
+    marker_positions = []
+    for i, marker in enumerate(markers):
+        start_text = marker['start_text']
+
+        # 전체 텍스트에서 검색 (current_pos 제한 없이)
+        start_pos = find_fuzzy(norm_full, map_full, start_text, 0)
+
+        # 못 찾았을 경우 원본 find 시도
+        if start_pos == -1:
+            start_pos = script_text.find(start_text[:10])
+
+        if start_pos == -1:
+            print(f"Warning: Cannot find match for Scene {marker['raw_id']}: '{start_text[:20]}...'")
+
+        marker_positions.append({
+            'original_idx': i,
+            'marker': marker,
+            'pos': start_pos
+        })
+
+    # 2단계: 위치 순서대로 정렬 (찾은 것만)
+    found_markers = [m for m in marker_positions if m['pos'] != -1]
+    found_markers.sort(key=lambda x: x['pos'])
+
+    # 3단계: 각 마커에 대해 텍스트 구간 결정
+    text_map = {}  # original_idx -> scene_text
+
+    for i, item in enumerate(found_markers):
+        start_pos = item['pos']
+
+        # 다음 마커의 시작 위치 = 현재 마커의 종료 위치
+        if i + 1 < len(found_markers):
+            end_pos = found_markers[i + 1]['pos']
+        else:
+            end_pos = len(script_text)
+
+        scene_text = script_text[start_pos:end_pos].strip()
+        text_map[item['original_idx']] = scene_text
+
+    # 4단계: 원래 Excel 순서대로 scenes 배열 구성
+    scenes = []
+    for i, marker in enumerate(markers):
+        scene_text = text_map.get(i, "")  # 못 찾은 경우 빈 문자열
+
+        scenes.append({
+            'scene_num': marker['scene_num'],
+            'shot_num': marker['shot_num'],
+            'raw_id': marker['raw_id'],
+            'text': scene_text,
+            'prompt': marker['prompt']
+        })
+
+    return scenes
+
+
+def create_clips(scenes):
+    """
+    씬을 문장 단위 클립으로 분할 (지연 이터레이터)
+
+    각 클립은 씬 필드를 복사하지 않고 씬 인덱스만 참조함
+    (raw_id, prompt 등은 scenes[clip['scene_idx']]에서 조회)
+
+    Yields:
+        {'scene_idx': int, 'text': str}
+    """
+    for scene_idx, scene in enumerate(scenes):
+        for chunk in iter_sentences(scene['text']):
+            yield {
+                'scene_idx': scene_idx,
+                'text': chunk
+            }
+
+
+def build_clip_index(clips, scene_count):
+    """
+    씬별 클립 구간 오프셋 테이블 생성 (선형 시간, 1회)
+
+    create_clips는 씬 순서대로 클립을 만들기 때문에 한 씬의 클립은
+    clips 리스트 안에서 항상 연속 구간을 이룸
+
+    Args:
+        clips: create_clips 결과 리스트
+        scene_count: 씬 개수
+
+    Returns:
+        clip_index[scene_idx] = (start, end) → clips[start:end]
+    """
+    counts = [0] * scene_count
+    for clip in clips:
+        counts[clip['scene_idx']] += 1
+
+    clip_index = []
+    offset = 0
+    for count in counts:
+        clip_index.append((offset, offset + count))
+        offset += count
+    return clip_index
+
+
+def get_scene_clips(clips, clip_index, scene_idx):
+    """씬 인덱스에 해당하는 클립 목록 (오프셋 테이블 조회)"""
+    start, end = clip_index[scene_idx]
+    return clips[start:end]
@@ -0,0 +1,242 @@
+"""
+이미지 생성 대역(stand-in) HTTP 서버 (오프라인 개발/벤치마크용)
+- Pollinations와 같은 형식: GET /prompt/<프롬프트>?width=&height=&seed= → JPEG 이미지
+- Replicate와 같은 형식: POST /v1/models/<모델>/predictions → GET /v1/predictions/<id> 로 상태 확인
+  → 완료되면 output의 /files/<id>.jpg 다운로드
+- 응답 지연, 무작위 실패(500 / 예측 failed), 속도 제한(429 + Retry-After)을 흉내냄
+- 이미지는 (프롬프트, 시드)마다 다른 색 블록 패턴 (같은 요청 = 같은 이미지)
+사용: with run_standin_server(latency=(0.2, 0.6)) as (base_url, stats): ...
+"""
+
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.parse
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.rate_limiter import TokenBucket
+
+# 대역 서버 기본 동작: 응답 지연 범위(초) / 허용 속도 / 순간 허용량 / 무작위 500 비율 / 무작위 429 비율
+STANDIN_LATENCY = (0.2, 0.6)
+STANDIN_RATE = 8.0
+STANDIN_BURST = 8
+STANDIN_FAILURE_RATE = 0.02
+STANDIN_THROTTLE_RATE = 0.03
+
+# Replicate 대역: 예측 완료까지 걸리는 시간 범위 (초)
+STANDIN_PREDICTION_TIME = (1.0, 3.0)
+
+
+@lru_cache(maxsize=256)
+def render_standin_image(prompt, seed, width, height):
+    """(프롬프트, 시드)로 정해지는 16x9 색 블록 이미지 JPEG 바이트"""
+    from PIL import Image
+
+    digest = hashlib.sha256(f"{prompt}|{seed}".encode('utf-8')).digest()
+    rng = random.Random(digest)
+    blocks = Image.new('RGB', (16, 9))
+    blocks.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(16 * 9)])
+
+    buffer = io.BytesIO()
+    blocks.resize((width, height), Image.NEAREST).save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def make_handler(latency, rate, burst, failure_rate, throttle_rate, prediction_time, stats):
+    """설정값을 담은 요청 핸들러 클래스 생성"""
+    bucket = TokenBucket(rate, burst)
+    lock = threading.Lock()
+    predictions = {}            # {id: 예측 상태}
+    prediction_ids = itertools.count(1)
+
+    def count(name):
+        with lock:
+            stats[name] += 1
+
+    def take_token():
+        """서버 측 속도 제한 (토큰 없거나 무작위 429 대상이면 False)"""
+        with bucket.lock:
+            bucket._refill(time.monotonic())
+            allowed = bucket.tokens >= 1
+            if allowed:
+                bucket.tokens -= 1
+        if not allowed or random.random() < throttle_rate:
+            count('throttled')
+            return False
+        return True
+
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive (연결 재사용 측정용)
+
+        def _send_empty(self, status, headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def _send_bytes(self, status, payload, content_type):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_prediction(self, status, prediction_id):
+            """예측 상태 JSON (완료 시각이 지났으면 succeeded/failed로 전환)"""
+            base_url = f"http://{self.headers.get('Host')}"
+            with lock:
+                prediction = predictions[prediction_id]
+                elapsed = time.monotonic() - prediction['created']
+                if prediction['status'] in ('starting', 'processing'):
+                    if elapsed >= prediction['duration']:
+                        prediction['status'] = 'failed' if prediction['fail'] else 'succeeded'
+                    elif elapsed >= 0.2:
+                        prediction['status'] = 'processing'
+                body = {
+                    'id': prediction_id,
+                    'status': prediction['status'],
+                    'error': "standin: prediction failed" if prediction['status'] == 'failed' else None,
+                    'output': [f"{base_url}/files/{prediction_id}.jpg"] if prediction['status'] == 'succeeded' else None,
+                    'urls': {
+                        'get': f"{base_url}/v1/predictions/{prediction_id}",
+                        'cancel': f"{base_url}/v1/predictions/{prediction_id}/cancel"
+                    }
+                }
+            self._send_bytes(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+        def do_POST(self):
+            count('requests')
+            path = urllib.parse.urlsplit(self.path).path
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+
+            # 예측 취소
+            if path.startswith('/v1/predictions/') and path.endswith('/cancel'):
+                prediction_id = path.split('/')[3]
+                with lock:
+                    if prediction_id in predictions and predictions[prediction_id]['status'] in ('starting', 'processing'):
+                        predictions[prediction_id]['status'] = 'canceled'
+                if prediction_id in predictions:
+                    self._send_prediction(200, prediction_id)
+                else:
+                    self._send_empty(404)
+                return
+
+            # 예측 생성 (/v1/models/<owner>/<name>/predictions 또는 /v1/predictions)
+            if not (path == '/v1/predictions' or (path.startswith('/v1/models/') and path.endswith('/predictions'))):
+                self._send_empty(404)
+                return
+            if not take_token():
+                self._send_empty(429, [('Retry-After', '1')])
+                return
+
+            model_input = body.get('input', {})
+            prediction_id = f"standin{next(prediction_ids)}"
+            fail = random.random() < failure_rate
+            if fail:
+                count('failed')
+            with lock:
+                predictions[prediction_id] = {
+                    'status': 'starting', 'created': time.monotonic(), 'fail': fail,
+                    'duration': random.uniform(*prediction_time),
+                    'prompt': model_input.get('prompt', ''), 'seed': model_input.get('seed')
+                }
+            self._send_prediction(201, prediction_id)
+
+        def do_GET(self):
+            count('requests')
+            parts = urllib.parse.urlsplit(self.path)
+
+            # 예측 상태 확인 (속도 제한 없음)
+            if parts.path.startswith('/v1/predictions/'):
+                prediction_id = parts.path.split('/')[3]
+                if prediction_id not in predictions:
+                    self._send_empty(404)
+                    return
+                self._send_prediction(200, prediction_id)
+                return
+
+            # 예측 출력 파일
+            if parts.path.startswith('/files/'):
+                prediction_id = parts.path[len('/files/'):].rsplit('.', 1)[0]
+                prediction = predictions.get(prediction_id)
+                if not prediction or prediction['status'] != 'succeeded':
+                    self._send_empty(404)
+                    return
+                self._send_bytes(200, render_standin_image(prediction['prompt'], prediction['seed'], 1920, 1080), 'image/jpeg')
+                return
+
+            if not parts.path.startswith('/prompt/'):
+                self._send_empty(404)
+                return
+
+            if not take_token():
+                self._send_empty(429, [('Retry-After', '1')])
+                return
+
+            time.sleep(random.uniform(*latency))
+
+            if random.random() < failure_rate:
+                count('failed')
+                self._send_empty(500)
+                return
+
+            query = urllib.parse.parse_qs(parts.query)
+            prompt = urllib.parse.unquote(parts.path[len('/prompt/'):])
+            width = int(query.get('width', ['1920'])[0])
+            height = int(query.get('height', ['1080'])[0])
+            seed = query.get('seed', [''])[0]
+            self._send_bytes(200, render_standin_image(prompt, seed, width, height), 'image/jpeg')
+
+        def log_message(self, format, *args):
+            pass  # 요청 로그 생략
+
+    return StandinHandler
+
+
+def start_standin_server(latency=STANDIN_LATENCY, rate=STANDIN_RATE, burst=STANDIN_BURST,
+                         failure_rate=STANDIN_FAILURE_RATE, throttle_rate=STANDIN_THROTTLE_RATE,
+                         prediction_time=STANDIN_PREDICTION_TIME, host='127.0.0.1', port=0):
+    """
+    대역 서버를 백그라운드 스레드로 시작
+
+    Args:
+        latency: 응답 지연 범위 (초)
+        rate / burst: 서버 측 허용 속도 (초과 시 429)
+        failure_rate: 무작위 실패 비율 (이미지 요청 500 / 예측 failed)
+        throttle_rate: 무작위 429 비율
+        prediction_time: Replicate 예측 완료까지 걸리는 시간 범위 (초)
+        port: 0이면 빈 포트 자동 선택
+
+    Returns:
+        (server, base_url, stats) - stats = {'requests', 'throttled', 'failed'}
+    """
+    stats = {'requests': 0, 'throttled': 0, 'failed': 0}
+    handler = make_handler(latency, rate, burst, failure_rate, throttle_rate, prediction_time, stats)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="image-standin").start()
+    return server, f"http://{host}:{server.server_port}", stats
+
+
+@contextlib.contextmanager
+def run_standin_server(**options):
+    """
+    대역 서버 실행 (with 블록 동안, 인자는 start_standin_server와 같음)
+
+    Yields:
+        (base_url, stats)
+    """
+    server, base_url, stats = start_standin_server(**options)
+    try:
+        yield base_url, stats
+    finally:
+        server.shutdown()
+        server.server_close()
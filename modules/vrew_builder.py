@@ -0,0 +1,258 @@
+"""
+Vrew 파일 일괄 생성 모듈 (Step 3)
+- 씬 분할 범위 계산 (전체 / N씬씩)
+- 범위별 선택 이미지 + 클립 자막 수집
+- 범위별 .vrew 파일 생성
+- 파트별 진행 이벤트 (클립 수/기록 바이트/ETA) + 파트 사이 취소
+- 전체 파트 ZIP 묶음 (생성 완료 시 디스크에 1회)
+- (선택) 패키징 전 이미지 정규화 (1920x1080 JPEG, image_normalizer)
+- (선택) 눈으로 같은 이미지는 미디어 1개로 합침 (지각 해시, image_dedup)
+"""
+
+import os
+import shutil
+import time
+import zipfile
+
+from modules.image_dedup import build_media_aliases, format_dedupe_report
+from modules.image_normalizer import format_normalize_report, normalize_images
+from modules.script_parser import get_scene_clips
+from modules.vrew_creator import create_vrew_project
+
+
+class BuildCancelled(Exception):
+    """사용자 취소로 빌드 중단 (이미 생성된 파트는 삭제된 상태)"""
+
+
+def split_scene_ranges(total_shots, split_size):
+    """
+    씬 인덱스 범위 계산
+
+    Args:
+        total_shots: 전체 씬 개수
+        split_size: 파일당 씬 개수 (0 = 전체)
+
+    Returns:
+        [(start_idx, end_idx), ...] (end_idx 포함)
+    """
+    if total_shots <= 0:
+        return []
+    if split_size == 0:  # 전체
+        return [(0, total_shots - 1)]
+
+    parts = []
+    for i in range(0, total_shots, split_size):
+        parts.append((i, min(i + split_size - 1, total_shots - 1)))
+    return parts
+
+
+def get_selected_image_path(shot_images, selected):
+    """
+    씬의 선택된 이미지 경로 (A 또는 B)
+    - 선택된 이미지가 없으면 A, B 중 존재하는 것 사용
+    - 둘 다 없으면 None
+    """
+    if selected in shot_images:
+        return shot_images[selected]['path']
+    if 'A' in shot_images:
+        return shot_images['A']['path']
+    if 'B' in shot_images:
+        return shot_images['B']['path']
+    return None
+
+
+def collect_part_media(scenes, clips, clip_index, images_by_shot, selected_images, start_idx, end_idx):
+    """
+    범위(씬 인덱스 start_idx~end_idx)의 클립별 이미지/자막 수집
+
+    Returns:
+        (images, captions) - 클립 단위로 같은 길이
+    """
+    part_images = []
+    part_captions = []
+
+    for scene_idx in range(start_idx, end_idx + 1):
+        raw_id = scenes[scene_idx]['raw_id']
+        if raw_id not in images_by_shot:
+            continue
+
+        img_path = get_selected_image_path(images_by_shot[raw_id], selected_images.get(raw_id, 'A'))
+        if img_path is None:
+            continue  # 이미지가 아예 없으면 스킵
+
+        for clip in get_scene_clips(clips, clip_index, scene_idx):
+            part_images.append(img_path)
+            part_captions.append(clip['text'])
+
+    return part_images, part_captions
+
+
+def _remove_part_output(output_path):
+    """파트 출력 파일 + 생성 중 임시 폴더 삭제"""
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    shutil.rmtree(output_path + "_temp", ignore_errors=True)
+
+
+def _check_cancel(should_cancel, generated_files, parts_total):
+    """취소 요청이 있으면 생성된 파트를 삭제하고 BuildCancelled"""
+    if should_cancel and should_cancel():
+        for file_info in generated_files:
+            _remove_part_output(file_info['path'])
+        raise BuildCancelled(f"{len(generated_files)}/{parts_total} 파일 생성 후 취소됨")
+
+
+def _live_aliases(media_aliases, images):
+    """파트 이미지의 별칭 중 대상 파일이 아직 있는 것만 (정규화 캐시 정리로 사라졌으면 원본 사용)"""
+    aliases = {}
+    for path in set(images):
+        target = media_aliases.get(path)
+        if target is None or target == path:
+            continue
+        if os.path.exists(target):
+            aliases[path] = target
+        else:
+            print(f"[WARN] 별칭 파일 없음 (원본 사용): {target}")
+    return aliases
+
+
+def build_vrew_parts(scenes, clips, clip_index, images_by_shot, selected_images,
+                     split_size, script_name, output_dir, template_path, overlay_logo=None,
+                     progress_callback=None, should_cancel=None, normalize=False, dedupe=False):
+    """
+    분할 범위별 .vrew 파일 생성
+
+    Args:
+        scenes: 씬 리스트
+        clips: 클립 리스트 (create_clips 결과)
+        clip_index: 씬별 클립 오프셋 테이블 (build_clip_index 결과)
+        images_by_shot: {raw_id: {'A': {'path': ...}, 'B': {...}}}
+        selected_images: {raw_id: 'A' | 'B'}
+        split_size: 파일당 씬 개수 (0 = 전체)
+        script_name: 출력 파일명 접두어 (대본명)
+        output_dir: 출력 폴더
+        template_path: TEMPLATE.vrew 경로
+        overlay_logo: 오버레이 로고 PNG 경로 (선택)
+        progress_callback: 시작 시 + (중복 제거/정규화 후) + 범위 1개 완료마다 호출 (event)
+            event = {'part', 'parts', 'clips_done', 'clips_total',
+                     'bytes_written', 'elapsed', 'eta', 'file', 'normalize', 'dedupe'}
+            normalize = 정규화 리포트 (normalize_images 참고, 정규화 전/미사용 시 None)
+            dedupe = 중복 제거 리포트 (build_media_aliases 참고, 미사용 시 None)
+        should_cancel: 각 범위 시작 전 + 마지막 범위 후 호출, True면 생성된 파일 삭제 후 BuildCancelled
+        normalize: True면 모든 이미지를 1920x1080 JPEG로 정규화한 파일로 패키징
+        dedupe: True면 지각 해시가 가까운 이미지는 대표 1장의 미디어를 공유
+
+    Returns:
+        [{'path', 'filename', 'range', 'clips'}, ...]
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    generated_files = []
+    parts = split_scene_ranges(len(scenes), split_size)
+    part_media = [
+        collect_part_media(scenes, clips, clip_index, images_by_shot, selected_images, start_idx, end_idx)
+        for start_idx, end_idx in parts
+    ]
+
+    clips_total = sum(len(captions) for _, captions in part_media)
+    clips_done = 0
+    bytes_written = 0
+    normalize_report = None
+    dedupe_report = None
+    media_aliases = {}
+    started = time.perf_counter()
+
+    def emit(file_info):
+        if not progress_callback:
+            return
+        elapsed = time.perf_counter() - started
+        # 클립 수 기준 남은 시간 추정 (첫 파트 완료 전에는 알 수 없음)
+        eta = elapsed / clips_done * (clips_total - clips_done) if clips_done else None
+        progress_callback({
+            'part': len(generated_files),
+            'parts': len(parts),
+            'clips_done': clips_done,
+            'clips_total': clips_total,
+            'bytes_written': bytes_written,
+            'elapsed': elapsed,
+            'eta': eta,
+            'file': file_info,
+            'normalize': normalize_report,
+            'dedupe': dedupe_report
+        })
+
+    emit(None)
+
+    all_images = [path for images, _ in part_media for path in images]
+
+    if dedupe:
+        # 업로드 때 계산해 둔 지각 해시 재사용 (없는 것만 계산)
+        known_hashes = {info['path']: info['dhash'] for shot in images_by_shot.values()
+                        for info in shot.values() if 'dhash' in info}
+        media_aliases, dedupe_report = build_media_aliases(all_images, known_hashes)
+        print(f"[Dedupe] {format_dedupe_report(dedupe_report)}")
+
+    if normalize:
+        # 전체 파트의 대표 이미지를 한 번에 정규화 (같은 경로는 1번 + 프로세스 풀)
+        canonical = {path: media_aliases.get(path, path) for path in all_images}
+        mapping, normalize_report = normalize_images(list(canonical.values()))
+        media_aliases = {path: mapping.get(target, target) for path, target in canonical.items()}
+        print(f"[Normalize] {format_normalize_report(normalize_report)}")
+
+    if dedupe or normalize:
+        emit(None)
+
+    for part_idx, ((start_idx, end_idx), (part_images, part_captions)) in enumerate(zip(parts, part_media)):
+        _check_cancel(should_cancel, generated_files, len(parts))
+
+        # 파일명: 대본명_장면N.vrew
+        first_shot = scenes[start_idx]['raw_id']
+        last_shot = scenes[end_idx]['raw_id']
+        output_filename = f"{script_name}_장면{part_idx+1}.vrew"
+        output_path = os.path.join(output_dir, output_filename)
+
+        try:
+            create_vrew_project(
+                template_path=template_path,
+                images=part_images,
+                captions=part_captions,
+                output_path=output_path,
+                overlay_logo=overlay_logo,
+                media_aliases=_live_aliases(media_aliases, part_images)
+            )
+        except BaseException:
+            # 반쯤 쓰인 파일/임시 폴더를 남기지 않음
+            _remove_part_output(output_path)
+            raise
+
+        generated_files.append({
+            'path': output_path,
+            'filename': output_filename,
+            'range': f"씬 {first_shot} ~ {last_shot}",
+            'clips': len(part_captions)
+        })
+        clips_done += len(part_captions)
+        bytes_written += os.path.getsize(output_path)
+
+        emit(generated_files[-1])
+
+    # 마지막(또는 유일한) 파트 생성 중 들어온 취소 요청도 반영 (ZIP 묶기 전)
+    _check_cancel(should_cancel, generated_files, len(parts))
+
+    return generated_files
+
+
+def bundle_vrew_parts(generated_files, archive_path):
+    """
+    생성된 파트 파일들을 ZIP 1개로 묶어 디스크에 저장
+    (무압축 - .vrew 자체가 ZIP, 파일 단위 청크 복사라 메모리 사용 일정)
+
+    Returns:
+        archive_path
+    """
+    tmp_path = f"{archive_path}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for file_info in generated_files:
+            zf.write(file_info['path'], file_info['filename'])
+    os.replace(tmp_path, archive_path)
+    return archive_path
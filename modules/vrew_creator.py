@@ -207,7 +207,8 @@ def get_video_metadata(video_path):
         return None
 
 
-def create_vrew_project(template_path, images, captions, output_path, tts_voice="va29", intro_video=None, overlay_logo=None):
+def create_vrew_project(template_path, images, captions, output_path, tts_voice="va29", intro_video=None, overlay_logo=None,
+                        media_aliases=None):
     """
     Vrew 프로젝트 생성 - AI 목소리 모드 + ttsClipInfosMap 포함
 
@@ -219,8 +220,13 @@ def create_vrew_project(template_path, images, captions, output_path, tts_voice=
         tts_voice: TTS 음성 ID (기본: va29 = 송세아)
         intro_video: 인트로 영상 파일 경로 (선택)
         overlay_logo: 오버레이 로고 PNG 파일 경로 (선택, 1920x1080 투명 PNG)
+        media_aliases: {이미지 경로: 대신 넣을 경로} (선택) - 중복/정규화 이미지를 미디어 1개로 합침
     """
 
+    # 별칭 적용: 같은 경로는 미디어 항목 1개를 공유
+    if media_aliases:
+        images = [media_aliases.get(img_path, img_path) for img_path in images]
+
     # 자막 텍스트 정리: 이스케이프 문자 제거
     captions = [caption.replace('\\"', '"').replace('\\n', ' ').replace('\\t', ' ') for caption in captions]
     
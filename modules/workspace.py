@@ -0,0 +1,256 @@
+"""
+세션별 작업 폴더 + 디스크 정리(janitor) 모듈
+- 세션마다 outputs/sessions/<id>/ 아래 images, logo, vrew 폴더 사용 (사용자 간 덮어쓰기 방지)
+- 마지막 접근 시각은 폴더 안 표시 파일의 mtime으로 기록
+- 백그라운드 스레드가 주기적으로 정리: 오래된 작업 폴더 삭제 + 용량 초과 시 오래 안 쓴 순(LRU) 삭제
+  + 정규화 캐시 용량 정리
+- 요청 처리 중에는 폴더 전체 스캔 없음
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from modules.image_normalizer import prune_normalize_cache
+from modules.job_queue import get_active_output_dirs
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OUTPUTS_DIR = os.path.join(BASE_DIR, "outputs")
+
+# 세션 작업 폴더 루트
+WORKSPACE_ROOT = os.path.join(OUTPUTS_DIR, "sessions")
+
+# 작업 폴더 하위 구성
+WORKSPACE_SUBDIRS = ("images", "logo", "vrew")
+
+# 마지막 접근 표시 파일
+ACCESS_MARKER = ".last_access"
+
+# 이 시간 동안 접근이 없으면 삭제
+WORKSPACE_MAX_AGE_HOURS = float(os.getenv("VREW_WORKSPACE_MAX_AGE_HOURS", "12"))
+
+# 전체 작업 폴더 용량 한도 (초과 시 LRU 삭제)
+WORKSPACE_QUOTA_BYTES = int(float(os.getenv("VREW_WORKSPACE_QUOTA_GB", "20")) * 1024 ** 3)
+
+# 최근 이 시간(초) 안에 쓴 작업 폴더는 용량 초과여도 삭제하지 않음 (사용 중인 세션 보호)
+WORKSPACE_MIN_IDLE_SECONDS = 10 * 60
+
+# 정리 주기 (초)
+JANITOR_INTERVAL = 5 * 60
+
+# 접근 시각 갱신 최소 간격 (초) - rerun마다 파일 시스템을 건드리지 않도록
+TOUCH_INTERVAL = 60
+
+
+def create_workspace(root=WORKSPACE_ROOT):
+    """
+    새 세션 작업 폴더 생성
+
+    Returns:
+        {'id', 'root', 'images', 'logo', 'vrew'}
+    """
+    workspace_id = uuid.uuid4().hex
+    path = os.path.join(root, workspace_id)
+    workspace = {'id': workspace_id, 'root': path}
+    for name in WORKSPACE_SUBDIRS:
+        workspace[name] = os.path.join(path, name)
+        os.makedirs(workspace[name], exist_ok=True)
+    workspace['touched_at'] = 0.0
+    touch_workspace(workspace)
+    return workspace
+
+
+def touch_workspace(workspace, force=False):
+    """마지막 접근 시각 갱신 (TOUCH_INTERVAL 이내 재호출은 무시, 정리된 폴더는 다시 생성)"""
+    now = time.time()
+    if not force and now - workspace.get('touched_at', 0.0) < TOUCH_INTERVAL:
+        return
+    for name in WORKSPACE_SUBDIRS:
+        os.makedirs(workspace[name], exist_ok=True)
+    marker = os.path.join(workspace['root'], ACCESS_MARKER)
+    with open(marker, 'a'):
+        os.utime(marker, None)
+    workspace['touched_at'] = now
+
+
+def remove_workspace(workspace):
+    """작업 폴더 삭제 (재시작 버튼 - 이 세션 것만)"""
+    shutil.rmtree(workspace['root'], ignore_errors=True)
+
+
+def _last_access(path):
+    """작업 폴더 마지막 접근 시각 (표시 파일 없으면 폴더 mtime)"""
+    marker = os.path.join(path, ACCESS_MARKER)
+    try:
+        return os.path.getmtime(marker)
+    except OSError:
+        return os.path.getmtime(path)
+
+
+def _dir_size(path):
+    """폴더 전체 크기 (바이트)"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _busy_workspaces(root=WORKSPACE_ROOT):
+    """대기/실행 중인 Step 3 작업이 쓰는 작업 폴더 경로 집합 (출력 폴더 <root>/<id>/vrew → <root>/<id>)"""
+    root = os.path.abspath(root)
+    busy = set()
+    for output_dir in get_active_output_dirs():
+        relative = os.path.relpath(os.path.abspath(output_dir), root)
+        if not relative.startswith(os.pardir):
+            busy.add(os.path.join(root, relative.split(os.sep)[0]))
+    return busy
+
+
+def evict_workspaces(root=WORKSPACE_ROOT, max_age_hours=WORKSPACE_MAX_AGE_HOURS,
+                     quota_bytes=WORKSPACE_QUOTA_BYTES, min_idle_seconds=WORKSPACE_MIN_IDLE_SECONDS, busy=None):
+    """
+    작업 폴더 정리
+
+    1. max_age_hours 동안 접근 없는 폴더 삭제
+    2. 남은 전체 용량이 quota_bytes를 넘으면 오래 안 쓴 순으로 삭제
+       (min_idle_seconds 안에 쓴 폴더는 제외)
+    - 대기/실행 중인 작업이 있는 폴더는 탭을 닫았어도 삭제하지 않음 (작업 DB 조회 실패 시 이번 정리 건너뜀)
+
+    Args:
+        busy: 삭제하지 않을 작업 폴더 경로 집합 (None이면 작업 큐에서 조회)
+
+    Returns:
+        {'removed', 'freed_bytes', 'total_bytes'} - total_bytes는 정리 후 용량
+    """
+    if not os.path.isdir(root):
+        return {'removed': 0, 'freed_bytes': 0, 'total_bytes': 0}
+
+    if busy is None:
+        busy = _busy_workspaces(root)
+
+    now = time.time()
+    entries = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            entries.append((_last_access(path), path, _dir_size(path)))
+        except OSError:
+            continue  # 스캔 중 삭제됨
+
+    entries.sort()  # 오래 안 쓴 순
+    total = sum(size for _, _, size in entries)
+    removed = 0
+    freed = 0
+    age_cutoff = now - max_age_hours * 3600
+
+    for last_access, path, size in entries:
+        if os.path.abspath(path) in busy:
+            continue
+        too_old = last_access < age_cutoff
+        over_quota = total > quota_bytes and last_access < now - min_idle_seconds
+        if not (too_old or over_quota):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        freed += size
+        removed += 1
+
+    if total > quota_bytes:
+        print(f"[Janitor] ⚠️ 사용 중인 작업 폴더만으로 용량 한도 초과 "
+              f"({total / 1024 ** 3:.1f}GB / {quota_bytes / 1024 ** 3:.1f}GB)")
+
+    return {'removed': removed, 'freed_bytes': freed, 'total_bytes': total}
+
+
+def _prune_old_files(path, cutoff):
+    """폴더 안 파일을 각자의 mtime 기준으로 삭제 (폴더 자체는 유지, 비어 있는 하위 폴더만 삭제) → 삭제 수"""
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(file_path) < cutoff:
+                    os.remove(file_path)
+                    removed += 1
+            except OSError:
+                pass  # 삭제 실패/이미 삭제됨 → 계속 진행
+        if dirpath != path:
+            try:
+                os.rmdir(dirpath)  # 비어 있을 때만 삭제됨
+            except OSError:
+                pass
+    return removed
+
+
+def prune_stale_outputs(outputs_dir=OUTPUTS_DIR, max_age_hours=WORKSPACE_MAX_AGE_HOURS, exclude=(WORKSPACE_ROOT,)):
+    """
+    outputs 아래 오래된 파일 삭제 (썸네일 캐시, 배치 출력 등 - 세션 폴더 루트 제외)
+
+    - 폴더 단위가 아니라 파일마다 자신의 mtime으로 판단 (썸네일 폴더 mtime은 파일 추가/삭제 때만 바뀜)
+    - 사용 중인 썸네일은 make_thumbnail이 mtime을 갱신하므로 남음
+
+    Returns:
+        삭제한 파일 수
+    """
+    if not os.path.isdir(outputs_dir):
+        return 0
+
+    cutoff = time.time() - max_age_hours * 3600
+    excluded = {os.path.abspath(path) for path in exclude}
+    removed = 0
+
+    for name in os.listdir(outputs_dir):
+        path = os.path.join(outputs_dir, name)
+        if os.path.abspath(path) in excluded:
+            continue
+        if os.path.isdir(path):
+            removed += _prune_old_files(path, cutoff)
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # 삭제 실패해도 계속 진행
+
+    return removed
+
+
+def janitor_loop(stop_event, interval=JANITOR_INTERVAL):
+    """정리 루프 (시작 직후 1회 + interval마다)"""
+    while True:
+        try:
+            stats = evict_workspaces()
+            pruned = prune_stale_outputs()
+            cache_pruned = prune_normalize_cache()
+            if stats['removed'] or pruned or cache_pruned:
+                print(f"[Janitor] 작업 폴더 {stats['removed']}개 삭제 "
+                      f"({stats['freed_bytes'] / 1024 ** 2:.0f}MB 확보, 현재 {stats['total_bytes'] / 1024 ** 2:.0f}MB), "
+                      f"오래된 항목 {pruned}개 / 정규화 캐시 {cache_pruned}개 삭제")
+        except Exception as e:
+            print(f"[Janitor] 정리 실패: {e}")
+
+        if stop_event.wait(interval):
+            return
+
+
+def start_janitor(interval=JANITOR_INTERVAL):
+    """
+    백그라운드 정리 스레드 시작 (daemon)
+
+    Returns:
+        종료용 threading.Event
+    """
+    stop_event = threading.Event()
+    threading.Thread(target=janitor_loop, args=(stop_event, interval), daemon=True, name="workspace-janitor").start()
+    print(f"[Janitor] 시작 (보관 {WORKSPACE_MAX_AGE_HOURS:g}시간, 한도 {WORKSPACE_QUOTA_BYTES / 1024 ** 3:.1f}GB)")
+    return stop_event
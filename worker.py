@@ -0,0 +1,33 @@
+"""
+엔라이트랩 Vrew 자동화 - 작업 워커 (Step 3 빌드 전용 프로세스)
+실행: python worker.py --workers 2
+
+Streamlit 앱과 같은 작업 DB(VREW_JOBS_DB)를 사용합니다.
+워커를 별도로 실행할 때는 앱을 VREW_EMBEDDED_WORKERS=0 으로 실행하세요.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.job_queue import JOB_WORKERS, JOBS_DB_PATH, start_worker_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vrew 생성 작업 워커")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="워커 프로세스 수")
+    parser.add_argument("--db", default=JOBS_DB_PATH, help="작업 DB 경로")
+    args = parser.parse_args()
+
+    processes = start_worker_pool(max(1, args.workers), args.db)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("[JobWorker] 종료")
+
+
+if __name__ == "__main__":
+    main()